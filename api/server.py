@@ -0,0 +1,429 @@
+# importando as bibliotecas
+import os
+import sys
+import json
+import asyncio
+import logging
+import functools
+from urllib.parse import parse_qsl, urlsplit
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.loader import DATASET_PATH, dataset_version, load_dataset
+from utils.cache import LRUCache
+from utils.queries import aggregate, best_restaurants, ranking, rating_threshold_counts, top_restaurants
+from utils.distinct import distinct_counts, distinct_total
+from utils.instrumentation import finish_rerun, start_rerun, timed
+
+# Endereço do servidor, configurável pelas variáveis de ambiente FOME_ZERO_API_HOST e FOME_ZERO_API_PORT
+API_HOST = os.environ.get('FOME_ZERO_API_HOST', '127.0.0.1')
+API_PORT = int(os.environ.get('FOME_ZERO_API_PORT', 8000))
+
+# Limite (em bytes) do cache de respostas, configurável pela variável de ambiente FOME_ZERO_API_CACHE_BYTES
+API_CACHE_BYTES = int(os.environ.get('FOME_ZERO_API_CACHE_BYTES', 16 * 1024 * 1024))
+
+# Maior quantidade de itens (parâmetro n) aceita pelos endpoints de classificação
+MAX_TOP_N = 100
+
+# Tamanho máximo da linha de requisição e dos cabeçalhos (bytes)
+MAX_HEADER_BYTES = 16 * 1024
+
+# Cache do processo com as respostas já codificadas em JSON, compartilhado entre as requisições
+response_cache = LRUCache(API_CACHE_BYTES)
+
+# Registro dos erros internos (o cliente recebe apenas uma mensagem genérica)
+logger = logging.getLogger(__name__)
+
+HTTP_STATUS = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+               431: 'Request Header Fields Too Large', 500: 'Internal Server Error'}
+
+#===================================================#
+#     Parâmetros das requisições
+#===================================================#
+
+class ParameterError(ValueError):
+    """ Erro de um parâmetro inválido da requisição, respondido com status 400 e a mensagem do erro """
+
+def country_param(params, path=DATASET_PATH):
+    """ Esta função lê a seleção de países (parâmetro countries, separado por vírgulas)
+
+         Sem o parâmetro, todos os países do dataset são selecionados. O parâmetro vazio (countries=) é uma
+         seleção sem países, como o filtro de países vazio nas páginas: as respostas não têm dados.
+
+        Input: params (dict) - Parâmetros da URL
+               path (str) - Caminho do arquivo CSV
+        Output: Lista de países
+    """
+    countries = load_dataset(path)['country'].cat.categories.tolist()
+    if 'countries' not in params:
+        return countries
+    selected = [country.strip() for country in params['countries'].split(',') if country.strip()]
+    unknown = sorted(set(selected) - set(countries))
+    if unknown:
+        raise ParameterError(f'Países desconhecidos: {", ".join(unknown)}')
+    return sorted(set(selected))
+
+def int_param(params, name, default, minimum=0, maximum=MAX_TOP_N):
+    """ Esta função lê um parâmetro inteiro dentro de [minimum, maximum]
+
+        Input: params (dict) - Parâmetros da URL
+               name (str) - Nome do parâmetro
+               default (int) - Valor padrão
+               minimum, maximum (int) - Limites do valor
+        Output: Valor (int)
+    """
+    try:
+        value = int(params.get(name, default))
+    except ValueError:
+        raise ParameterError(f'Parâmetro {name} deve ser um número inteiro')
+    if not minimum <= value <= maximum:
+        raise ParameterError(f'Parâmetro {name} deve estar entre {minimum} e {maximum}')
+    return value
+
+def rating_param(params, name, default):
+    """ Esta função lê um limite de avaliação entre 0 e 5 (arredondado para uma casa decimal)
+
+        Input: params (dict) - Parâmetros da URL
+               name (str) - Nome do parâmetro
+               default (float) - Valor padrão
+        Output: Limite (float)
+    """
+    try:
+        value = round(float(params.get(name, default)), 1)
+    except ValueError:
+        raise ParameterError(f'Parâmetro {name} deve ser um número')
+    if not 0.0 <= value <= 5.0:
+        raise ParameterError(f'Parâmetro {name} deve estar entre 0 e 5')
+    return value
+
+def records(df_aux):
+    """ Esta função converte um Dataframe em uma lista de dicionários (uma linha por dicionário)
+
+        Input: df_aux - Dataframe
+        Output: Lista de dicionários
+    """
+    return df_aux.astype({col: str for col in df_aux.select_dtypes('category').columns}).to_dict('records')
+
+def json_default(value):
+    """ Esta função converte os tipos do numpy para tipos nativos na codificação JSON
+
+        Input: value - Valor não suportado pelo json
+        Output: Valor nativo
+    """
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError(f'{type(value).__name__} não é serializável em JSON')
+
+#===================================================#
+#     Endpoints
+#===================================================#
+
+@timed()
+def overall_metrics(params):
+    """ Esta função retorna as métricas da visão geral (as mesmas de display_metrics)
+
+        Input: params (dict) - Parâmetros da URL: countries
+        Output: Dicionário com as métricas
+    """
+    country_options = country_param(params)
+    return {'countries': country_options,
+            'restaurants': distinct_total(country_options, 'restaurant_id'),
+            'registered_countries': distinct_total(country_options, 'country'),
+            'cities': distinct_total(country_options, 'city'),
+            'votes': aggregate(country_options, 'country')['votes'].sum(),
+            'cuisines': distinct_total(country_options, 'cuisines')}
+
+@timed()
+def country_metrics(params):
+    """ Esta função retorna as métricas por país da página de países
+
+        Input: params (dict) - Parâmetros da URL: countries
+        Output: Dicionário com restaurantes, cidades, avaliação média e preço médio para dois de cada país
+                (ordenados pela quantidade de restaurantes)
+    """
+    country_options = country_param(params)
+    df_aux = (aggregate(country_options, 'country')
+              .loc[:, ['country', 'restaurants', 'aggregate_rating', 'average_cost_for_two']]
+              .merge(distinct_counts(country_options, 'country', 'city'), on='country')
+              .sort_values('restaurants', ascending=False)
+              .reset_index(drop=True)
+              .round(2))
+    return {'countries': records(df_aux.loc[:, ['country', 'restaurants', 'cities', 'aggregate_rating',
+                                                'average_cost_for_two']])}
+
+@timed()
+def top_cities(params):
+    """ Esta função retorna as cidades com mais restaurantes (como top_city_resisted_restaurant)
+
+        Input: params (dict) - Parâmetros da URL: countries, n (padrão 10)
+        Output: Dicionário com país, cidade e quantidade de restaurantes das n cidades
+    """
+    country_options = country_param(params)
+    df_aux = (aggregate(country_options, ['country', 'city'])
+              .sort_values(['rows', 'city'], ascending=[False, True])
+              .reset_index(drop=True)
+              .head(int_param(params, 'n', 10)))
+    return {'cities': records(df_aux.loc[:, ['country', 'city', 'rows']].rename(columns={'rows': 'restaurants'}))}
+
+@timed()
+def top_cities_by_rating(params):
+    """ Esta função retorna as cidades com mais restaurantes acima e abaixo dos limites de avaliação
+        (como plot_top_cities)
+
+        Input: params (dict) - Parâmetros da URL: countries, above (padrão 4.0), below (padrão 2.5),
+               n (padrão 7)
+        Output: Dicionário com as n cidades de cada condição ('above' e 'below')
+    """
+    country_options = country_param(params)
+    above, below = rating_param(params, 'above', 4.0), rating_param(params, 'below', 2.5)
+    n = int_param(params, 'n', 7)
+    df_aux = rating_threshold_counts(country_options, above=above, below=below)
+
+    result = {'above_threshold': above, 'below_threshold': below}
+    for column in ['above', 'below']:
+        result[column] = records(df_aux.loc[df_aux[column] > 0, ['country', 'city', column]]
+                                 .rename(columns={column: 'restaurants'})
+                                 .sort_values('restaurants', ascending=False)
+                                 .head(n))
+    return result
+
+@timed()
+def top_cities_by_cuisines(params):
+    """ Esta função retorna as cidades com mais tipos culinários (como plot_top_cities_cuisines)
+
+        Input: params (dict) - Parâmetros da URL: countries, n (padrão 10)
+        Output: Dicionário com país, cidade e quantidade de tipos culinários das n cidades
+    """
+    country_options = country_param(params)
+    df_aux = (distinct_counts(country_options, ['country', 'city'], 'cuisines')
+              .sort_values('cuisine_types', ascending=False)
+              .reset_index(drop=True)
+              .head(int_param(params, 'n', 10)))
+    return {'cities': records(df_aux)}
+
+@timed()
+def top_restaurants_endpoint(params):
+    """ Esta função retorna os melhores restaurantes (como display_top_restaurants)
+
+        Input: params (dict) - Parâmetros da URL: countries, n (padrão 10)
+        Output: Dicionário com os n melhores restaurantes
+    """
+    country_options = country_param(params)
+    return {'restaurants': records(top_restaurants(country_options, int_param(params, 'n', 10)))}
+
+@timed()
+def best_by_cuisine(params):
+    """ Esta função retorna o melhor restaurante de cada culinária (como display_cuisine_metrics)
+
+        Input: params (dict) - Parâmetros da URL: countries, cuisines (separadas por vírgulas; padrão: todas)
+        Output: Dicionário com o melhor restaurante de cada culinária (na ordem pedida) com restaurantes
+                nos países selecionados
+    """
+    df_best = best_restaurants(country_param(params))
+    if params.get('cuisines'):
+        cuisines = [cuisine.strip() for cuisine in params['cuisines'].split(',') if cuisine.strip()]
+        df_best = df_best.loc[[cuisine for cuisine in cuisines if cuisine in df_best.index], :]
+    return {'cuisines': records(df_best.rename_axis('cuisine').reset_index())}
+
+@timed()
+def cuisine_ranking(params):
+    """ Esta função retorna as melhores e as piores culinárias pela avaliação média (como display_top_cuisines)
+
+        Input: params (dict) - Parâmetros da URL: countries, n (padrão 10)
+        Output: Dicionário com as n melhores ('best') e as n piores ('worst') culinárias
+    """
+    best, worst = ranking(country_param(params), 'cuisines', 'aggregate_rating', int_param(params, 'n', 10))
+    return {name: records(df_aux.loc[:, ['cuisines', 'aggregate_rating']].round(2))
+            for name, df_aux in [('best', best), ('worst', worst)]}
+
+# Caminho -> (função do endpoint, parâmetros aceitos)
+ROUTES = {'/metrics': (overall_metrics, ['countries']),
+          '/countries': (country_metrics, ['countries']),
+          '/cities/top': (top_cities, ['countries', 'n']),
+          '/cities/rating': (top_cities_by_rating, ['countries', 'above', 'below', 'n']),
+          '/cities/cuisines': (top_cities_by_cuisines, ['countries', 'n']),
+          '/restaurants/top': (top_restaurants_endpoint, ['countries', 'n']),
+          '/cuisines/best': (best_by_cuisine, ['countries', 'cuisines']),
+          '/cuisines/ranking': (cuisine_ranking, ['countries', 'n'])}
+
+#===================================================#
+#     Respostas
+#===================================================#
+
+def build_response(route, params):
+    """ Esta função executa um endpoint e codifica o resultado em JSON
+
+         O tempo de cada resposta gerada é medido como uma execução da "página" api<caminho>
+         (ver utils/instrumentation.py).
+
+        Input: route (str) - Caminho do endpoint
+               params (dict) - Parâmetros da URL
+        Output: Corpo da resposta (bytes)
+    """
+    endpoint, _ = ROUTES[route]
+    start_rerun('api' + route)
+    try:
+        result = endpoint(params)
+    finally:
+        finish_rerun()
+    return json.dumps(result, ensure_ascii=False, default=json_default).encode('utf-8')
+
+def response_key(route, params, path=DATASET_PATH):
+    """ Esta função monta a chave do cache de respostas
+
+         A chave considera apenas os parâmetros aceitos pelo endpoint (a ordem na URL não importa) e a
+         versão do dataset: uma alteração no CSV invalida as respostas anteriores. A seleção de países entra
+         na chave como a lista ordenada e sem repetições usada pelos endpoints (ver country_param), de modo
+         que 'Brazil,India', 'India,Brazil' e a ausência do parâmetro (todos os países) não geram a mesma
+         resposta mais de uma vez.
+
+        Input: route (str) - Caminho do endpoint
+               params (dict) - Parâmetros da URL
+               path (str) - Caminho do arquivo CSV
+        Output: Chave (tupla)
+    """
+    _, accepted = ROUTES[route]
+    values = tuple((name, tuple(country_param(params, path)) if name == 'countries' else params.get(name))
+                   for name in accepted if name in params or name == 'countries')
+    return (route, values, dataset_version(path))
+
+def cached_response(route, params):
+    """ Esta função retorna o corpo da resposta de um endpoint, gerado uma única vez por chave (ver response_key)
+
+         A chave é resolvida aqui, fora do loop de eventos: a seleção de países e a versão do dataset leem o
+         CSV (stat) e podem recarregar o dataset.
+
+        Input: route (str) - Caminho do endpoint
+               params (dict) - Parâmetros da URL
+        Output: Corpo da resposta (bytes)
+    """
+    key = response_key(route, params)
+    return response_cache.get_or_create(key, functools.partial(build_response, route, params))
+
+async def respond(route, params):
+    """ Esta função retorna o status e o corpo da resposta de uma requisição GET
+
+         A chave do cache e a resposta são resolvidas em uma thread (ver cached_response: a chave lê o CSV e
+         as consultas usam pandas e bloqueiam), de modo que o servidor continua atendendo outras conexões.
+         Requisições iguais simultâneas aguardam uma única geração (ver LRUCache.get_or_create).
+
+         Parâmetros inválidos (ParameterError) são respondidos com status 400 e a mensagem do erro; os
+         demais erros chegam a handle_connection, que responde 500 sem detalhes.
+
+        Input: route (str) - Caminho do endpoint
+               params (dict) - Parâmetros da URL
+        Output: Tupla (status HTTP, corpo em bytes)
+    """
+    if route == '/health':
+        return 200, b'{"status": "ok"}'
+    if route not in ROUTES:
+        return 404, json.dumps({'error': f'Endpoint desconhecido: {route}',
+                                'endpoints': ['/health'] + list(ROUTES)}, ensure_ascii=False).encode('utf-8')
+
+    loop = asyncio.get_running_loop()
+    try:
+        return 200, await loop.run_in_executor(None, cached_response, route, params)
+    except ParameterError as error:
+        return 400, json.dumps({'error': str(error)}, ensure_ascii=False).encode('utf-8')
+
+def warm_up():
+    """ Esta função gera a resposta padrão (sem parâmetros) de cada endpoint e a guarda no cache de respostas
+
+         Assim as estruturas pré-calculadas usadas pelos endpoints (cubo, bitsets, rankings) são construídas
+         antes de o servidor aceitar conexões, e não na primeira requisição de cada endpoint.
+
+        Output: None
+    """
+    for route in ROUTES:
+        cached_response(route, {})
+
+def http_response(status, body, keep_alive):
+    """ Esta função monta a resposta HTTP/1.1 com corpo JSON
+
+        Input: status (int) - Status HTTP
+               body (bytes) - Corpo da resposta
+               keep_alive (bool) - Mantém a conexão aberta para as próximas requisições
+        Output: Resposta (bytes)
+    """
+    headers = (f'HTTP/1.1 {status} {HTTP_STATUS[status]}\r\n'
+               'Content-Type: application/json; charset=utf-8\r\n'
+               f'Content-Length: {len(body)}\r\n'
+               f'Connection: {"keep-alive" if keep_alive else "close"}\r\n\r\n')
+    return headers.encode('latin-1') + body
+
+async def handle_connection(reader, writer):
+    """ Esta função atende as requisições de uma conexão (HTTP/1.1 com keep-alive, apenas GET sem corpo)
+
+        Input: reader, writer - Streams da conexão (asyncio)
+        Output: None
+    """
+    try:
+        while True:
+            try:
+                head = await reader.readuntil(b'\r\n\r\n')
+            except asyncio.LimitOverrunError:
+                writer.write(http_response(431, b'{"error": "Cabecalhos muito grandes"}', False))
+                break
+            except asyncio.IncompleteReadError:
+                break
+
+            request_line, *header_lines = head.decode('latin-1').split('\r\n')
+            try:
+                method, target, version = request_line.split(' ')
+            except ValueError:
+                writer.write(http_response(400, b'{"error": "Requisicao invalida"}', False))
+                break
+            headers = {name.strip().lower(): value.strip()
+                       for name, _, value in (line.partition(':') for line in header_lines if line)}
+            connection = headers.get('connection', '').lower()
+            keep_alive = connection != 'close' if version == 'HTTP/1.1' else connection == 'keep-alive'
+
+            if method != 'GET':
+                status, body = 405, b'{"error": "Apenas GET"}'
+            else:
+                url = urlsplit(target)
+                try:
+                    status, body = await respond(url.path.rstrip('/') or '/', dict(parse_qsl(url.query, keep_blank_values=True)))
+                except Exception:
+                    logger.exception('Erro ao atender %s', target)
+                    status, body = 500, b'{"error": "Erro interno do servidor"}'
+            writer.write(http_response(status, body, keep_alive))
+            await writer.drain()
+            if not keep_alive:
+                break
+    except ConnectionError:
+        pass
+    finally:
+        writer.close()
+
+async def serve(host=API_HOST, port=API_PORT, path=DATASET_PATH):
+    """ Esta função inicia o servidor e atende as conexões até ser interrompido
+
+         O dataset e as estruturas pré-calculadas usadas pelos endpoints são carregados antes de aceitar
+         conexões (ver warm_up).
+
+        Input: host (str), port (int) - Endereço do servidor
+               path (str) - Caminho do arquivo CSV
+        Output: None
+    """
+    loop = asyncio.get_running_loop()
+    await loop.run_in_executor(None, load_dataset, path)
+    await loop.run_in_executor(None, warm_up)
+    server = await asyncio.start_server(handle_connection, host, port, limit=MAX_HEADER_BYTES)
+    print(f'API da Fome Zero em http://{host}:{port} (endpoints: /health, {", ".join(ROUTES)})', flush=True)
+    async with server:
+        await server.serve_forever()
+
+#===================================================#
+#     Execução pela linha de comando
+#===================================================#
+
+if __name__ == '__main__':
+    # Uso: python api/server.py [porta] [host]
+    port = int(sys.argv[1]) if len(sys.argv) > 1 else API_PORT
+    host = sys.argv[2] if len(sys.argv) > 2 else API_HOST
+    try:
+        asyncio.run(serve(host, port))
+    except KeyboardInterrupt:
+        pass
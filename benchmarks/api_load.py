@@ -0,0 +1,188 @@
+# importando as bibliotecas
+import os
+import sys
+import json
+import time
+import random
+import socket
+import asyncio
+import argparse
+import subprocess
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Requisições do teste de carga: as mesmas consultas das páginas, com seleções de países e parâmetros variados
+COUNTRIES = ['Philippines', 'Brazil', 'Australia', 'United States of America', 'Canada', 'Singapure',
+             'United Arab Emirates', 'India', 'Indonesia', 'New Zeland', 'England', 'Qatar', 'South Africa',
+             'Sri Lanka', 'Turkey']
+ENDPOINTS = ['/metrics', '/countries', '/cities/top', '/cities/rating', '/cities/cuisines',
+             '/restaurants/top', '/cuisines/best', '/cuisines/ranking']
+
+#===================================================#
+#     Funções
+#===================================================#
+
+def request_targets(count, selections, seed=0):
+    """ Esta função sorteia as URLs do teste de carga
+
+         Cada URL combina um endpoint, uma das seleções de países e, nos endpoints com parâmetros, um n e
+         limites de avaliação. Quanto menos seleções, maior a proporção de respostas em cache.
+
+        Input: count (int) - Quantidade de URLs
+               selections (int) - Quantidade de seleções de países diferentes
+               seed (int) - Semente do sorteio
+        Output: Lista de URLs (caminho e parâmetros)
+    """
+    rng = random.Random(seed)
+    options = [','.join(sorted(rng.sample(COUNTRIES, rng.randint(1, len(COUNTRIES))))) for _ in range(selections)]
+    targets = []
+    for _ in range(count):
+        endpoint = rng.choice(ENDPOINTS)
+        params = [f'countries={rng.choice(options)}']
+        if endpoint in ['/cities/top', '/cities/cuisines', '/restaurants/top', '/cuisines/ranking']:
+            params.append(f'n={rng.randint(1, 20)}')
+        if endpoint == '/cities/rating':
+            params += [f'above={rng.randint(30, 45) / 10}', f'below={rng.randint(10, 30) / 10}']
+        targets.append(f"{endpoint}?{'&'.join(params)}".replace(' ', '%20'))
+    return targets
+
+async def client(host, port, targets, deadline, latencies, errors):
+    """ Esta função faz requisições em sequência por uma conexão keep-alive até o prazo
+
+        Input: host (str), port (int) - Endereço do servidor
+               targets (list) - URLs sorteadas (percorridas em ciclo a partir de uma posição aleatória)
+               deadline (float) - Horário final (time.perf_counter)
+               latencies (list) - Lista que recebe o tempo de cada resposta (s)
+               errors (list) - Lista que recebe os status diferentes de 200
+        Output: None
+    """
+    reader, writer = await asyncio.open_connection(host, port)
+    position = random.randrange(len(targets))
+    try:
+        while time.perf_counter() < deadline:
+            target = targets[position % len(targets)]
+            position += 1
+            start = time.perf_counter()
+            writer.write(f'GET {target} HTTP/1.1\r\nHost: {host}\r\n\r\n'.encode('latin-1'))
+            head = await reader.readuntil(b'\r\n\r\n')
+            status = int(head.split(b' ', 2)[1])
+            length = next(int(line.split(b':', 1)[1]) for line in head.split(b'\r\n')
+                          if line.lower().startswith(b'content-length:'))
+            await reader.readexactly(length)
+            latencies.append(time.perf_counter() - start)
+            if status != 200:
+                errors.append(status)
+    finally:
+        writer.close()
+
+async def load(host, port, targets, connections, duration):
+    """ Esta função executa o teste de carga com várias conexões simultâneas
+
+        Input: host (str), port (int) - Endereço do servidor
+               targets (list) - URLs sorteadas
+               connections (int) - Quantidade de conexões simultâneas
+               duration (float) - Duração do teste (s)
+        Output: Dicionário com requisições, erros, requisições por segundo e percentis da latência (ms)
+    """
+    latencies, errors = [], []
+    start = time.perf_counter()
+    await asyncio.gather(*[client(host, port, targets, start + duration, latencies, errors)
+                           for _ in range(connections)])
+    elapsed = time.perf_counter() - start
+    p50, p95, p99 = np.quantile(latencies, [0.5, 0.95, 0.99]) * 1000
+    return {'connections': connections, 'requests': len(latencies), 'errors': len(errors),
+            'requests_per_s': round(len(latencies) / elapsed, 1),
+            'latency_ms': {'p50': round(p50, 3), 'p95': round(p95, 3), 'p99': round(p99, 3)}}
+
+def free_port():
+    """ Esta função retorna uma porta TCP livre do computador
+
+        Output: Porta (int)
+    """
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+def start_server(port, timeout=120):
+    """ Esta função inicia o servidor da API em outro processo e aguarda ele aceitar conexões
+
+        Input: port (int) - Porta do servidor
+               timeout (float) - Tempo máximo de espera (s)
+        Output: Processo do servidor
+    """
+    process = subprocess.Popen([sys.executable, os.path.join(ROOT, 'api', 'server.py'), str(port)], cwd=ROOT,
+                               stdout=subprocess.DEVNULL)
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError('O servidor da API foi encerrado durante a inicialização')
+        try:
+            with socket.create_connection(('127.0.0.1', port), timeout=1):
+                return process
+        except OSError:
+            time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError('O servidor da API não aceitou conexões a tempo')
+
+def run(host, port, connections_list, duration, selections, seed):
+    """ Esta função mede o throughput da API para cada quantidade de conexões simultâneas
+
+         A primeira rodada ('cold') começa com o cache de respostas vazio (servidor recém-iniciado) e
+         também serve de aquecimento; as rodadas 'warm' medem o servidor com as respostas já em cache.
+
+        Input: host (str), port (int) - Endereço do servidor
+               connections_list (list) - Quantidades de conexões simultâneas
+               duration (float) - Duração de cada medição (s)
+               selections (int) - Quantidade de seleções de países diferentes
+               seed (int) - Semente do sorteio das URLs
+        Output: Dicionário com as medições
+    """
+    targets = request_targets(2000, selections, seed)
+    results = [dict(asyncio.run(load(host, port, targets, connections_list[0], duration)), round='cold')]
+    for connections in connections_list:
+        results.append(dict(asyncio.run(load(host, port, targets, connections, duration)), round='warm'))
+    return {'benchmark': 'api_load', 'cpus': os.cpu_count(), 'duration_s': duration,
+            'selections': selections, 'unique_urls': len(set(targets)), 'results': results}
+
+#===================================================#
+#     Execução pela linha de comando
+#===================================================#
+
+if __name__ == '__main__':
+    # Uso: python benchmarks/api_load.py [--connections 1 8 32] [--duration 5] [--selections 20]
+    #                                    [--url http://127.0.0.1:8000] [--output arquivo.json]
+    # Sem --url, um servidor novo é iniciado em uma porta livre e encerrado ao final
+    parser = argparse.ArgumentParser(description='Teste de carga da API de agregados')
+    parser.add_argument('--connections', type=int, nargs='+', default=[1, 8, 32])
+    parser.add_argument('--duration', type=float, default=5.0)
+    parser.add_argument('--selections', type=int, default=20)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--url')
+    parser.add_argument('--output')
+    args = parser.parse_args()
+
+    server = None
+    if args.url:
+        host, port = args.url.split('://', 1)[-1].rstrip('/').rsplit(':', 1)
+        port = int(port)
+    else:
+        host, port = '127.0.0.1', free_port()
+        server = start_server(port)
+    try:
+        report = run(host, port, args.connections, args.duration, args.selections, args.seed)
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+    print(f"{report['unique_urls']} URLs diferentes, {report['selections']} seleções de países, "
+          f"{report['cpus']} CPUs")
+    for r in report['results']:
+        print(f"{r['round']:<5} {r['connections']:>3} conexões: {r['requests_per_s']:>9.1f} req/s, "
+              f"p50 {r['latency_ms']['p50']:.2f} ms, p95 {r['latency_ms']['p95']:.2f} ms, "
+              f"p99 {r['latency_ms']['p99']:.2f} ms, {r['errors']} erros")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
@@ -0,0 +1,99 @@
+# importando as bibliotecas
+import os
+import sys
+import ast
+import glob
+import json
+import argparse
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+#===================================================#
+#     Funções
+#===================================================#
+
+def page_imports(page_file):
+    """ Esta função extrai as importações do nível superior de uma página (as executadas ao abrir a página)
+
+        Input: page_file (str) - Caminho da página
+        Output: Código (str) com as importações
+    """
+    with open(page_file, encoding='utf-8') as f:
+        tree = ast.parse(f.read(), page_file)
+    return '\n'.join(ast.unparse(node) for node in tree.body if isinstance(node, (ast.Import, ast.ImportFrom)))
+
+def parse_importtime(stderr):
+    """ Esta função lê a saída de python -X importtime
+
+        Input: stderr (str) - Saída de erro do processo
+        Output: Lista de tuplas (módulo, tempo próprio em s, tempo acumulado em s, nível de aninhamento)
+    """
+    modules = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|', 2)
+        depth = (len(name) - len(name.lstrip())) // 2
+        modules.append((name.strip(), int(self_us) / 1e6, int(cumulative_us) / 1e6, depth))
+    return modules
+
+def import_time(code):
+    """ Esta função mede as importações de um código em um processo novo (sem módulos já carregados)
+
+        Input: code (str) - Código com as importações
+        Output: Dicionário com o tempo total (s) e os módulos de primeiro nível com o tempo acumulado
+    """
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', code], cwd=ROOT,
+                            capture_output=True, text=True, check=True)
+    top_level = [(name, cumulative) for name, _, cumulative, depth in parse_importtime(result.stderr) if depth == 0]
+    return {'total_s': round(sum(cumulative for _, cumulative in top_level), 4),
+            'modules': {name: round(cumulative, 4) for name, cumulative in top_level}}
+
+def run(repeat, top):
+    """ Esta função mede as importações de cada página, em processos novos, e as compara com o streamlit puro
+
+         A diferença para o streamlit puro é o custo próprio da página na primeira execução depois de iniciar
+         o servidor (o streamlit já está carregado no processo do servidor).
+
+        Input: repeat (int) - Quantidade de medições por página (é considerada a menor)
+               top (int) - Quantidade de módulos mais lentos listados por página
+        Output: Dicionário com as medições
+    """
+    def best(code):
+        return min((import_time(code) for _ in range(repeat)), key=lambda r: r['total_s'])
+
+    streamlit = best('import streamlit')
+    pages = []
+    for page_file in sorted(glob.glob(os.path.join(ROOT, '*.py')) + glob.glob(os.path.join(ROOT, 'pages', '*.py'))):
+        measured = best(page_imports(page_file))
+        heaviest = sorted(((name, s) for name, s in measured['modules'].items() if name not in streamlit['modules']),
+                          key=lambda item: -item[1])[:top]
+        pages.append({'page': os.path.relpath(page_file, ROOT), 'total_s': measured['total_s'],
+                      'beyond_streamlit_s': round(measured['total_s'] - streamlit['total_s'], 4),
+                      'heaviest': [{'module': name, 'cumulative_s': s} for name, s in heaviest]})
+    return {'benchmark': 'import_times', 'python': sys.version.split()[0], 'repeat': repeat,
+            'streamlit_s': streamlit['total_s'], 'pages': pages}
+
+#===================================================#
+#     Execução pela linha de comando
+#===================================================#
+
+if __name__ == '__main__':
+    # Uso: python benchmarks/import_times.py [--repeat 3] [--top 8] [--output arquivo.json]
+    parser = argparse.ArgumentParser(description='Tempo das importações de cada página em um processo novo')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--top', type=int, default=8)
+    parser.add_argument('--output')
+    args = parser.parse_args()
+
+    report = run(args.repeat, args.top)
+    print(f"streamlit: {report['streamlit_s']:.3f}s")
+    for p in report['pages']:
+        print(f"{p['page']}: {p['total_s']:.3f}s (além do streamlit: {p['beyond_streamlit_s']:.3f}s)")
+        for m in p['heaviest']:
+            print(f"    {m['module']:<32} {m['cumulative_s']:.3f}s")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
@@ -0,0 +1,67 @@
+# importando as bibliotecas
+import os
+import sys
+import json
+import time
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.loader import DATASET_PATH
+from utils.ingest import read_dataset_parallel
+
+#===================================================#
+#     Funções
+#===================================================#
+
+def time_ingest(path, workers, repeat):
+    """ Esta função mede o tempo da leitura paralela do CSV com uma quantidade de processos
+
+        Input: path (str) - Caminho do arquivo CSV
+               workers (int) - Quantidade de processos
+               repeat (int) - Quantidade de repetições (é considerado o menor tempo)
+        Output: Dicionário com os processos, o menor tempo (s) e as linhas lidas e mantidas
+    """
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        df1, rows = read_dataset_parallel(path, workers)
+        timings.append(time.perf_counter() - start)
+    return {'workers': workers, 'seconds': round(min(timings), 4), 'rows': rows, 'kept': len(df1)}
+
+def run(path, workers_list, repeat):
+    """ Esta função mede a leitura paralela para cada quantidade de processos e calcula o ganho sobre 1 processo
+
+        Input: path (str) - Caminho do arquivo CSV
+               workers_list (list) - Quantidades de processos
+               repeat (int) - Quantidade de repetições por medição
+        Output: Dicionário com o arquivo, a quantidade de CPUs e as medições
+    """
+    results = [time_ingest(path, workers, repeat) for workers in workers_list]
+    base = next((r['seconds'] for r in results if r['workers'] == 1), results[0]['seconds'])
+    for r in results:
+        r['speedup'] = round(base / r['seconds'], 2)
+    return {'benchmark': 'ingest_workers', 'path': os.path.abspath(path), 'size': os.path.getsize(path),
+            'cpus': os.cpu_count(), 'results': results}
+
+#===================================================#
+#     Execução pela linha de comando
+#===================================================#
+
+if __name__ == '__main__':
+    # Uso: python benchmarks/ingest_workers.py [caminho do CSV] [--workers 1,2,4,8] [--repeat 3] [--output arquivo.json]
+    parser = argparse.ArgumentParser(description='Tempo da leitura paralela do CSV por quantidade de processos')
+    parser.add_argument('path', nargs='?', default=DATASET_PATH)
+    parser.add_argument('--workers', default='1,2,4,8')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--output')
+    args = parser.parse_args()
+
+    report = run(args.path, [int(w) for w in args.workers.split(',')], args.repeat)
+    print(f"{report['path']} ({report['size']:,} bytes, {report['cpus']} CPUs)")
+    for r in report['results']:
+        print(f"  {r['workers']:>3} processos: {r['seconds']:8.3f}s  ganho {r['speedup']:5.2f}x")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
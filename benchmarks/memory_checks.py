@@ -0,0 +1,61 @@
+# importando as bibliotecas
+import os
+import sys
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.loader import CLEAN_OPTIONS, DATASET_PATH, EXCLUDED_CUISINES, build_snapshot, dataset_version
+from utils.snapshot import memory_mapped, read_snapshot
+
+#===================================================#
+#     Verificações
+#===================================================#
+
+def check_snapshot_mapped(path=DATASET_PATH):
+    """ Esta função verifica que o dataframe carregado do snapshot usa os arquivos mapeados em memória, sem
+        copiar as colunas (ver snapshot.read_snapshot)
+
+        Input: path (str) - Caminho do arquivo CSV
+        Output: Dicionário com as colunas verificadas; AssertionError se alguma coluna foi copiada
+    """
+    version = dataset_version(path)
+    df1 = read_snapshot(path, version, CLEAN_OPTIONS)
+    if df1 is None:
+        build_snapshot(path)
+        df1 = read_snapshot(path, version, CLEAN_OPTIONS)
+
+    copied = [col for col in df1.columns if not memory_mapped(df1[col])]
+    assert not copied, f'Colunas copiadas na leitura do snapshot: {copied}'
+    return {'check': 'snapshot_mapped', 'columns': len(df1.columns), 'rows': len(df1)}
+
+def chained_clean(df):
+    """ Esta função é a limpeza anterior à máscara única (uma cópia filtrada do dataframe por etapa), usada
+        apenas como referência nos testes da limpeza (tests/test_loader.py)
+
+        Input: df - Dataframe lido do CSV, com as colunas renomeadas
+        Output: Dataframe limpo
+    """
+    # O tipo da coluna é mantido (versões mais novas do pandas inferem um tipo de texto próprio em apply)
+    df['cuisines'] = (df.loc[:, 'cuisines'].apply(lambda x: x.split(',')[0] if isinstance(x, str) else x)
+                      .astype(df['cuisines'].dtype))
+    df1 = df.dropna().drop_duplicates()
+    for cuisine in EXCLUDED_CUISINES:
+        df1 = df1.loc[df1['cuisines'] != cuisine, :]
+    return df1.rename(columns={'country_code': 'country'})
+
+CHECKS = [check_snapshot_mapped]
+
+#===================================================#
+#     Execução pela linha de comando
+#===================================================#
+
+if __name__ == '__main__':
+    # Uso: python benchmarks/memory_checks.py [--path arquivo.csv]
+    parser = argparse.ArgumentParser(description='Verificações de uso de memória do carregamento dos dados')
+    parser.add_argument('--path', default=DATASET_PATH)
+    args = parser.parse_args()
+
+    for check in CHECKS:
+        result = check(args.path)
+        print(' '.join(f'{key}={value}' for key, value in result.items()), 'ok')
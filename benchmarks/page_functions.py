@@ -0,0 +1,272 @@
+# importando as bibliotecas
+import os
+import sys
+import ast
+import glob
+import json
+import time
+import argparse
+import platform
+import statistics
+import subprocess
+import tempfile
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import numpy as np
+import pandas as pd
+from utils.loader import CLEAN_OPTIONS, DATASET_PATH, build_snapshot, dataset_version, load_dataset, read_clean
+from utils.snapshot import read_snapshot
+from utils.queries import query_cache
+from utils.maps import map_html_cache
+from utils.figures import figure_cache
+from utils.synthetic import write_synthetic_csv
+
+# Escalas padrão do dataset (1 = zomato.csv); a escala 1000 (~7.5 milhões de linhas) deve ser pedida em --scales
+DEFAULT_SCALES = [1, 10, 100]
+
+# Diretório padrão dos CSVs sintéticos (reaproveitados entre execuções)
+DATA_DIR = os.path.join(tempfile.gettempdir(), 'fome_zero_benchmarks')
+
+# Países selecionados por padrão na barra lateral de cada página
+ALL_COUNTRIES = ['Philippines', 'Brazil', 'Australia', 'United States of America',
+                 'Canada', 'Singapure', 'United Arab Emirates', 'India',
+                 'Indonesia', 'New Zeland', 'England', 'Qatar', 'South Africa',
+                 'Sri Lanka', 'Turkey']
+PAGE_COUNTRIES = ['Brazil', 'Australia', 'Canada', 'England', 'Qatar', 'South Africa']
+
+# Funções medidas: (página, função, argumentos com os valores padrão dos filtros de cada página)
+CASES = [
+    ('2', 'display_metrics', (ALL_COUNTRIES,)),
+    ('2', 'country_map', (ALL_COUNTRIES,)),
+    ('3', 'plot_restaurant_count_by_country', (PAGE_COUNTRIES,)),
+    ('3', 'plot_city_count_by_country', (PAGE_COUNTRIES,)),
+    ('3', 'plot_average_rating_by_country', (PAGE_COUNTRIES,)),
+    ('3', 'plot_average_cost_for_two_by_country', (PAGE_COUNTRIES,)),
+    ('4', 'top_city_resisted_restaurant', (PAGE_COUNTRIES,)),
+    ('4', 'plot_top_cities', (PAGE_COUNTRIES, 'acima', 4.0, 'Top 7 Cidades com Restaurantes com média de avaliação acima de 4')),
+    ('4', 'plot_top_cities', (PAGE_COUNTRIES, 'abaixo', 2.5, 'Top 7 Cidades com Restaurantes com média de avaliação abaixo de 2.5')),
+    ('4', 'plot_top_cities_cuisines', (PAGE_COUNTRIES,)),
+    ('5', 'best_restaurants', (PAGE_COUNTRIES,)),
+    ('5', 'display_top_restaurants', (PAGE_COUNTRIES, 10)),
+    ('5', 'display_top_cuisines', (PAGE_COUNTRIES, 10, 'Top 10 Melhores Tipos de Culinárias', False)),
+    ('5', 'display_top_cuisines', (PAGE_COUNTRIES, 10, 'Top 10 Piores Tipos de Culinárias', True)),
+]
+
+#===================================================#
+#     Funções
+#===================================================#
+
+def scaled_dataset(scale, data_dir=DATA_DIR, seed=0):
+    """ Esta função retorna o caminho de um CSV sintético com scale vezes as linhas do zomato.csv, gerando-o se
+        necessário (ver utils/synthetic.py)
+
+        Input: scale (int) - Tamanho em relação ao zomato.csv (1 retorna o próprio zomato.csv)
+               data_dir (str) - Diretório dos CSVs gerados
+               seed (int) - Semente da geração
+        Output: Caminho do CSV
+    """
+    if scale == 1:
+        return DATASET_PATH
+    path = os.path.join(data_dir, f'zomato_x{scale}_seed{seed}.csv')
+    if not os.path.exists(path):
+        os.makedirs(data_dir, exist_ok=True)
+        write_synthetic_csv(path, scale * len(pd.read_csv(DATASET_PATH, usecols=[0])), seed)
+    return path
+
+def load_page_functions(page):
+    """ Esta função carrega apenas as importações e as funções de uma página, sem executar o layout
+
+         Os comandos do Streamlit chamados dentro das funções rodam sem servidor (e não exibem nada).
+
+        Input: page (str) - Número da página (ex: '2' para pages/2_📊_overall.py)
+        Output: Dicionário com as funções da página
+    """
+    page_file = glob.glob(os.path.join(ROOT, 'pages', f'{page}_*.py'))[0]
+    with open(page_file, encoding='utf-8') as f:
+        tree = ast.parse(f.read(), page_file)
+    tree.body = [node for node in tree.body if isinstance(node, (ast.Import, ast.ImportFrom, ast.FunctionDef))]
+
+    namespace = {'__name__': f'page_{page}'}
+    exec(compile(tree, page_file, 'exec'), namespace)
+    return namespace
+
+def reset_query_caches():
+    """ Esta função esvazia os caches de consultas, de mapas e de gráficos (as estruturas pré-calculadas são mantidas) """
+    query_cache.clear()
+    map_html_cache.clear()
+    figure_cache.clear()
+
+def measure(func, repeat, reset=None):
+    """ Esta função mede o tempo e o pico de memória de uma função
+
+         A primeira chamada é medida à parte, pois inclui a construção das estruturas pré-calculadas. As
+         repetições seguintes são feitas depois de reset (caches de consultas vazios), e o pico de memória
+         (tracemalloc) é medido em uma chamada extra, para não somar o custo do rastreamento aos tempos.
+
+        Input: func - Função sem argumentos
+               repeat (int) - Quantidade de repetições
+               reset - Função chamada antes de cada repetição (opcional)
+        Output: Dicionário com o tempo da primeira chamada, a mediana e o mínimo das repetições (s) e o pico
+                de memória (bytes)
+    """
+    start = time.perf_counter()
+    func()
+    first = time.perf_counter() - start
+
+    timings = []
+    for _ in range(repeat):
+        if reset is not None:
+            reset()
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+
+    if reset is not None:
+        reset()
+    tracemalloc.start()
+    func()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    return {'first_s': round(first, 6),
+            'median_s': round(statistics.median(timings), 6) if timings else None,
+            'min_s': round(min(timings), 6) if timings else None,
+            'peak_bytes': peak}
+
+def run_dataset(path, repeat):
+    """ Esta função mede o carregamento do dataset e as funções das páginas sobre um CSV
+
+         Executada em um processo separado por CSV (ver run), com FOME_ZERO_DATASET apontando para o CSV,
+         para que as funções das páginas usem o dataset medido e o pico de memória de um CSV não afete o
+         próximo.
+
+        Input: path (str) - Caminho do arquivo CSV
+               repeat (int) - Quantidade de repetições por medição
+        Output: Dicionário com as linhas mantidas na limpeza ('kept') e a lista de medições ('results', uma
+                por etapa de carregamento e por função)
+    """
+    results = []
+
+    # Carregamento: leitura e limpeza do CSV, geração do snapshot e leitura do snapshot
+    results.append({'name': 'read_clean', **measure(lambda: read_clean(path), 0)})
+    results.append({'name': 'build_snapshot', **measure(lambda: build_snapshot(path), 0)})
+    results.append({'name': 'read_snapshot',
+                    **measure(lambda: read_snapshot(path, dataset_version(path), CLEAN_OPTIONS), 0)})
+    df1 = load_dataset(path)
+
+    pages = {}
+    for page, name, args in CASES:
+        if page not in pages:
+            pages[page] = load_page_functions(page)
+        func = pages[page][name]
+        results.append({'name': name, 'page': page, 'args': [a for a in args if not isinstance(a, list)],
+                        **measure(lambda: func(*args), repeat, reset_query_caches)})
+    return {'kept': len(df1), 'results': results}
+
+def run(scales, repeat, data_dir=DATA_DIR, seed=0):
+    """ Esta função executa o benchmark em cada escala do dataset, um processo por escala
+
+        Input: scales (list) - Escalas do dataset (ver scaled_dataset)
+               repeat (int) - Quantidade de repetições por medição
+               data_dir (str) - Diretório dos CSVs gerados
+               seed (int) - Semente dos CSVs sintéticos
+        Output: Dicionário com o ambiente e as medições de cada escala
+    """
+    datasets = []
+    for scale in scales:
+        path = scaled_dataset(scale, data_dir, seed)
+        with tempfile.NamedTemporaryFile(suffix='.json', delete=False) as f:
+            output = f.name
+        try:
+            subprocess.run([sys.executable, os.path.abspath(__file__), '--worker', path,
+                            '--repeat', str(repeat), '--output', output],
+                           env={**os.environ, 'FOME_ZERO_DATASET': path}, check=True)
+            with open(output, encoding='utf-8') as f:
+                measured = json.load(f)
+        finally:
+            os.remove(output)
+        datasets.append({'scale': scale, 'path': path, 'size': os.path.getsize(path), **measured})
+
+    return {'benchmark': 'page_functions', 'commit': git_commit(), 'python': platform.python_version(),
+            'pandas': pd.__version__, 'numpy': np.__version__, 'cpus': os.cpu_count(), 'repeat': repeat, 'seed': seed,
+            'datasets': datasets}
+
+def git_commit():
+    """ Esta função retorna o commit atual do repositório (ou None fora de um repositório git) """
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def result_label(result):
+    """ Esta função retorna o nome de uma medição com os argumentos curtos (ex: 'plot_top_cities acima 4.0') """
+    args = [str(a) for a in result.get('args') or [] if not isinstance(a, str) or len(a) <= 12]
+    return ' '.join([result['name']] + args)
+
+def result_key(dataset, result):
+    """ Esta função identifica uma medição para a comparação entre execuções """
+    return (dataset['scale'], result['name'], result.get('page'), json.dumps(result.get('args')))
+
+def compare(report, baseline):
+    """ Esta função compara as medições com as de uma execução anterior (ex: de outro commit)
+
+        Input: report (dict) - Resultado de run
+               baseline (dict) - Resultado de run salvo anteriormente
+        Output: Lista de tuplas (escala, nome da medição, tempo anterior, tempo atual, razão atual / anterior)
+    """
+    before = {result_key(d, r): r for d in baseline['datasets'] for r in d['results']}
+    rows = []
+    for d in report['datasets']:
+        for r in d['results']:
+            old = before.get(result_key(d, r))
+            if old is None:
+                continue
+            metric = 'median_s' if r['median_s'] is not None else 'first_s'
+            if old.get(metric):
+                rows.append((d['scale'], result_label(r), old[metric], r[metric], round(r[metric] / old[metric], 2)))
+    return rows
+
+#===================================================#
+#     Execução pela linha de comando
+#===================================================#
+
+if __name__ == '__main__':
+    # Uso: python benchmarks/page_functions.py [--scales 1,10,100] [--repeat 5] [--output arquivo.json]
+    #                                          [--baseline execucao_anterior.json] [--data-dir diretório] [--seed 0]
+    parser = argparse.ArgumentParser(description='Tempo e pico de memória das funções das páginas por escala do dataset')
+    parser.add_argument('--scales', default=','.join(str(s) for s in DEFAULT_SCALES))
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--output')
+    parser.add_argument('--baseline')
+    parser.add_argument('--data-dir', default=DATA_DIR)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--worker', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(run_dataset(args.worker, args.repeat), f)
+        sys.exit(0)
+
+    report = run([int(s) for s in args.scales.split(',')], args.repeat, args.data_dir, args.seed)
+    for d in report['datasets']:
+        print(f"x{d['scale']}: {d['path']} ({d['size']:,} bytes, {d['kept']:,} linhas mantidas)")
+        for r in d['results']:
+            median = f"{r['median_s']:9.4f}s" if r['median_s'] is not None else ' ' * 10
+            print(f"  {result_label(r):<38} primeira {r['first_s']:9.4f}s  mediana {median}  "
+                  f"pico {r['peak_bytes'] / 2 ** 20:9.1f} MiB")
+
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            rows = compare(report, json.load(f))
+        print('Comparação com', args.baseline)
+        for scale, name, old, new, ratio in rows:
+            print(f"  x{scale:<5} {name:<38} {old:9.4f}s -> {new:9.4f}s  ({ratio}x)")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
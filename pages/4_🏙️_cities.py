@@ -1,273 +1,168 @@
 # importando as bibliotecas
-import pandas as pd
-import inflection
 import streamlit as st
-import folium
-from PIL import Image
-from streamlit_folium import folium_static
-from folium.plugins import MarkerCluster
-import plotly.express as px
-import plotly.graph_objects as go
+from utils.queries import aggregate, rating_threshold_counts
+from utils.distinct import distinct_counts
+from utils.instrumentation import finish_rerun, render_debug_panel, stage, start_rerun, timed
+from utils.profiling import profiled
+from utils.figures import bar_chart
+# os gráficos são montados (e guardados em cache) por utils/figures.py, que importa o plotly apenas
+# quando um gráfico é desenhado pela primeira vez (ver benchmarks/import_times.py)
 
 st.set_page_config( page_title='Cities', page_icon='🏙️', layout ='wide' )
 
+# Medição dos tempos desta execução da página (ver utils/instrumentation.py)
+start_rerun('cities')
+
 #===================================================#
 #     Funções
 #===================================================#
 
-def top_city_resisted_restaurant(df1):
+@timed()
+def top_city_resisted_restaurant(country_options):
     """ Esta função gera um gráfico de barras mostrando as principais cidades com base na quantidade de restaurantes 
     
          O gráfico mostra as 10 principais cidades com base na quantidade de restaurantes registrados na base de dados.
          Cada barra representa uma cidade e mostra o número de restaurantes registrados.
          A cor das barras representa o país ao qual a cidade pertence.
+         A quantidade é a de linhas registradas de cada cidade ('rows' do cubo), como na contagem original da página.
         
-        Input: Dataframe
+        Input: Países selecionados
         Output: Exibição do gráfico de barras interativo com as principais cidades
     """
-        
-    df_aux = (df1.loc[:,['country','restaurant_id','city']]
-      .groupby(['country','city'])
-      .count()
-      .sort_values(["restaurant_id", "city"], ascending=[False, True])
-      .reset_index() )
-
-    fig = (px.bar(df_aux.head(10), x = 'city', y = 'restaurant_id', text = 'restaurant_id', 
-                             color = 'country', 
-                             labels = { 'restaurant_id' : 'Restaurante',
-                                         'city' : 'Cidade' ,
-                                          'country' : 'País'} ) )
-    fig.update_layout(title=dict(text='Top 10 Cidades com mais Restaurantes na Base de Dados', x=0.5, font=dict(size=20)))
-    fig.update_layout( xaxis=dict(showgrid=False), yaxis=dict(showgrid=False) )
-    fig = st.plotly_chart(fig)
+    df_aux = (aggregate(country_options, ['country','city'])
+      .sort_values(["rows", "city"], ascending=[False, True])
+      .reset_index(drop = True) )
+
+    fig = bar_chart(df_aux.head(10), x='city', y='rows', text='rows', color='country',
+                    labels={'rows': 'Restaurante', 'city': 'Cidade', 'country': 'País'},
+                    title='Top 10 Cidades com mais Restaurantes na Base de Dados', title_x=0.5, title_size=20)
+    with stage('plotly_chart'):
+        fig = st.plotly_chart(fig)
     return fig
-def plot_top_cities(condition,title):
+@timed()
+def plot_top_cities(country_options, condition, threshold, title):
     """ Esta função gera um gráfico de barras mostrando as principais cidades com base em uma condição de avaliação
     
-         A condição  'acima' (para cidades com avaliação acima de 4) ou 'abaixo' (para cidades com avaliação abaixo de 2.5).
+         A condição  'acima' (para restaurantes com avaliação acima do limite) ou 'abaixo' (para restaurantes com avaliação abaixo do limite),
+         com o limite escolhido no filtro da barra lateral.
          O gráfico mostra as 7 principais cidades com base na contagem de restaurantes que atendem à condição de avaliação.
          Cada barra representa uma cidade e mostra o número de restaurantes que atendem à condição.
          A cor das barras representa o país ao qual a cidade pertence.
+         As contagens saem do histograma de avaliações por cidade calculado no carregamento dos dados (ver utils/queries.py).
         
-        Input: condition (str) - Condição de avaliação ('acima' ou 'abaixo')
+        Input: country_options (list) - Países selecionados
+               condition (str) - Condição de avaliação ('acima' ou 'abaixo')
+               threshold (float) - Limite de avaliação da condição
                title (str) - Título do gráfico
         Output: Exibição do gráfico de barras com as principais cidades
     """
-    
     if condition == 'acima':
-        linhas = df1['aggregate_rating'] > 4
+        column = 'above'
     elif condition == 'abaixo':
-        linhas = df1['aggregate_rating'] < 2.5
-    df_aux = (df1.loc[linhas, ['country', 'city', 'restaurant_id']]
-              .groupby(['country', 'city'])
-              .count()
+        column = 'below'
+    df_aux = rating_threshold_counts(country_options, above=threshold, below=threshold)
+    df_aux = (df_aux.loc[df_aux[column] > 0, ['country', 'city', column]]
+              .rename(columns={column: 'restaurant_id'})
               .sort_values('restaurant_id', ascending=False)
-              .reset_index())
+              .reset_index(drop=True))
 
-    fig = (px.bar(df_aux.head(7), x='city', y='restaurant_id', text='restaurant_id',
-                  color='country',
-                  labels={'restaurant_id': 'Restaurantes',
-                          'city': 'Cidade',
-                          'country': 'País'}))
-    fig.update_layout(xaxis=dict(showgrid=False), yaxis=dict(showgrid=False))
-    fig.update_layout(title=dict(text=title, font=dict(size=17)))
-    st.plotly_chart(fig)
+    fig = bar_chart(df_aux.head(7), x='city', y='restaurant_id', text='restaurant_id', color='country',
+                    labels={'restaurant_id': 'Restaurantes', 'city': 'Cidade', 'country': 'País'},
+                    title=title, title_size=17)
+    with stage('plotly_chart'):
+        st.plotly_chart(fig)
     
-def plot_top_cities_cuisines(df1):
+@timed()
+def plot_top_cities_cuisines(country_options):
     """ Esta função exibe um gráfico de barras mostrando as principais cidades com maior diversidade gastronômica
     
          O gráfico de barras exibe as 10 principais cidades com base na quantidade de tipos culinários únicos encontrados em cada uma.
          Cada barra representa uma cidade e mostra o número de tipos culinários presentes nessa cidade.
          A cor das barras representa o país ao qual a cidade pertence.
+         Os tipos culinários distintos são contados pelos bitsets de culinárias de cada cidade (ver utils/distinct.py).
         
-        Input: Dataframe 
+        Input: Países selecionados
         Output: Exibição do gráfico de barras com as principais cidades e diversidades gastronômicas
     """
-    
-    df_aux = (df1.loc[:,['cuisines','country','city']]
-             .groupby(['country','city'])
-             .nunique()
-             .sort_values('cuisines',ascending = False)
-             .reset_index() )
-
-    fig = (px.bar(df_aux.head(10), x = 'city', y = 'cuisines', text = 'cuisines', 
-                             color = 'country', 
-                             labels = { 'cuisines' : 'Tipos Culinários',
-                                         'city' : 'Cidade' ,
-                                          'country' : 'País'} ) )
-    fig.update_layout(title=dict(text='Top 10 cidades com maiores diversidades gastronômicas', x=0.50,font=dict(size=20)))
-    fig.update_layout( xaxis=dict(showgrid=False), yaxis=dict(showgrid=False) )
-    fig = st.plotly_chart(fig)
+    df_aux = (distinct_counts(country_options, ['country','city'], 'cuisines')
+             .sort_values('cuisine_types',ascending = False)
+             .reset_index(drop = True) )
+
+    fig = bar_chart(df_aux.head(10), x='city', y='cuisine_types', text='cuisine_types', color='country',
+                    labels={'cuisine_types': 'Tipos Culinários', 'city': 'Cidade', 'country': 'País'},
+                    title='Top 10 cidades com maiores diversidades gastronômicas', title_x=0.5, title_size=20)
+    with stage('plotly_chart'):
+        fig = st.plotly_chart(fig)
     return fig
     
-def rename_columns(df):
-    """ Esta função realiza modificações nos nomes das colunas do dataframe sendo elas:
-    
-         Tipos de renomeação:
-         
-         1. Título: Converte a primeira letra de cada palavra em maiúscula
-         2. Snakecase: Converte os espaços em ( _ ) e letras minúsculas
-         3. Espaços: Remove os espaços em branco das colunas
-
-         Input: Dataframe
-         output: Dataframe com as colunas renomeadas
-    """
-
-    title = lambda x: inflection.titleize(x)
-    snakecase = lambda x: inflection.underscore(x)
-    spaces = lambda x: x.replace(" ", "")
-    cols_old = list(df.columns)
-    cols_old = list(map(title, cols_old))
-    cols_old = list(map(spaces, cols_old))
-    cols_new = list(map(snakecase, cols_old))
-    df.columns = cols_new
-    return df
-
-def country_name(df):
-    """ Esta função tem a responsabilidade de substituir os códigos pelos nomes dos países correspondentes
-        
-        Input: Dataframe
-        Output: Dataframe com os nomes dos países 
-    """
-    df['country_code'] = df['country_code'].replace({
-    1: "India",
-    14: "Australia",
-    30: "Brazil",
-    37: "Canada",
-    94: "Indonesia",
-    148: "New Zeland",
-    162: "Philippines",
-    166: "Qatar",
-    184: "Singapure",
-    189: "South Africa",
-    191: "Sri Lanka",
-    208: "Turkey",
-    214: "United Arab Emirates",
-    215: "England",
-    216: "United States of America",
-    }) 
-    return df
-
-
-
-def color_name(df):
-    """ Esta função tem a responsabilidade de substituir os códigos por nomes de cores 
-            
-        Input: Dataframe
-        Output: Dataframe com os nomes das cores 
-    """
-    df['rating_color'] = df['rating_color'].replace({
-    "3F7E00": "darkgreen",
-    "5BA829": "green",
-    "9ACD32": "lightgreen",
-    "CDD614": "orange",
-    "FFBA00": "red",
-    "CBCBC8": "darkred",
-    "FF7800": "darkred",
-    }) 
-    return df
-
-
-def clean_dataframe(df):
-    """ Esta função tem a responsabilidade de limpar o dataframe
-    
-         Limpezas realizadas:
-         
-         1. Retorno apenas do primeiro nome dos elementos da coluna 'cuisines'
-         2. Remoção de dados nulos
-         3. Remoção de dados duplicados
-         4. Remoção de linhas com o valor 'Drinks Only' na coluna 'cuisines'
-         5. Remoção de linhas com o valor 'Mineira' na coluna 'cuisines'
-         6. Renomeação da coluna 'country_code' para 'country'
-        
-         Input: Dataframe
-         Output: Dataframe limpo
-    """
-    
-    # Retorno apenas do primeiro nome dos elementos da coluna 'cuisines'
-    df["cuisines"] = df.loc[:, "cuisines"].apply(lambda x: x.split(",")[0] if isinstance(x, str) else x)
-    
-    # Remoção de dados nulo
-    df_clean = df.dropna()
-
-    # Remoção os dados duplicados
-    df1 = df_clean.drop_duplicates()
-
-    # Remoção de linhas
-    linhas_removidas = df['cuisines'] != 'Drinks Only'
-    df1 = df1.loc[linhas_removidas,:]
-
-    # Remoção de linhas
-    linhas_removidas = df['cuisines'] != 'Mineira'
-    df1 = df1.loc[linhas_removidas,:]
-
-    # Renomeação da coluna 'country_code' para 'country'
-    df1 = df1.rename(columns={'country_code': 'country'})
-    return df1
 # -------------------------------- Inicio da Estrutura lógica do código-----------------------------------
-# ------------------------
-# Import dataset
-# ------------------------
-
-df = pd.read_csv('zomato.csv')
-
-# ------------------------
-# Limpando dados
-# ------------------------
-rename_columns(df)
-country_name(df)
-color_name(df)
-df1 = clean_dataframe(df)
-#===================================================#
-#     Barra lateral
-#===================================================#
-
-#Filtro de paises
-st.sidebar.markdown('## Filtros')
+# Corpo da página, com perfil opcional (FOME_ZERO_PROFILE ou ?profile=1, ver utils/profiling.py): o perfil é
+# encerrado e gravado mesmo quando a execução é interrompida
+with profiled('cities'):
+    #===================================================#
+    #     Barra lateral
+    #===================================================#
+
+    #Filtro de paises
+    st.sidebar.markdown('## Filtros')
+
+    # Criação do filtro de paises
+    country_options = st.sidebar.multiselect(
+    'Selecione os paises que deseja visualizar os Restaurantes:',
+    ['Philippines', 'Brazil', 'Australia', 'United States of America',
+       'Canada', 'Singapure', 'United Arab Emirates', 'India',
+       'Indonesia', 'New Zeland', 'England', 'Qatar', 'South Africa',
+       'Sri Lanka', 'Turkey'],
+    default = ['Brazil', 'Australia', 'Canada',
+               'England', 'Qatar', 'South Africa'])
+
+    # Criação dos filtros de limite de avaliação
+    above_slider = st.sidebar.slider(
+        'Selecione a avaliação mínima (acima de)',
+        value = 4.0 ,
+        min_value = 0.0,
+        max_value = 5.0,
+        step = 0.1,
+         )
+
+    below_slider = st.sidebar.slider(
+        'Selecione a avaliação máxima (abaixo de)',
+        value = 2.5 ,
+        min_value = 0.0,
+        max_value = 5.0,
+        step = 0.1,
+         )
+
+    st.sidebar.markdown('''---''') 
+
+    st.sidebar.markdown('##### Developed by:') 
+    st.sidebar.markdown('#### Joao Victor - Data Scientist')  
+
+    st.sidebar.markdown('''---''') 
+    #===================================================#
+    #     layout no streamlit
+    #===================================================#
+    st.title('🏙️ Visão Cidades')
+    st.markdown('''---''')
 
-# Criação do filtro de paises
-country_options = st.sidebar.multiselect(
-'Selecione os paises que deseja visualizar os Restaurantes:',
-['Philippines', 'Brazil', 'Australia', 'United States of America',
-   'Canada', 'Singapure', 'United Arab Emirates', 'India',
-   'Indonesia', 'New Zeland', 'England', 'Qatar', 'South Africa',
-   'Sri Lanka', 'Turkey'],
-default = ['Brazil', 'Australia', 'Canada',
-           'England', 'Qatar', 'South Africa'])
+    with st.container():    
+        top_city_resisted_restaurant(country_options)
 
-st.sidebar.markdown('''---''') 
+    st.markdown('''---''') 
 
-# Aplicação do filtro no dataset
-linhas_selecionadas = df1['country'].isin(country_options)
-df1 = df1.loc[linhas_selecionadas,:]
+    with st.container():    
+        col1,col2 = st.columns(2)
 
-st.sidebar.markdown('##### Developed by:') 
-st.sidebar.markdown('#### Joao Victor - Data Scientist')  
+        with col1:
+            plot_top_cities(country_options, 'acima', above_slider, f'Top 7 cidades com restaurantes de média avaliativa acima de {above_slider:g}')
 
-st.sidebar.markdown('''---''') 
-#===================================================#
-#     layout no streamlit
-#===================================================#
-st.title('🏙️ Visão Cidades')
-st.markdown('''---''')
+        with col2:
+            plot_top_cities(country_options, 'abaixo', below_slider, f'Top 7 cidades com restaurantes de média avaliativa abaixo de {below_slider:g}')
 
-with st.container():    
-    top_city_resisted_restaurant(df1)
-    
-st.markdown('''---''') 
-           
-with st.container():    
-    col1,col2 = st.columns(2)
-    
-    with col1:
-        plot_top_cities('acima','Top 7 cidades com restaurantes de média avaliativa acima de 4')
-    
-    with col2:
-        plot_top_cities('abaixo','Top 7 cidades com restaurantes de média avaliativa abaixo de 2.5')
-       
-    st.markdown('''---''')
-        
-with st.container():
-    plot_top_cities_cuisines(df1)
+        st.markdown('''---''')
 
+    with st.container():
+        plot_top_cities_cuisines(country_options)
 
+    # Tempos da execução: exportação e painel de depuração (FOME_ZERO_DEBUG_PANEL=1)
+    render_debug_panel(finish_rerun())
@@ -0,0 +1,80 @@
+# importando as bibliotecas
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+import pytest
+from utils.loader import CLEAN_OPTIONS, DATASET_PATH, color_name, country_name, rename_columns
+from utils.snapshot import read_snapshot
+
+#===================================================#
+#     Dados usados pelos testes
+#===================================================#
+
+def raw_frame(path=DATASET_PATH):
+    """ Esta função lê o CSV com as colunas renomeadas e os códigos de país e cor substituídos, antes da limpeza
+
+         As colunas de texto são lidas como objetos Python, como no pandas de requirements.txt.
+
+        Input: path (str) - Caminho do arquivo CSV
+        Output: Dataframe
+    """
+    df = pd.read_csv(path)
+    df = df.astype({col: object for col in df.columns if pd.api.types.is_string_dtype(df[col])})
+    rename_columns(df)
+    country_name(df)
+    color_name(df)
+    return df
+
+def memory_copy(df1):
+    """ Esta função copia para a memória um dataframe montado sobre arrays mapeados (ex: recortes do dataset
+        carregado do snapshot), para comparação com um dataframe em memória (assert_frame_equal diferencia
+        np.memmap de np.ndarray)
+
+        Input: df1 - Dataframe
+        Output: Dataframe
+    """
+    return pd.DataFrame({col: (pd.Categorical.from_codes(np.array(df1[col].cat.codes), df1[col].cat.categories)
+                               if isinstance(df1[col].dtype, pd.CategoricalDtype) else np.array(df1[col]))
+                         for col in df1.columns}, index=pd.Index(np.array(df1.index)))
+
+def snapshot_copy(path, version):
+    """ Esta função carrega o snapshot de um CSV copiando os arrays mapeados para a memória (ver memory_copy)
+
+        Input: path (str) - Caminho do arquivo CSV
+               version (tuple) - Versão do CSV (ver loader.dataset_version)
+        Output: Dataframe
+    """
+    df1 = read_snapshot(path, version, CLEAN_OPTIONS)
+    assert df1 is not None, f'Snapshot ausente ou desatualizado: {path}'
+    return memory_copy(df1)
+
+@pytest.fixture
+def read_raw():
+    """ Função que lê um CSV antes da limpeza (ver raw_frame) """
+    return raw_frame
+
+@pytest.fixture
+def copy_frame():
+    """ Função que copia para a memória um dataframe sobre arrays mapeados (ver memory_copy) """
+    return memory_copy
+
+@pytest.fixture
+def read_snapshot_copy():
+    """ Função que carrega o snapshot de um CSV na memória (ver snapshot_copy) """
+    return snapshot_copy
+
+@pytest.fixture(scope='session')
+def repeated_csv(tmp_path_factory):
+    """ CSV com as linhas de zomato.csv, cópias exatas de algumas linhas e linhas de restaurantes já
+        registrados com outros votos (mesmo restaurant_id, linha diferente)
+    """
+    df = pd.read_csv(DATASET_PATH)
+    copies = df.sample(300, random_state=1)
+    changed = df.sample(200, random_state=2).assign(Votes=lambda d: d['Votes'] + 1)
+    path = tmp_path_factory.mktemp('repeated') / 'zomato.csv'
+    pd.concat([df, copies, changed]).sample(frac=1, random_state=3).to_csv(path, index=False)
+    return str(path)
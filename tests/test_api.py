@@ -0,0 +1,90 @@
+# importando as bibliotecas
+import json
+import asyncio
+import pytest
+from api import server
+from api.server import MAX_TOP_N, handle_connection, response_cache, response_key
+
+#===================================================#
+#     Requisições a um servidor local
+#===================================================#
+
+async def fetch(target, method='GET'):
+    """ Esta função inicia o servidor em uma porta livre e faz uma requisição HTTP/1.1
+
+        Input: target (str) - Caminho com os parâmetros da URL
+               method (str) - Método HTTP
+        Output: Tupla (status HTTP, corpo decodificado do JSON)
+    """
+    http = await asyncio.start_server(handle_connection, '127.0.0.1', 0)
+    async with http:
+        port = http.sockets[0].getsockname()[1]
+        reader, writer = await asyncio.open_connection('127.0.0.1', port)
+        writer.write(f'{method} {target} HTTP/1.1\r\nHost: localhost\r\nConnection: close\r\n\r\n'.encode('latin-1'))
+        await writer.drain()
+        response = await reader.read()
+        writer.close()
+    head, _, body = response.partition(b'\r\n\r\n')
+    return int(head.split(b' ')[1]), json.loads(body)
+
+@pytest.fixture
+def get():
+    """ Função que faz uma requisição GET ao servidor (ver fetch), com o cache de respostas vazio """
+    response_cache.clear()
+    yield lambda target, method='GET': asyncio.run(fetch(target, method))
+    response_cache.clear()
+
+#===================================================#
+#     Status das respostas
+#===================================================#
+
+def test_health_and_unknown_route(get):
+    assert get('/health') == (200, {'status': 'ok'})
+
+    status, body = get('/restaurantes')
+    assert status == 404
+    assert '/restaurants/top' in body['endpoints']
+
+def test_only_get_is_accepted(get):
+    assert get('/health', method='POST')[0] == 405
+
+def test_valid_request_returns_json(get):
+    status, body = get('/restaurants/top?countries=Brazil,India&n=5')
+    assert status == 200
+    assert len(body['restaurants']) == 5
+    assert {restaurant['country'] for restaurant in body['restaurants']} <= {'Brazil', 'India'}
+
+@pytest.mark.parametrize('target, message', [
+    ('/restaurants/top?n=abc', 'Parâmetro n deve ser um número inteiro'),
+    (f'/restaurants/top?n={MAX_TOP_N + 1}', f'Parâmetro n deve estar entre 0 e {MAX_TOP_N}'),
+    ('/cities/top?n=-1', f'Parâmetro n deve estar entre 0 e {MAX_TOP_N}'),
+    ('/cities/rating?above=cinco', 'Parâmetro above deve ser um número'),
+    ('/cities/rating?below=5.1', 'Parâmetro below deve estar entre 0 e 5'),
+    ('/metrics?countries=Brazil,Atlantis', 'Países desconhecidos: Atlantis'),
+])
+def test_invalid_parameters_return_400(get, target, message):
+    assert get(target) == (400, {'error': message})
+
+def test_unexpected_errors_return_500_without_details(get, monkeypatch):
+    def failing(params):
+        raise ValueError('detalhe interno')
+
+    # ValueError que não é ParameterError: erro interno, não do parâmetro
+    monkeypatch.setitem(server.ROUTES, '/metrics', (failing, ['countries']))
+    assert get('/metrics') == (500, {'error': 'Erro interno do servidor'})
+
+#===================================================#
+#     Chave do cache de respostas
+#===================================================#
+
+def test_response_key_normalizes_countries_and_ignores_other_params():
+    key = response_key('/restaurants/top', {'countries': 'India,Brazil', 'n': '5'})
+    assert response_key('/restaurants/top', {'n': '5', 'countries': 'Brazil, India,Brazil', 'x': '1'}) == key
+    assert response_key('/restaurants/top', {'countries': 'Brazil', 'n': '5'}) != key
+    assert response_key('/restaurants/top', {'countries': 'Brazil,India', 'n': '6'}) != key
+    assert response_key('/cities/top', {'countries': 'Brazil,India', 'n': '5'}) != key
+
+def test_response_key_without_countries_selects_all():
+    countries = server.country_param({})
+    assert response_key('/metrics', {}) == response_key('/metrics', {'countries': ','.join(countries)})
+    assert response_key('/metrics', {'countries': ''}) != response_key('/metrics', {})
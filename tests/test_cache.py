@@ -0,0 +1,91 @@
+# importando as bibliotecas
+import time
+import threading
+from utils.cache import LRUCache
+
+#===================================================#
+#     Cache LRU limitado por bytes
+#===================================================#
+
+def test_evicts_least_recently_used_first():
+    cache = LRUCache(30)
+    cache.put('a', 'x' * 10)
+    cache.put('b', 'x' * 10)
+    cache.put('c', 'x' * 10)
+
+    # 'a' passa a ser o mais recente: 'b' é o primeiro descartado
+    assert cache.get('a') == 'x' * 10
+    cache.put('d', 'x' * 10)
+    assert cache.get('b') is None
+    assert [key for key in 'acd' if cache.get(key) is not None] == ['a', 'c', 'd']
+
+def test_stays_within_byte_budget():
+    cache = LRUCache(100)
+    for i in range(50):
+        cache.put(i, 'x' * (i % 7 + 1) * 5)
+        assert cache.nbytes <= 100
+
+    # Os itens guardados são os mais recentes que cabem no limite
+    kept = [i for i in range(50) if cache.get(i) is not None]
+    assert kept == list(range(50 - len(kept), 50))
+    assert cache.nbytes == sum((i % 7 + 1) * 5 for i in kept)
+
+def test_replacing_a_key_updates_its_size():
+    cache = LRUCache(100)
+    cache.put('a', 'x' * 60)
+    cache.put('a', 'x' * 10)
+    assert cache.nbytes == 10 and len(cache) == 1
+
+def test_value_larger_than_budget_is_not_stored():
+    cache = LRUCache(10)
+    cache.put('a', 'x' * 5)
+    cache.put('b', 'x' * 11)
+    assert cache.get('b') is None
+    assert cache.get('a') == 'x' * 5 and cache.nbytes == 5
+
+def test_sizeof_is_used_for_the_budget():
+    cache = LRUCache(10, sizeof=lambda value: value['nbytes'])
+    cache.put('a', {'nbytes': 6})
+    cache.put('b', {'nbytes': 6})
+    assert cache.get('a') is None and cache.nbytes == 6
+
+def test_get_or_create_builds_once_for_concurrent_callers():
+    cache = LRUCache(1000)
+    calls = []
+    barrier = threading.Barrier(8)
+
+    def build():
+        calls.append(1)
+        time.sleep(0.05)
+        return 'valor'
+
+    def worker(results):
+        barrier.wait()
+        results.append(cache.get_or_create('key', build))
+
+    results = []
+    threads = [threading.Thread(target=worker, args=(results,)) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1
+    assert results == ['valor'] * 8
+
+def test_get_or_create_builds_different_keys_in_parallel():
+    cache = LRUCache(1000)
+    started = threading.Barrier(2, timeout=5)
+
+    def build(key):
+        # As duas gerações só terminam se estiverem em andamento ao mesmo tempo
+        started.wait()
+        return key
+
+    threads = [threading.Thread(target=cache.get_or_create, args=(key, lambda key=key: build(key)))
+               for key in ['a', 'b']]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert cache.get('a') == 'a' and cache.get('b') == 'b'
@@ -0,0 +1,75 @@
+# importando as bibliotecas
+import shutil
+import pandas as pd
+import pytest
+from utils import distinct
+from utils.loader import load_dataset
+from utils.distinct import DISTINCT_NAMES, distinct_counts, distinct_total, load_distinct_index
+
+#===================================================#
+#     Contagem de distintos por bitsets
+#===================================================#
+
+GROUPINGS = [(['country'], 'city'),
+             (['country'], 'restaurant_id'),
+             (['country', 'city'], 'cuisines'),
+             (['country', 'city'], 'restaurant_id'),
+             (['cuisines'], 'restaurant_id'),
+             (['country', 'cuisines'], 'restaurant_id')]
+
+SELECTIONS = [None, ['Brazil', 'India', 'Qatar'], []]
+
+def selected(df1, countries):
+    """ Esta função retorna os países selecionados (None: todos os países do dataset) """
+    return list(df1['country'].cat.categories) if countries is None else countries
+
+@pytest.fixture(scope='session')
+def sparse_csv(repeated_csv, tmp_path_factory):
+    """ Cópia de repeated_csv, com estruturas pré-calculadas próprias (ver distinct_csv) """
+    path = tmp_path_factory.mktemp('sparse') / 'zomato.csv'
+    shutil.copyfile(repeated_csv, path)
+    return str(path)
+
+@pytest.fixture(params=['bits', 'sparse'])
+def distinct_csv(request, repeated_csv, sparse_csv, monkeypatch):
+    """ CSV contado pelos bitsets ou, com BITSET_MAX_BYTES = 0, pelos índices na forma esparsa """
+    if request.param == 'bits':
+        return repeated_csv
+    monkeypatch.setattr(distinct, 'BITSET_MAX_BYTES', 0)
+    return sparse_csv
+
+def test_repeated_csv_keeps_repeated_restaurant_ids(repeated_csv):
+    # Com IDs repetidos, a contagem de restaurantes difere da contagem de linhas
+    assert not load_dataset(repeated_csv)['restaurant_id'].is_unique
+
+def test_sparse_index_above_bitset_limit(sparse_csv, monkeypatch):
+    monkeypatch.setattr(distinct, 'BITSET_MAX_BYTES', 0)
+    _, index = load_distinct_index(['country', 'city'], 'restaurant_id', 'exact', sparse_csv)
+    assert 'bits' not in index and len(index['offsets']) == len(index['groups']) + 1
+
+@pytest.mark.parametrize('countries', SELECTIONS)
+@pytest.mark.parametrize('by, member', GROUPINGS)
+def test_distinct_counts_match_nunique(distinct_csv, by, member, countries):
+    df1 = load_dataset(distinct_csv)
+    countries = selected(df1, countries)
+    name = DISTINCT_NAMES[member]
+
+    expected = (df1.loc[df1['country'].isin(countries), :]
+                .groupby(by, observed=True)[member]
+                .nunique()
+                .rename(name)
+                .reset_index())
+    result = distinct_counts(countries, by, member, path=distinct_csv)
+
+    merged = expected.astype({col: str for col in by}).merge(
+        result.astype({col: str for col in by}), on=by, how='outer', suffixes=('_nunique', '_bitsets'))
+    assert len(merged) == len(expected)
+    assert (merged[f'{name}_nunique'] == merged[f'{name}_bitsets']).all()
+
+@pytest.mark.parametrize('countries', SELECTIONS)
+@pytest.mark.parametrize('member', ['restaurant_id', 'country', 'city', 'cuisines'])
+def test_distinct_total_matches_nunique(distinct_csv, member, countries):
+    df1 = load_dataset(distinct_csv)
+    countries = selected(df1, countries)
+    expected = df1.loc[df1['country'].isin(countries), member].nunique()
+    assert distinct_total(countries, member, path=distinct_csv) == expected
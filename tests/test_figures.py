@@ -0,0 +1,99 @@
+# importando as bibliotecas
+import pandas as pd
+import pytest
+from utils.figures import COLOR_SEQUENCE, bar_chart, bar_spec, data_hash, figure_cache
+
+#===================================================#
+#     Dados dos gráficos
+#===================================================#
+
+def cities_frame():
+    """ Esta função monta um dataframe agregado como o da página de cidades (cidade, país e quantidade)
+
+        Output: Dataframe
+    """
+    return pd.DataFrame({'city': ['Rio', 'Goa', 'Doha', 'Delhi', 'Santos'],
+                         'country': pd.Categorical(['Brazil', 'India', 'Qatar', 'India', 'Brazil']),
+                         'rows': [40, 35, 20, 18, 7]})
+
+#===================================================#
+#     Hash dos dados
+#===================================================#
+
+def test_data_hash_depends_only_on_the_values():
+    df_aux = cities_frame()
+    # Outro objeto, com outro índice e colunas extras, mas os mesmos valores nas colunas usadas
+    other = cities_frame().set_axis([10, 11, 12, 13, 14]).assign(extra=1)
+    assert data_hash(df_aux, ['city', 'rows']) == data_hash(other, ['city', 'rows'])
+
+def test_data_hash_changes_with_order_values_and_columns():
+    df_aux = cities_frame()
+    key = data_hash(df_aux, ['city', 'rows'])
+
+    assert data_hash(df_aux.iloc[::-1], ['city', 'rows']) != key
+    assert data_hash(df_aux.assign(rows=df_aux['rows'] + 1), ['city', 'rows']) != key
+    assert data_hash(df_aux, ['city', 'rows', 'country']) != key
+    assert data_hash(df_aux.rename(columns={'rows': 'restaurants'}), ['city', 'restaurants']) != key
+
+#===================================================#
+#     Spec do gráfico de barras
+#===================================================#
+
+def test_bar_spec_single_series():
+    df_aux = cities_frame()
+    spec = bar_spec(df_aux, x='city', y='rows', text='rows', width=0.75, marker_color='royalblue',
+                    title='Cidades', title_x=0.5, title_size=20, xaxis_title='Cidade', yaxis_title='Restaurantes')
+
+    assert len(spec['data']) == 1
+    trace = spec['data'][0]
+    assert trace['type'] == 'bar'
+    assert trace['x'] == df_aux['city'].tolist() and trace['y'] == df_aux['rows'].tolist()
+    assert trace['text'] == df_aux['rows'].tolist()
+    assert trace['width'] == 0.75 and trace['marker'] == {'color': 'royalblue'}
+    assert spec['layout']['title'] == {'text': 'Cidades', 'x': 0.5, 'font': {'size': 20}}
+    assert spec['layout']['xaxis']['title'] == {'text': 'Cidade'}
+    assert spec['layout']['yaxis']['title'] == {'text': 'Restaurantes'}
+
+def test_bar_spec_one_series_per_color_in_order_of_appearance():
+    df_aux = cities_frame()
+    spec = bar_spec(df_aux, x='city', y='rows', text='rows', color='country',
+                    labels={'rows': 'Restaurante', 'city': 'Cidade', 'country': 'País'})
+
+    assert [trace['name'] for trace in spec['data']] == ['Brazil', 'India', 'Qatar']
+    assert [trace['x'] for trace in spec['data']] == [['Rio', 'Santos'], ['Goa', 'Delhi'], ['Doha']]
+    assert [trace['y'] for trace in spec['data']] == [[40, 7], [35, 18], [20]]
+    assert [trace['marker']['color'] for trace in spec['data']] == COLOR_SEQUENCE[:3]
+    assert spec['layout']['legend']['title'] == {'text': 'País'}
+    assert spec['layout']['xaxis']['title'] == {'text': 'Cidade'}
+    assert spec['layout']['yaxis']['title'] == {'text': 'Restaurante'}
+
+#===================================================#
+#     Cache de gráficos
+#===================================================#
+
+@pytest.fixture
+def empty_figure_cache():
+    """ Cache de gráficos vazio no início e no fim do teste (os gráficos são construídos com o plotly) """
+    pytest.importorskip('plotly')
+    figure_cache.clear()
+    yield figure_cache
+    figure_cache.clear()
+
+def test_bar_chart_reuses_the_figure_for_the_same_data(empty_figure_cache):
+    params = {'text': 'rows', 'color': 'country', 'title': 'Cidades', 'title_x': 0.5}
+    fig = bar_chart(cities_frame(), x='city', y='rows', **params)
+
+    # Mesmos dados em outro dataframe e parâmetros em outra ordem: o mesmo gráfico
+    other = cities_frame().set_axis([10, 11, 12, 13, 14])
+    assert bar_chart(other, x='city', y='rows', **dict(reversed(params.items()))) is fig
+    assert len(empty_figure_cache) == 1
+    assert empty_figure_cache.nbytes == fig.nbytes
+
+def test_bar_chart_builds_a_new_figure_for_other_data_or_params(empty_figure_cache):
+    df_aux = cities_frame()
+    fig = bar_chart(df_aux, x='city', y='rows', text='rows')
+
+    assert bar_chart(df_aux.iloc[::-1], x='city', y='rows', text='rows') is not fig
+    assert bar_chart(df_aux, x='city', y='rows', text='rows', width=0.75) is not fig
+    assert bar_chart(df_aux, x='city', y='rows', text='rows', color='country') is not fig
+    assert len(empty_figure_cache) == 4
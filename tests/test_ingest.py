@@ -0,0 +1,82 @@
+# importando as bibliotecas
+import os
+import shutil
+import tracemalloc
+import pandas as pd
+import pytest
+from utils.loader import DATASET_PATH, dataset_version, read_clean
+from utils.ingest import ingest_csv
+
+#===================================================#
+#     Leitura paralela
+#===================================================#
+
+@pytest.mark.parametrize('workers', [2, 3])
+@pytest.mark.parametrize('csv', ['zomato', 'repeated'])
+def test_parallel_ingest_matches_single_process(repeated_csv, csv, workers):
+    path = DATASET_PATH if csv == 'zomato' else repeated_csv
+    single_report, parallel_report = {}, {}
+    single, single_rows = read_clean(path, 1, single_report)
+    parallel, parallel_rows = read_clean(path, workers, parallel_report)
+
+    pd.testing.assert_frame_equal(parallel, single)
+    assert parallel_rows == single_rows
+    assert parallel_report == single_report
+
+#===================================================#
+#     Leitura em blocos
+#===================================================#
+
+@pytest.mark.parametrize('chunk_rows', [500, 997, 100000])
+@pytest.mark.parametrize('csv', ['zomato', 'repeated'])
+def test_streaming_ingest_matches_full_read(tmp_path, repeated_csv, read_snapshot_copy, csv, chunk_rows):
+    path = str(tmp_path / 'zomato.csv')
+    shutil.copyfile(DATASET_PATH if csv == 'zomato' else repeated_csv, path)
+
+    result = ingest_csv(path, chunk_rows=chunk_rows)
+    full_report = {}
+    full, rows = read_clean(path, 1, full_report)
+
+    pd.testing.assert_frame_equal(read_snapshot_copy(path, dataset_version(path)), full)
+    assert result['rows'] == rows
+    assert result['report'] == full_report
+
+def distinct_text_csv(path, copies):
+    """ Esta função grava copies cópias de zomato.csv com IDs e textos livres diferentes em cada cópia
+
+        Input: path - Caminho do CSV gerado
+               copies (int) - Quantidade de cópias
+        Output: Caminho do CSV (str)
+    """
+    df = pd.read_csv(DATASET_PATH)
+    text = ['Restaurant Name', 'Address', 'Locality', 'Locality Verbose']
+    frames = []
+    for i in range(copies):
+        frame = df.assign(**{col: df[col] + f' #{i}' for col in text})
+        frame['Restaurant ID'] = frame['Restaurant ID'] + i * 10 ** 8
+        frames.append(frame)
+    pd.concat(frames).to_csv(path, index=False)
+    return str(path)
+
+def test_streaming_ingest_peak_memory_does_not_grow_with_text_values(tmp_path):
+    # Com 4x mais linhas (e valores de texto livre distintos), o pico de memória cresce apenas com os hashes
+    # da remoção de duplicados (8 bytes por linha), e não com os valores de texto
+    peaks = []
+    for copies in [1, 4]:
+        path = distinct_text_csv(tmp_path / f'zomato{copies}.csv', copies)
+        tracemalloc.start()
+        try:
+            ingest_csv(path, chunk_rows=1000)
+            peaks.append(tracemalloc.get_traced_memory()[1])
+        finally:
+            tracemalloc.stop()
+    assert peaks[1] < 1.5 * peaks[0]
+
+def test_streaming_ingest_removes_temporary_files_on_error(tmp_path):
+    path = tmp_path / 'zomato.csv'
+    with open(DATASET_PATH, encoding='utf-8') as f:
+        path.write_text(f.read()[:200000] + '\n"registro sem fim,\n', encoding='utf-8')
+
+    with pytest.raises(pd.errors.ParserError):
+        ingest_csv(str(path), chunk_rows=100)
+    assert sorted(os.listdir(tmp_path)) == ['zomato.csv']
@@ -0,0 +1,124 @@
+# importando as bibliotecas
+import tracemalloc
+import numpy as np
+import pandas as pd
+import pytest
+from benchmarks.memory_checks import chained_clean
+from utils import loader
+from utils.loader import (DATASET_PATH, build_country_index, clean_dataframe, dedup_fingerprints, filter_countries,
+                          load_dataset, mark_repeated, read_clean, resolve_dataset, valid_rows)
+from utils.cube import CUBE_DIMENSIONS, build_cube, load_cube
+
+#===================================================#
+#     Limpeza em máscara única (clean_dataframe)
+#===================================================#
+
+# Pico de memória máximo da limpeza em relação ao tamanho da entrada: o medido em zomato.csv é ~0.28x (a limpeza
+# em etapas, chained_clean, chega a ~0.56x)
+MAX_CLEAN_PEAK_RATIO = 0.35
+
+def traced_peak(func, df):
+    """ Esta função mede o pico de memória alocada (tracemalloc) por func(df) """
+    tracemalloc.start()
+    try:
+        func(df)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+def test_clean_dataframe_matches_chained_clean(read_raw):
+    df = read_raw()
+    pd.testing.assert_frame_equal(clean_dataframe(df.copy()), chained_clean(df.copy()))
+
+def test_clean_dataframe_peak_memory(read_raw):
+    # As colunas de texto são objetos Python (ver raw_frame): a memória do Arrow não é vista pelo tracemalloc
+    df = read_raw()
+    ratio = traced_peak(clean_dataframe, df.copy()) / df.memory_usage(deep=True).sum()
+    assert ratio <= MAX_CLEAN_PEAK_RATIO
+
+def test_clean_dataframe_matches_chained_clean_with_repeated_rows(read_raw, repeated_csv):
+    df = read_raw(repeated_csv)
+    pd.testing.assert_frame_equal(clean_dataframe(df.copy(), dedup='row'), chained_clean(df.copy()))
+
+#===================================================#
+#     Remoção de duplicados pelo hash da chave
+#===================================================#
+
+@pytest.mark.parametrize('dedup, subset', [('row', None), ('restaurant_id', ['restaurant_id'])])
+def test_fingerprints_match_duplicated(read_raw, repeated_csv, dedup, subset):
+    df = read_raw(repeated_csv)
+    expected = df.duplicated(subset=subset).to_numpy()
+    assert (pd.Series(dedup_fingerprints(df, dedup)).duplicated().to_numpy() == expected).all()
+
+@pytest.mark.parametrize('dedup, subset', [('row', None), ('restaurant_id', ['restaurant_id'])])
+def test_clean_dataframe_matches_drop_duplicates(read_raw, repeated_csv, dedup, subset):
+    df = read_raw(repeated_csv)
+    result = clean_dataframe(df.copy(), dedup=dedup)
+
+    df['cuisines'] = df['cuisines'].str.replace(r',.*', '', regex=True)
+    expected = (df.loc[valid_rows(df), :]
+                .drop_duplicates(subset=subset)
+                .rename(columns={'country_code': 'country'}))
+    pd.testing.assert_frame_equal(result, expected)
+
+@pytest.mark.parametrize('chunk_rows', [1, 997, 5000])
+def test_mark_repeated_across_chunks_matches_duplicated(read_raw, repeated_csv, chunk_rows):
+    fingerprints = dedup_fingerprints(read_raw(repeated_csv))
+    seen, masks = [], []
+    for start in range(0, len(fingerprints), chunk_rows):
+        repeated, seen = mark_repeated(fingerprints[start:start + chunk_rows], seen)
+        masks.append(repeated)
+    assert (np.concatenate(masks) == pd.Series(fingerprints).duplicated().to_numpy()).all()
+
+#===================================================#
+#     Filtro de países por blocos (filter_countries)
+#===================================================#
+
+@pytest.mark.parametrize('countries', [['Australia', 'Brazil', 'Canada', 'England', 'India', 'Indonesia',
+                                        'New Zeland', 'Philippines', 'Qatar', 'Singapure', 'South Africa',
+                                        'Sri Lanka', 'Turkey', 'United Arab Emirates', 'United States of America'],
+                                       ['India'],
+                                       ['Brazil', 'Canada'],
+                                       ['Turkey', 'Brazil', 'Qatar', 'India'],
+                                       ['Qatar', 'Qatar', 'Atlantis'],
+                                       []])
+def test_filter_countries_matches_isin(copy_frame, countries):
+    df1 = load_dataset()
+    expected = df1.loc[df1['country'].isin(countries), :]
+    pd.testing.assert_frame_equal(copy_frame(filter_countries(countries)), copy_frame(expected))
+
+def test_country_index_requires_rows_sorted_by_country():
+    df1 = load_dataset()
+    with pytest.raises(ValueError):
+        build_country_index(df1.iloc[::-1])
+
+#===================================================#
+#     Atualização incremental (utils/refresh.py)
+#===================================================#
+
+def sorted_cube(df_cube):
+    """ Esta função ordena o cubo pelas dimensões, com as dimensões como texto, para comparação """
+    return (df_cube.astype({col: str for col in CUBE_DIMENSIONS})
+            .sort_values(CUBE_DIMENSIONS)
+            .reset_index(drop=True))
+
+def test_refresh_matches_full_reload(tmp_path, monkeypatch, read_snapshot_copy):
+    df = pd.read_csv(DATASET_PATH)
+    path = str(tmp_path / 'zomato.csv')
+    df.iloc[:5000].to_csv(path, index=False)
+    load_dataset(path)
+    load_cube(path)
+
+    # Linhas acrescentadas no final, incluindo cópias de linhas já carregadas
+    pd.concat([df.iloc[5000:], df.iloc[:100]]).to_csv(path, mode='a', header=False, index=False)
+
+    def full_reload(*args):
+        raise AssertionError('O CSV foi carregado novamente em vez de atualizado')
+    monkeypatch.setattr(loader, 'read_source', full_reload)
+    version, refreshed = resolve_dataset(path)
+    monkeypatch.undo()
+
+    full, _ = read_clean(path)
+    pd.testing.assert_frame_equal(refreshed, full)
+    pd.testing.assert_frame_equal(read_snapshot_copy(path, version), full)
+    pd.testing.assert_frame_equal(sorted_cube(load_cube(path)), sorted_cube(build_cube(full)))
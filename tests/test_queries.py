@@ -0,0 +1,179 @@
+# importando as bibliotecas
+import pandas as pd
+import pytest
+from utils import queries
+from utils.loader import DATASET_PATH, load_dataset, rating_values
+from utils.queries import (TOP_RESTAURANTS_COLUMNS, aggregate, best_restaurant_by_cuisine, query_cache, ranking,
+                           rating_threshold_counts, top_restaurants)
+
+#===================================================#
+#     Melhor restaurante por culinária
+#===================================================#
+
+BEST_COLUMNS = ['country', 'city', 'restaurant_id', 'restaurant_name', 'average_cost_for_two', 'currency',
+                'aggregate_rating']
+
+def original_best_restaurant(df1, cuisine):
+    """ Esta função é o cálculo original de display_cuisine_metrics (uma ordenação por culinária), usado como
+        referência
+
+        Input: df1 - Dataframe limpo
+               cuisine (str) - Culinária
+        Output: Series com o melhor restaurante da culinária
+    """
+    linhas = df1['cuisines'] == cuisine
+    return (df1.loc[linhas, ['aggregate_rating', 'average_cost_for_two', 'cuisines', 'country', 'currency', 'city',
+                             'restaurant_id', 'restaurant_name']]
+            .groupby(['country', 'city', 'restaurant_id', 'restaurant_name', 'average_cost_for_two', 'currency',
+                      'cuisines'], observed=True)
+            .mean()
+            .sort_values(['aggregate_rating', 'restaurant_id'], ascending=[False, True])
+            .reset_index()
+            .iloc[0])
+
+@pytest.mark.parametrize('csv', ['zomato', 'repeated'])
+def test_best_restaurant_by_cuisine_matches_per_cuisine_sort(repeated_csv, csv):
+    df1 = load_dataset() if csv == 'zomato' else load_dataset(repeated_csv)
+    result = best_restaurant_by_cuisine(df1)
+
+    cuisines = df1['cuisines'].unique().astype(str)
+    assert sorted(result.index) == sorted(cuisines)
+    for cuisine in cuisines:
+        expected = original_best_restaurant(df1, cuisine)
+        best = result.loc[cuisine]
+        for col in BEST_COLUMNS[:-1]:
+            assert best[col] == expected[col], (cuisine, col)
+        assert best['aggregate_rating'] == round(float(expected['aggregate_rating']), 1)
+
+def test_best_restaurant_tie_breaks_on_lowest_restaurant_id():
+    df1 = pd.DataFrame({'cuisines': pd.Categorical(['Pizza', 'Pizza', 'Pizza', 'Sushi', 'Sushi']),
+                        'country': pd.Categorical(['Brazil', 'India', 'Qatar', 'Brazil', 'India']),
+                        'city': pd.Categorical(['Rio', 'Goa', 'Doha', 'Rio', 'Goa']),
+                        'restaurant_id': [30, 10, 20, 5, 7],
+                        'restaurant_name': ['C', 'A', 'B', 'D', 'E'],
+                        'average_cost_for_two': [100, 200, 300, 400, 500],
+                        'currency': pd.Categorical(['BRL', 'INR', 'QAR', 'BRL', 'INR']),
+                        'aggregate_rating': pd.Series([4.9, 4.9, 4.2, 3.1, 3.1], dtype='float32')})
+    result = best_restaurant_by_cuisine(df1)
+
+    # Empate em 4.9 (IDs 30 e 10) e em 3.1 (IDs 5 e 7): fica o menor ID
+    assert result.loc['Pizza', 'restaurant_id'] == 10
+    assert result.loc['Sushi', 'restaurant_id'] == 5
+    assert result['aggregate_rating'].tolist() == rating_values(pd.Series([4.9, 3.1], dtype='float32')).tolist()
+
+#===================================================#
+#     Melhores restaurantes (ordem pré-calculada)
+#===================================================#
+
+def original_top_restaurants(df1, n):
+    """ Esta função é a tabela original de display_top_restaurants (agrupamento e ordenação completa), usada
+        como referência
+
+        Input: df1 - Dataframe limpo filtrado
+               n (int) - Quantidade de restaurantes
+        Output: Dataframe com os n melhores restaurantes
+    """
+    df_aux = (df1.loc[:, TOP_RESTAURANTS_COLUMNS]
+              .groupby(TOP_RESTAURANTS_COLUMNS[:-1], observed=True)
+              .sum()
+              .reset_index())
+    df_aux['aggregate_rating'] = rating_values(df_aux['aggregate_rating'])
+    return (df_aux.sort_values(['aggregate_rating', 'restaurant_id'], ascending=[False, True])
+            .reset_index(drop=True)
+            .head(n))
+
+# Entre as 1024 primeiras posições da ordem global (o primeiro bloco percorrido) há 5 linhas do Sri Lanka e 10
+# do Qatar: com n >= 10 a busca dobra o bloco até passar de n restaurantes, ou percorre a ordem inteira quando a
+# seleção tem menos de n (n = 100)
+@pytest.mark.parametrize('countries', [None, ['Sri Lanka'], ['Qatar'], ['Qatar', 'Sri Lanka'], ['India'], []])
+@pytest.mark.parametrize('n', [1, 10, 20, 100])
+@pytest.mark.parametrize('csv', ['zomato', 'repeated'])
+def test_top_restaurants_matches_full_sort(repeated_csv, csv, n, countries):
+    path = DATASET_PATH if csv == 'zomato' else repeated_csv
+    df1 = load_dataset(path)
+    countries = list(df1['country'].cat.categories) if countries is None else countries
+
+    result = top_restaurants(countries, n, path)
+    expected = original_top_restaurants(df1.loc[df1['country'].isin(countries), :], n)
+
+    as_text = {col: str for col in ['restaurant_name', 'country', 'city', 'cuisines']}
+    pd.testing.assert_frame_equal(result.astype(as_text), expected.astype(as_text), check_dtype=False)
+
+#===================================================#
+#     Agregados memorizados e compartilhados
+#===================================================#
+
+@pytest.fixture
+def rollups(monkeypatch):
+    """ Lista com as dimensões de cada consolidação do cubo feita a partir do teste (cache de consultas vazio) """
+    calls = []
+    rollup = queries.rollup
+
+    def counted(df_cube, by):
+        calls.append(tuple(by))
+        return rollup(df_cube, by)
+
+    query_cache.clear()
+    monkeypatch.setattr(queries, 'rollup', counted)
+    return calls
+
+def test_aggregate_is_computed_once_per_selection(rollups):
+    first = aggregate(['Brazil', 'India'], 'country')
+    assert aggregate(['India', 'Brazil', 'India'], ['country']) is first
+    assert rollups == [('country',)]
+
+    aggregate(['Brazil'], 'country')
+    aggregate(['Brazil', 'India'], ['country', 'city'])
+    assert rollups == [('country',), ('country',), ('country', 'city')]
+
+def test_ranking_shares_the_aggregate(rollups):
+    best, worst = ranking(['Brazil', 'India'], 'cuisines', 'aggregate_rating', 5)
+    df_aux = aggregate(['India', 'Brazil'], 'cuisines')
+    assert ranking(['Brazil', 'India'], 'cuisines', 'aggregate_rating', 5)[0] is best
+    assert rollups == [('cuisines',)]
+    assert best['aggregate_rating'].tolist() == df_aux['aggregate_rating'].nlargest(5).tolist()
+    assert worst['aggregate_rating'].tolist() == df_aux['aggregate_rating'].nsmallest(5).tolist()
+
+def test_aggregate_matches_groupby(rollups):
+    df1 = load_dataset()
+    countries = ['Brazil', 'India', 'Qatar']
+    df_aux = aggregate(countries, 'country').set_index('country')
+
+    expected = df1.loc[df1['country'].isin(countries), :].groupby('country', observed=True)
+    assert (df_aux['rows'] == expected.size()).all()
+    assert (df_aux['votes'] == expected['votes'].sum()).all()
+    assert ((df_aux['aggregate_rating'] - expected['aggregate_rating'].mean()).abs() < 1e-6).all()
+
+def test_aggregate_is_recomputed_for_a_new_dataset_version(tmp_path, rollups):
+    path = str(tmp_path / 'zomato.csv')
+    df = pd.read_csv(DATASET_PATH)
+    df.iloc[:5000].to_csv(path, index=False)
+    before = aggregate(['India'], 'country', path)
+
+    df.iloc[5000:].to_csv(path, mode='a', header=False, index=False)
+    after = aggregate(['India'], 'country', path)
+    assert rollups == [('country',), ('country',)]
+    assert after['rows'].sum() > before['rows'].sum()
+
+#===================================================#
+#     Contagens por limite de avaliação (histogramas)
+#===================================================#
+
+# Limites nas bordas das faixas do histograma (0.0, 5.0 e valores presentes no dataset, como 4.0)
+@pytest.mark.parametrize('above, below', [(4.0, 2.5), (4.0, 0.0), (4.0, 5.0), (0.0, 5.0), (5.0, 0.0),
+                                          (4.9, 0.1), (2.5, 4.0), (3.7, 3.7)])
+@pytest.mark.parametrize('countries', [None, ['Brazil', 'India', 'Qatar']])
+def test_rating_threshold_counts_match_direct_counts(above, below, countries):
+    df1 = load_dataset()
+    countries = list(df1['country'].cat.categories) if countries is None else countries
+    df_aux = df1.loc[df1['country'].isin(countries), ['country', 'city']].assign(
+        rating=rating_values(df1['aggregate_rating']))
+
+    expected = (df_aux.groupby(['country', 'city'], observed=True)['rating']
+                .agg(above=lambda rating: int((rating > above).sum()),
+                     below=lambda rating: int((rating < below).sum()))
+                .reset_index())
+    result = rating_threshold_counts(countries, above=above, below=below)
+
+    as_text = {'country': str, 'city': str}
+    pd.testing.assert_frame_equal(result.astype(as_text), expected.astype(as_text), check_dtype=False)
@@ -0,0 +1,102 @@
+# importando as bibliotecas
+import threading
+from collections import OrderedDict
+
+#===================================================#
+#     Cache LRU limitado por bytes
+#===================================================#
+
+class LRUCache:
+    """ Cache compartilhado (entre sessões e threads) com limite de tamanho em bytes e descarte LRU
+
+         Quando a soma dos tamanhos dos valores ultrapassa max_bytes, os itens usados há mais tempo são
+         descartados. Um valor maior que o próprio limite não é armazenado.
+
+        Input: max_bytes (int) - Limite de tamanho do cache em bytes
+               sizeof - Função que retorna o tamanho em bytes de um valor (padrão: len)
+    """
+
+    def __init__(self, max_bytes, sizeof=len):
+        self.max_bytes = max_bytes
+        self.sizeof = sizeof
+        self.hits = 0
+        self.misses = 0
+        self._items = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._building = {}
+
+    def __len__(self):
+        return len(self._items)
+
+    @property
+    def nbytes(self):
+        """ Tamanho total, em bytes, dos valores armazenados """
+        return self._bytes
+
+    def get(self, key, default=None):
+        """ Esta função retorna o valor da chave (marcando-o como usado recentemente) ou default
+
+            Input: key - Chave do valor
+                   default - Valor retornado quando a chave não está no cache
+            Output: Valor armazenado ou default
+        """
+        with self._lock:
+            if key not in self._items:
+                self.misses += 1
+                return default
+            self.hits += 1
+            self._items.move_to_end(key)
+            return self._items[key][0]
+
+    def put(self, key, value):
+        """ Esta função armazena o valor na chave, descartando os itens usados há mais tempo se necessário
+
+            Input: key - Chave do valor
+                   value - Valor a ser armazenado
+            Output: None
+        """
+        size = self.sizeof(value)
+        with self._lock:
+            if key in self._items:
+                self._bytes -= self._items.pop(key)[1]
+            if size > self.max_bytes:
+                return
+            self._items[key] = (value, size)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                _, (_, old_size) = self._items.popitem(last=False)
+                self._bytes -= old_size
+
+    def get_or_create(self, key, builder):
+        """ Esta função retorna o valor da chave, gerando-o com builder() e armazenando-o quando ausente
+
+             Sessões que pedem a mesma chave ao mesmo tempo aguardam uma única geração do valor.
+
+            Input: key - Chave do valor
+                   builder - Função sem argumentos que gera o valor
+            Output: Valor armazenado ou gerado
+        """
+        missing = object()
+        value = self.get(key, missing)
+        if value is not missing:
+            return value
+
+        with self._lock:
+            key_lock = self._building.setdefault(key, threading.Lock())
+        try:
+            with key_lock:
+                value = self.get(key, missing)
+                if value is missing:
+                    value = builder()
+                    self.put(key, value)
+        finally:
+            with self._lock:
+                self._building.pop(key, None)
+        return value
+
+    def clear(self):
+        """ Esta função remove todos os itens do cache """
+        with self._lock:
+            self._items.clear()
+            self._bytes = 0
@@ -0,0 +1,167 @@
+# importando as bibliotecas
+import numpy as np
+import pandas as pd
+from utils.loader import DATASET_PATH, load_artifact, rating_values, register_merger
+from utils.instrumentation import timed
+
+# Dimensões do cubo de agregados
+CUBE_DIMENSIONS = ['country', 'city', 'cuisines']
+
+# Faixas do histograma de avaliações por cidade: 0.0 a 5.0 em passos de 0.1
+RATING_BINS = 51
+
+#===================================================#
+#     Funções
+#===================================================#
+
+def build_cube(df1):
+    """ Esta função calcula o cubo de agregados parciais no grão (país, cidade, culinária)
+
+         Cada célula do cubo guarda agregados que podem ser somados entre células:
+
+         - rows: quantidade de linhas (denominador das médias)
+         - rating_sum / rating_sumsq: soma e soma dos quadrados de 'aggregate_rating'
+         - cost_sum / cost_sumsq: soma e soma dos quadrados de 'average_cost_for_two'
+         - votes: soma de 'votes'
+
+         As contagens de restaurantes, cidades e culinárias distintas de um recorte não podem ser somadas
+         entre células e ficam nos bitsets de utils/distinct.py (ver queries.aggregate).
+
+        Input: Dataframe limpo
+        Output: Dataframe com uma linha por combinação (país, cidade, culinária) existente
+    """
+    rating = rating_values(df1['aggregate_rating'])
+    cost = df1['average_cost_for_two'].astype('float64')
+
+    df_aux = pd.DataFrame({'country': df1['country'],
+                           'city': df1['city'],
+                           'cuisines': df1['cuisines'],
+                           'rating_sum': rating,
+                           'rating_sumsq': rating ** 2,
+                           'cost_sum': cost,
+                           'cost_sumsq': cost ** 2,
+                           'votes': df1['votes'].astype('int64')})
+
+    return (df_aux.groupby(CUBE_DIMENSIONS, observed=True)
+            .agg(rows=('rating_sum', 'size'),
+                 rating_sum=('rating_sum', 'sum'),
+                 rating_sumsq=('rating_sumsq', 'sum'),
+                 cost_sum=('cost_sum', 'sum'),
+                 cost_sumsq=('cost_sumsq', 'sum'),
+                 votes=('votes', 'sum'))
+            .reset_index())
+
+def merge_cubes(cubes):
+    """ Esta função soma cubos de agregados parciais (ex: de blocos diferentes do CSV) em um único cubo
+
+         As células com as mesmas dimensões são somadas; o resultado é igual ao cubo calculado de uma vez
+         sobre todas as linhas, a menos de arredondamentos de ponto flutuante nas somas.
+
+        Input: cubes (list) - Cubos de agregados (ver build_cube)
+        Output: Cubo de agregados com as dimensões como texto, em ordem alfabética
+    """
+    df_aux = pd.concat(cubes, ignore_index=True)
+    df_aux[CUBE_DIMENSIONS] = df_aux[CUBE_DIMENSIONS].astype(str)
+    return df_aux.groupby(CUBE_DIMENSIONS).sum().reset_index()
+
+def append_cube(df_cube, df_new, df1):
+    """ Esta função atualiza o cubo de agregados com as linhas acrescentadas ao CSV (ver utils/refresh.py)
+
+        Input: df_cube - Cubo de agregados da versão anterior
+               df_new - Linhas novas limpas
+               df1 - Dataframe limpo atualizado
+        Output: Cubo de agregados com as mesmas categorias do dataframe atualizado
+    """
+    df_aux = merge_cubes([df_cube, build_cube(df_new)])
+    for col in CUBE_DIMENSIONS:
+        df_aux[col] = df_aux[col].astype(df1[col].dtype)
+    return df_aux
+
+register_merger('cube', append_cube)
+
+def load_cube(path=DATASET_PATH, dataset=None):
+    """ Esta função retorna o cubo de agregados do dataset, calculado uma única vez por versão do CSV
+
+        Input: path (str) - Caminho do arquivo CSV
+               dataset (tuple) - Versão e dataframe retornados por loader.resolve_dataset (padrão: carregados agora)
+        Output: Cubo de agregados (ver build_cube)
+    """
+    return load_artifact('cube', build_cube, path, dataset)
+
+@timed()
+def filter_cube(country_options, path=DATASET_PATH, dataset=None):
+    """ Esta função aplica o filtro de países ao cubo de agregados
+
+        Input: country_options (list) - Países selecionados
+               path (str) - Caminho do arquivo CSV
+               dataset (tuple) - Versão e dataframe retornados por loader.resolve_dataset (padrão: carregados agora)
+        Output: Células do cubo dos países selecionados
+    """
+    cube = load_cube(path, dataset)
+    return cube.loc[cube['country'].isin(country_options), :]
+
+@timed()
+def rollup(df_cube, by):
+    """ Esta função consolida as células do cubo nas dimensões informadas
+
+         Métricas calculadas para cada grupo:
+
+         - rows: quantidade de linhas (a quantidade de restaurantes distintos é calculada em queries.aggregate)
+         - aggregate_rating / aggregate_rating_std: média e desvio padrão da avaliação
+         - average_cost_for_two / average_cost_for_two_std: média e desvio padrão do preço para dois
+         - votes: total de avaliações
+
+        Input: df_cube - Células do cubo (ver build_cube / filter_cube)
+               by (str ou list) - Dimensões do agrupamento
+        Output: Dataframe com uma linha por grupo
+    """
+    by = [by] if isinstance(by, str) else list(by)
+
+    aggregations = {'rows': ('rows', 'sum'),
+                    'rating_sum': ('rating_sum', 'sum'),
+                    'rating_sumsq': ('rating_sumsq', 'sum'),
+                    'cost_sum': ('cost_sum', 'sum'),
+                    'cost_sumsq': ('cost_sumsq', 'sum'),
+                    'votes': ('votes', 'sum')}
+
+    df_aux = df_cube.groupby(by, observed=True).agg(**aggregations).reset_index()
+
+    # Médias e desvios padrão a partir das somas parciais
+    n = df_aux['rows']
+    for col, prefix in [('aggregate_rating', 'rating'), ('average_cost_for_two', 'cost')]:
+        mean = df_aux[f'{prefix}_sum'] / n
+        variance = (df_aux[f'{prefix}_sumsq'] - n * mean ** 2) / (n - 1)
+        df_aux[col] = mean
+        df_aux[f'{col}_std'] = np.sqrt(variance.clip(lower=0))
+
+    return df_aux.drop(columns=['rating_sum', 'rating_sumsq', 'cost_sum', 'cost_sumsq'])
+
+def build_rating_histogram(df1):
+    """ Esta função calcula o histograma acumulado das avaliações de cada (país, cidade)
+
+         As avaliações são agrupadas em faixas de 0.1 (RATING_BINS faixas de 0.0 a 5.0). A posição k da
+         linha de uma cidade guarda a quantidade de restaurantes com avaliação menor ou igual a k / 10,
+         de modo que contagens acima ou abaixo de qualquer limite saem de uma única leitura por cidade.
+
+        Input: Dataframe limpo
+        Output: Dicionário com as cidades ('groups', Dataframe com país e cidade) e a matriz de contagens
+                acumuladas ('cumulative', uma linha por cidade e uma coluna por faixa)
+    """
+    grouped = df1.groupby(['country', 'city'], observed=True)
+    groups = grouped.size().index.to_frame(index=False)
+    codes = grouped.ngroup().to_numpy()
+
+    bins = np.rint(rating_values(df1['aggregate_rating']).to_numpy() * 10).astype('int64')
+    counts = np.bincount(codes * RATING_BINS + bins, minlength=len(groups) * RATING_BINS)
+
+    return {'groups': groups, 'cumulative': counts.reshape(len(groups), RATING_BINS).cumsum(axis=1)}
+
+def load_rating_histogram(path=DATASET_PATH, dataset=None):
+    """ Esta função retorna o histograma acumulado das avaliações por cidade, calculado uma única vez por
+        versão do CSV
+
+        Input: path (str) - Caminho do arquivo CSV
+               dataset (tuple) - Versão e dataframe retornados por loader.resolve_dataset (padrão: carregados agora)
+        Output: Histograma acumulado (ver build_rating_histogram)
+    """
+    return load_artifact('rating_histogram', build_rating_histogram, path, dataset)
@@ -0,0 +1,269 @@
+# importando as bibliotecas
+import os
+import numpy as np
+import pandas as pd
+from utils.loader import DATASET_PATH, load_artifact, resolve_dataset
+from utils.instrumentation import timed
+
+# Modos de contagem de valores distintos ('auto' escolhe pelo número de valores distintos da coluna)
+DISTINCT_MODES = ['auto', 'exact', 'hll']
+
+# Modo padrão das contagens, configurável pela variável de ambiente FOME_ZERO_DISTINCT_MODE. O padrão é a
+# contagem exata: as estimativas HyperLogLog ('hll', ou 'auto' em colunas com muitos valores distintos)
+# são aproximadas e precisam ser pedidas explicitamente
+DISTINCT_MODE = os.environ.get('FOME_ZERO_DISTINCT_MODE', 'exact')
+
+# Acima desta quantidade de valores distintos o modo 'auto' (opcional) usa HyperLogLog no lugar dos bitsets
+HLL_THRESHOLD = 1000000
+
+# Maior tamanho (em bytes) da matriz de bitsets de uma contagem, configurável pela variável de ambiente
+# FOME_ZERO_BITSET_MAX_BYTES. Acima dele (ex: restaurant_id de um dataset grande, com muitos grupos) cada grupo
+# guarda a lista ordenada dos seus valores (ver build_bitsets), com a mesma contagem exata
+BITSET_MAX_BYTES = int(os.environ.get('FOME_ZERO_BITSET_MAX_BYTES', 64 * 1024 * 1024))
+
+# Precisão do HyperLogLog: 2 ** HLL_PRECISION registradores por grupo (erro padrão ~1.6%)
+HLL_PRECISION = 12
+
+# Nome da coluna de contagem de cada coluna contada
+DISTINCT_NAMES = {'restaurant_id': 'restaurants',
+                  'country': 'countries',
+                  'city': 'cities',
+                  'cuisines': 'cuisine_types'}
+
+# Quantidade de bits ligados em cada byte
+POPCOUNT = np.array([bin(i).count('1') for i in range(256)], dtype='uint8')
+
+#===================================================#
+#     Funções
+#===================================================#
+
+def member_codes(values):
+    """ Esta função converte os valores de uma coluna em códigos inteiros de 0 a n - 1
+
+        Input: values - Coluna do dataframe (categórica ou não)
+        Output: Tupla (códigos por linha, valores distintos)
+    """
+    if hasattr(values, 'cat'):
+        return values.cat.codes.to_numpy().astype('int64'), values.cat.categories
+    codes, uniques = pd.factorize(values)
+    return codes.astype('int64'), pd.Index(uniques)
+
+def group_codes(df1, by):
+    """ Esta função numera os grupos de by na ordem do groupby
+
+        Input: df1 - Dataframe
+               by (list) - Dimensões do agrupamento (a primeira é sempre 'country')
+        Output: Tupla (código do grupo por linha, Dataframe com as chaves dos grupos)
+    """
+    grouped = df1.groupby(by, observed=True)
+    return grouped.ngroup().to_numpy(), grouped.size().index.to_frame(index=False)
+
+def build_bitsets(df1, by, member):
+    """ Esta função calcula, para cada grupo de by, o bitset dos valores de member presentes no grupo
+
+         O bit i da linha de um grupo está ligado quando o valor de código i de member aparece no grupo.
+         Os bitsets são guardados em bytes (8 valores por byte), e a quantidade de valores distintos de um
+         recorte é a contagem de bits ligados do OU entre as linhas dos grupos selecionados.
+
+         Quando a matriz passaria de BITSET_MAX_BYTES (grupos x valores / 8), o índice fica na forma esparsa:
+         os códigos distintos de cada grupo em ordem crescente, um grupo após o outro ('members'), e o início
+         de cada grupo nessa lista ('offsets'). O tamanho passa a ser proporcional aos pares (grupo, valor)
+         existentes, e a contagem de um recorte é a quantidade de códigos distintos dos grupos selecionados.
+
+        Input: df1 - Dataframe limpo
+               by (list) - Dimensões do agrupamento
+               member (str) - Coluna contada
+        Output: Dicionário com as chaves dos grupos ('groups') e a matriz de bitsets ('bits') ou, na forma
+                esparsa, os códigos ('members'), o início de cada grupo ('offsets', len(groups) + 1 posições)
+                e a quantidade de valores de member ('size')
+    """
+    codes, groups = group_codes(df1, by)
+    members, uniques = member_codes(df1[member])
+
+    if len(groups) * ((len(uniques) + 7) // 8) > BITSET_MAX_BYTES:
+        # Pares (grupo, código) distintos, ordenados por grupo e código
+        pairs = np.unique(codes * len(uniques) + members)
+        return {'groups': groups,
+                'members': pairs % len(uniques),
+                'offsets': np.searchsorted(pairs // len(uniques), np.arange(len(groups) + 1)),
+                'size': len(uniques)}
+
+    bits = np.zeros((len(groups), (len(uniques) + 7) // 8), dtype='uint8')
+    np.bitwise_or.at(bits, (codes, members >> 3), (0x80 >> (members & 7)).astype('uint8'))
+    return {'groups': groups, 'bits': bits}
+
+def sparse_members(index, linhas):
+    """ Esta função junta os códigos dos grupos selecionados de um índice na forma esparsa (ver build_bitsets)
+
+        Input: index - Índice esparso
+               linhas - Array booleano com os grupos selecionados
+        Output: Tupla (posição do grupo entre os selecionados, código) com um item por código
+    """
+    starts = index['offsets'][:-1][linhas]
+    lengths = index['offsets'][1:][linhas] - starts
+    positions = np.repeat(np.arange(len(lengths)), lengths)
+
+    # Posição de cada código na lista do índice: início do grupo + posição dentro do grupo
+    take = np.arange(lengths.sum()) - np.repeat(np.cumsum(lengths) - lengths - starts, lengths)
+    return positions, index['members'][take]
+
+def bit_length(values):
+    """ Esta função calcula a quantidade de bits significativos de cada valor (inteiros sem sinal)
+
+        Input: values - Array uint64
+        Output: Array int64 com a quantidade de bits (0 para o valor 0)
+    """
+    length = np.zeros(values.shape, dtype='int64')
+    for shift in [32, 16, 8, 4, 2, 1]:
+        linhas = values >= np.uint64(1 << shift)
+        values = np.where(linhas, values >> np.uint64(shift), values)
+        length += linhas * shift
+    return length + (values > 0)
+
+def build_hll(df1, by, member):
+    """ Esta função calcula, para cada grupo de by, os registradores HyperLogLog dos valores de member
+
+         Cada valor é transformado em um hash de 64 bits: os HLL_PRECISION primeiros bits escolhem o
+         registrador e o registrador guarda a maior posição do primeiro bit ligado no restante do hash.
+         Registradores de grupos diferentes são combinados pelo máximo.
+
+        Input: df1 - Dataframe limpo
+               by (list) - Dimensões do agrupamento
+               member (str) - Coluna contada
+        Output: Dicionário com as chaves dos grupos ('groups') e a matriz de registradores ('registers')
+    """
+    codes, groups = group_codes(df1, by)
+    members, uniques = member_codes(df1[member])
+
+    # Hash de cada valor distinto, repetido para as linhas pelo código do valor
+    hashes = pd.util.hash_array(np.asarray(uniques, dtype=object))[members]
+
+    rest_bits = 64 - HLL_PRECISION
+    index = (hashes >> np.uint64(rest_bits)).astype('int64')
+    rest = hashes & np.uint64((1 << rest_bits) - 1)
+    rank = (rest_bits - bit_length(rest) + 1).astype('uint8')
+
+    registers = np.zeros((len(groups), 1 << HLL_PRECISION), dtype='uint8')
+    np.maximum.at(registers, (codes, index), rank)
+    return {'groups': groups, 'registers': registers}
+
+def hll_estimate(registers):
+    """ Esta função estima a quantidade de valores distintos a partir dos registradores HyperLogLog
+
+        Input: registers - Matriz de registradores (uma linha por grupo)
+        Output: Array com a estimativa de cada linha
+    """
+    m = registers.shape[1]
+    alpha = 0.7213 / (1 + 1.079 / m)
+    estimate = alpha * m * m / np.power(2.0, -registers.astype('float64')).sum(axis=1)
+
+    # Correção para poucos valores distintos (contagem linear dos registradores vazios)
+    zeros = (registers == 0).sum(axis=1)
+    linear = m * np.log(m / np.maximum(zeros, 1))
+    return np.rint(np.where((estimate <= 2.5 * m) & (zeros > 0), linear, estimate)).astype('int64')
+
+def resolve_mode(member, mode, path=DATASET_PATH, dataset=None):
+    """ Esta função escolhe entre bitsets ('exact') e HyperLogLog ('hll') para a coluna contada
+
+        Input: member (str) - Coluna contada
+               mode (str) - Modo pedido (DISTINCT_MODES)
+               path (str) - Caminho do arquivo CSV
+               dataset (tuple) - Versão e dataframe retornados por loader.resolve_dataset (padrão: carregados agora)
+        Output: 'exact' ou 'hll'
+    """
+    if mode not in DISTINCT_MODES:
+        raise ValueError(f'Modo de contagem inválido: {mode!r} (use um de {DISTINCT_MODES})')
+    if mode != 'auto':
+        return mode
+
+    cardinality = load_artifact(f'cardinality:{member}', lambda df1: len(member_codes(df1[member])[1]), path,
+                                dataset)
+    return 'hll' if cardinality > HLL_THRESHOLD else 'exact'
+
+def load_distinct_index(by, member, mode=DISTINCT_MODE, path=DATASET_PATH, dataset=None):
+    """ Esta função retorna os bitsets ou registradores HyperLogLog de (by, member), calculados uma única
+        vez por versão do CSV
+
+        Input: by (list) - Dimensões do agrupamento
+               member (str) - Coluna contada
+               mode (str) - Modo de contagem (DISTINCT_MODES)
+               path (str) - Caminho do arquivo CSV
+               dataset (tuple) - Versão e dataframe retornados por loader.resolve_dataset (padrão: carregados agora)
+        Output: Tupla (modo usado, índice de build_bitsets ou build_hll)
+    """
+    dataset = resolve_dataset(path) if dataset is None else dataset
+    mode = resolve_mode(member, mode, path, dataset)
+    builder = build_hll if mode == 'hll' else build_bitsets
+    name = f'distinct:{mode}:{",".join(by)}:{member}'
+    return mode, load_artifact(name, lambda df1: builder(df1, by, member), path, dataset)
+
+@timed()
+def distinct_counts(country_options, by, member, mode=DISTINCT_MODE, path=DATASET_PATH, dataset=None):
+    """ Esta função conta os valores distintos de member em cada grupo de by nos países selecionados
+
+         Quando by não começa por 'country' (ex: culinárias), os bitsets são calculados por país e grupo,
+         e as linhas do mesmo grupo nos países selecionados são combinadas (OU dos bitsets, máximo dos
+         registradores HyperLogLog, união das listas de códigos da forma esparsa).
+
+        Input: country_options (list) - Países selecionados
+               by (str ou list) - Dimensões do agrupamento
+               member (str) - Coluna contada
+               mode (str) - Modo de contagem (DISTINCT_MODES)
+               path (str) - Caminho do arquivo CSV
+               dataset (tuple) - Versão e dataframe retornados por loader.resolve_dataset (padrão: carregados agora)
+        Output: Dataframe com as dimensões de by e a contagem (coluna DISTINCT_NAMES[member])
+    """
+    by = [by] if isinstance(by, str) else list(by)
+    index_by = by if by[0] == 'country' else ['country'] + by
+    mode, index = load_distinct_index(index_by, member, mode, path, dataset)
+    linhas = index['groups']['country'].isin(country_options).to_numpy()
+
+    df_aux = index['groups'].loc[linhas, :].reset_index(drop=True)
+    sparse = 'members' in index
+    if sparse:
+        positions, values = sparse_members(index, linhas)
+    else:
+        values = index['registers' if mode == 'hll' else 'bits'][linhas]
+    if index_by != by and len(df_aux):
+        # Linhas do mesmo grupo em países diferentes, combinadas
+        codes, df_aux = group_codes(df_aux, by)
+        if sparse:
+            positions = codes[positions]
+        else:
+            order = np.argsort(codes, kind='stable')
+            starts = np.flatnonzero(np.diff(codes[order], prepend=-1))
+            values = (np.maximum if mode == 'hll' else np.bitwise_or).reduceat(values[order], starts, axis=0)
+    elif index_by != by:
+        df_aux = df_aux.loc[:, by]
+
+    if mode == 'hll':
+        df_aux[DISTINCT_NAMES.get(member, member)] = hll_estimate(values)
+    elif sparse:
+        # Pares (grupo, código) distintos contados por grupo
+        pairs = np.unique(positions * index['size'] + values)
+        df_aux[DISTINCT_NAMES.get(member, member)] = np.bincount(pairs // index['size'], minlength=len(df_aux))
+    else:
+        df_aux[DISTINCT_NAMES.get(member, member)] = POPCOUNT[values].sum(axis=1, dtype='int64')
+    return df_aux
+
+@timed()
+def distinct_total(country_options, member, mode=DISTINCT_MODE, path=DATASET_PATH, dataset=None):
+    """ Esta função conta os valores distintos de member no conjunto dos países selecionados
+
+        Input: country_options (list) - Países selecionados
+               member (str) - Coluna contada
+               mode (str) - Modo de contagem (DISTINCT_MODES)
+               path (str) - Caminho do arquivo CSV
+               dataset (tuple) - Versão e dataframe retornados por loader.resolve_dataset (padrão: carregados agora)
+        Output: Quantidade de valores distintos (int)
+    """
+    mode, index = load_distinct_index(['country'], member, mode, path, dataset)
+    linhas = index['groups']['country'].isin(country_options).to_numpy()
+
+    if mode == 'hll':
+        registers = index['registers'][linhas].max(axis=0, initial=0)
+        return int(hll_estimate(registers[np.newaxis, :])[0])
+    if 'members' in index:
+        return len(np.unique(sparse_members(index, linhas)[1]))
+    bits = np.bitwise_or.reduce(index['bits'][linhas], axis=0)
+    return int(POPCOUNT[bits].sum(dtype='int64'))
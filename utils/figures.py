@@ -0,0 +1,115 @@
+# importando as bibliotecas
+import os
+import json
+import hashlib
+import pandas as pd
+from utils.cache import LRUCache
+from utils.instrumentation import timed
+
+# Limite (em bytes) do cache de gráficos, configurável pela variável de ambiente FOME_ZERO_FIGURE_CACHE_BYTES
+FIGURE_CACHE_BYTES = int(os.environ.get('FOME_ZERO_FIGURE_CACHE_BYTES', 16 * 1024 * 1024))
+
+# Sequência de cores das barras agrupadas por cor (a mesma do tema padrão do plotly, usada pelo plotly express)
+COLOR_SEQUENCE = ['#636efa', '#EF553B', '#00cc96', '#ab63fa', '#FFA15A',
+                  '#19d3f3', '#FF6692', '#B6E880', '#FF97FF', '#FECB52']
+
+# Cache do processo com os gráficos prontos, compartilhado entre as sessões (tamanho do JSON do spec de cada
+# gráfico, calculado uma única vez na construção, ver utils/spec_figure.py)
+figure_cache = LRUCache(FIGURE_CACHE_BYTES, sizeof=lambda fig: fig.nbytes)
+
+#===================================================#
+#     Funções
+#===================================================#
+
+def data_hash(df_aux, columns):
+    """ Esta função calcula o hash dos dados de um gráfico (valores e ordem das linhas das colunas usadas)
+
+        Input: df_aux - Dataframe agregado
+               columns (list) - Colunas usadas no gráfico
+        Output: Hash (str)
+    """
+    hashes = pd.util.hash_pandas_object(df_aux.loc[:, columns], index=False).to_numpy()
+    return hashlib.sha1(hashes.tobytes() + json.dumps(columns).encode()).hexdigest()
+
+def bar_spec(df_aux, x, y, text=None, color=None, labels=None, title=None, title_x=None, title_size=None,
+             xaxis_title=None, yaxis_title=None, width=None, marker_color=None):
+    """ Esta função monta o dicionário (spec) de um gráfico de barras verticais diretamente, sem o plotly express
+
+         Sem color, o gráfico tem uma única série, como go.Figure(data=[go.Bar(...)]). Com color, uma série
+         por valor de color (na ordem em que aparecem), com as cores, legenda e textos de px.bar.
+
+        Input: df_aux - Dataframe agregado
+               x, y (str) - Colunas dos eixos
+               text (str) - Coluna do texto das barras (opcional)
+               color (str) - Coluna que agrupa as barras por cor (opcional)
+               labels (dict) - Nomes exibidos das colunas (como em px.bar)
+               title (str), title_x (float), title_size (int) - Título, posição e tamanho da fonte do título
+               xaxis_title, yaxis_title (str) - Títulos dos eixos (padrão com color: labels de x e y)
+               width (float) - Largura das barras (opcional)
+               marker_color (str) - Cor das barras sem color (opcional)
+        Output: Dicionário com 'data' e 'layout'
+    """
+    labels = labels or {}
+    title = {key: value for key, value in
+             [('text', title), ('x', title_x), ('font', {'size': title_size} if title_size else None)]
+             if value is not None}
+
+    def bar(df_group, **trace):
+        trace.update({'type': 'bar', 'x': df_group[x].tolist(), 'y': df_group[y].tolist(), 'textposition': 'auto'})
+        if text is not None:
+            trace['text'] = df_group[text].tolist()
+        if width is not None:
+            trace['width'] = width
+        return trace
+
+    if color is None:
+        data = [bar(df_aux, marker={'color': marker_color} if marker_color else {})]
+        layout = {'title': title,
+                  'xaxis': {'title': {'text': xaxis_title}, 'showgrid': False},
+                  'yaxis': {'title': {'text': yaxis_title}, 'showgrid': False}}
+        return {'data': data, 'layout': layout}
+
+    # Uma série por grupo de color, como no plotly express
+    x_label, y_label, color_label = labels.get(x, x), labels.get(y, y), labels.get(color, color)
+    data = []
+    for i, (group, df_group) in enumerate(df_aux.groupby(color, sort=False, observed=True)):
+        data.append(bar(df_group, name=str(group), legendgroup=str(group), showlegend=True, orientation='v',
+                        marker={'color': COLOR_SEQUENCE[i % len(COLOR_SEQUENCE)], 'pattern': {'shape': ''}},
+                        hovertemplate=f'{color_label}={group}<br>{x_label}=%{{x}}<br>{y_label}=%{{y}}<extra></extra>',
+                        xaxis='x', yaxis='y'))
+    layout = {'title': title,
+              'xaxis': {'anchor': 'y', 'domain': [0.0, 1.0], 'title': {'text': xaxis_title or x_label},
+                        'showgrid': False},
+              'yaxis': {'anchor': 'x', 'domain': [0.0, 1.0], 'title': {'text': yaxis_title or y_label},
+                        'showgrid': False},
+              'legend': {'title': {'text': color_label}, 'tracegroupgap': 0},
+              'margin': {'t': 60},
+              'barmode': 'relative'}
+    return {'data': data, 'layout': layout}
+
+@timed()
+def bar_chart(df_aux, x, y, **params):
+    """ Esta função retorna o gráfico de barras dos dados agregados, construído uma vez por dados e parâmetros
+
+         O gráfico fica em figure_cache, indexado pelo hash dos dados usados (ver data_hash) e pelos
+         parâmetros; a mesma seleção em execuções e sessões seguintes reaproveita o gráfico pronto. Na
+         construção, o spec montado por bar_spec é convertido em SpecFigure sem a validação de cada
+         propriedade (o spec é sempre gerado aqui, com propriedades válidas); o spec resolvido fica guardado
+         no gráfico e é o que st.plotly_chart envia a cada execução.
+
+         O gráfico retornado é compartilhado e não deve ser modificado (st.plotly_chart apenas o lê).
+
+        Input: df_aux - Dataframe agregado
+               x, y (str) - Colunas dos eixos
+               params - Demais parâmetros de bar_spec
+        Output: SpecFigure (somente leitura)
+    """
+    columns = [x, y] + [params[key] for key in ['text', 'color'] if params.get(key) is not None]
+    key = ('bar', data_hash(df_aux, list(dict.fromkeys(columns))), x, y, json.dumps(params, sort_keys=True))
+
+    def build():
+        # utils.spec_figure importa o plotly, apenas quando o primeiro gráfico é construído
+        from utils.spec_figure import SpecFigure
+        return SpecFigure(bar_spec(df_aux, x, y, **params))
+
+    return figure_cache.get_or_create(key, build)
@@ -0,0 +1,540 @@
+# importando as bibliotecas
+import io
+import os
+import json
+import heapq
+import shutil
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+from utils.loader import (CLEAN_OPTIONS, DATASET_PATH, DEDUP_KEY, FLOAT_COLUMNS, INGEST_WORKERS,
+                          INTEGER_COLUMNS, TEXT_COLUMNS, clean_dataframe, color_name, compact_dtypes,
+                          concat_cleaned, country_name, dataset_version, dedup_fingerprints, mark_repeated,
+                          merge_reports, rename_columns, source_watermark, valid_rows)
+from utils.snapshot import category_codes_dtype, create_snapshot_dir, finish_snapshot
+from utils.cube import CUBE_DIMENSIONS, build_cube, merge_cubes
+
+# Quantidade de linhas do CSV lidas por bloco, configurável pela variável de ambiente FOME_ZERO_CHUNK_ROWS
+CHUNK_ROWS = int(os.environ.get('FOME_ZERO_CHUNK_ROWS', 200000))
+
+# Tamanho dos blocos lidos na busca pelos limites de registro do CSV (ver record_boundaries)
+SCAN_BYTES = 16 * 1024 * 1024
+
+#===================================================#
+#     Funções
+#===================================================#
+
+def clean_chunk(df, seen, dedup=DEDUP_KEY):
+    """ Esta função aplica ao bloco a mesma limpeza da leitura completa (ver loader.read_clean)
+
+         A remoção de duplicados considera também as linhas válidas dos blocos anteriores, pelos hashes
+         em seen.
+
+        Input: df - Bloco do CSV
+               seen (list) - Arrays ordenados com os hashes dos blocos anteriores (ver loader.mark_repeated)
+               dedup (str) - Chave de remoção de duplicados (ver loader.dedup_fingerprints)
+        Output: Tupla (bloco limpo, hashes vistos até este bloco, relatório de limpeza do bloco)
+    """
+    rename_columns(df)
+    country_name(df)
+    color_name(df)
+
+    # Mesma transformação feita por clean_dataframe antes da comparação entre linhas
+    df['cuisines'] = df['cuisines'].str.replace(r',.*', '', regex=True)
+    validas = valid_rows(df)
+    duplicated = np.zeros(len(df), dtype=bool)
+    duplicated[validas], seen = mark_repeated(dedup_fingerprints(df, dedup)[validas], seen)
+
+    report = {}
+    return clean_dataframe(df, duplicated=duplicated, dedup=dedup, report=report), seen, report
+
+def encode_text(serie, lookup):
+    """ Esta função converte uma coluna categórica em códigos, acrescentando os valores novos ao dicionário
+
+         O dicionário fica em memória entre os blocos: é usado apenas nas colunas de baixa cardinalidade
+         (CATEGORY_COLUMNS). As colunas de texto livre passam por spill_text.
+
+        Input: serie - Coluna categórica do bloco limpo
+               lookup (dict) - Dicionário valor -> código acumulado entre os blocos
+        Output: Array int32 com o código de cada linha
+    """
+    codes, uniques = pd.factorize(serie)
+    mapping = np.array([lookup.setdefault(value, len(lookup)) for value in uniques], dtype='int32')
+    return mapping[codes]
+
+def spill_text(serie, runs, f):
+    """ Esta função grava os valores distintos de uma coluna de texto do bloco, em ordem alfabética, no arquivo
+        de valores da coluna
+
+         Cada bloco ocupa um trecho do arquivo: o comprimento em bytes (int64) de cada valor, seguido dos
+         valores em UTF-8. Os trechos de todos os blocos são unidos ao final por merge_text, sem manter os
+         valores da coluna inteira em memória.
+
+        Input: serie - Coluna de texto do bloco limpo
+               runs (list) - Trechos já gravados (posição no arquivo, quantidade de valores), acrescida do bloco
+               f - Arquivo de valores da coluna, aberto para escrita
+        Output: Array int32 com o código de cada linha (posição do valor entre os valores do bloco)
+    """
+    codes, uniques = pd.factorize(serie, sort=True)
+    encoded = [str(value).encode('utf-8') for value in uniques]
+    runs.append((f.tell(), len(encoded)))
+    f.write(np.array([len(value) for value in encoded], dtype='int64').tobytes())
+    f.write(b''.join(encoded))
+    return codes.astype('int32')
+
+def read_run(f, start, n, batch, run):
+    """ Esta função lê os valores de um trecho gravado por spill_text, batch valores por vez
+
+        Input: f - Arquivo de valores, aberto para leitura (compartilhado entre os trechos)
+               start (int) - Posição do trecho no arquivo
+               n (int) - Quantidade de valores do trecho
+               batch (int) - Quantidade de valores lidos por vez
+               run (int) - Número do trecho
+        Output: Gerador de tuplas (valor, número do trecho, código do valor no bloco) em ordem alfabética
+    """
+    position = start + 8 * n
+    for first in range(0, n, batch):
+        f.seek(start + 8 * first)
+        lengths = np.frombuffer(f.read(8 * min(batch, n - first)), dtype='int64')
+        f.seek(position)
+        data = f.read(int(lengths.sum()))
+        position += len(data)
+        ends = np.cumsum(lengths)
+        for code, begin, end in zip(range(first, first + len(lengths)), (ends - lengths).tolist(), ends.tolist()):
+            yield data[begin:end].decode('utf-8'), run, code
+
+def merge_text(filename, runs, ranks_filename, values_filename, batch):
+    """ Esta função une os valores dos trechos gravados por spill_text em uma única lista em ordem alfabética
+
+         Os trechos são intercalados (merge de listas ordenadas), lendo de cada um batch / (quantidade de
+         trechos) valores por vez, de modo que a memória usada não depende da quantidade de valores. Os valores distintos são gravados, em ordem, como lista JSON em values_filename (os
+         valores da categoria no snapshot), e a posição de cada valor de cada trecho nessa lista é gravada
+         em ranks_filename (int32, os trechos um após o outro).
+
+        Input: filename (str) - Arquivo de valores gravado por spill_text
+               runs (list) - Trechos do arquivo (posição, quantidade de valores)
+               ranks_filename (str) - Arquivo de destino das posições
+               values_filename (str) - Arquivo JSON de destino dos valores distintos
+               batch (int) - Quantidade de valores lidos de uma vez, somados todos os trechos
+        Output: Quantidade de valores distintos
+    """
+    offsets = np.cumsum([0] + [n for _, n in runs])
+    ranks = np.zeros(0, dtype='int32')
+    if offsets[-1]:
+        ranks = np.memmap(ranks_filename, dtype='int32', mode='w+', shape=(int(offsets[-1]),))
+    batch = max(batch // max(len(runs), 1), 1)
+
+    rank, previous = -1, None
+    with open(filename, 'rb') as f, open(values_filename, 'w', encoding='utf-8') as out:
+        out.write('[')
+        merged = heapq.merge(*[read_run(f, start, n, batch, i) for i, (start, n) in enumerate(runs)])
+        for value, i, code in merged:
+            if value != previous:
+                out.write((', ' if rank >= 0 else '') + json.dumps(value, ensure_ascii=False))
+                rank, previous = rank + 1, value
+            ranks[offsets[i] + code] = rank
+        out.write(']')
+
+    if len(ranks):
+        ranks.flush()
+    else:
+        ranks.tofile(ranks_filename)
+    del ranks
+    return rank + 1
+
+def remap_text(part, sizes, runs, ranks_filename, filename):
+    """ Esta função converte os códigos de uma coluna de texto, gravados por bloco, nas posições da lista
+        única de valores (ver merge_text), lendo e escrevendo um bloco por vez
+
+        Input: part (str) - Arquivo temporário com os códigos de cada bloco (int32, ver spill_text)
+               sizes (list) - Quantidade de linhas de cada bloco
+               runs (list) - Trechos dos valores de cada bloco (posição, quantidade de valores)
+               ranks_filename (str) - Arquivo com a posição de cada valor de cada trecho (ver merge_text)
+               filename (str) - Arquivo de destino dos códigos convertidos (int32)
+        Output: None
+    """
+    with open(part, 'rb') as f, open(ranks_filename, 'rb') as g, open(filename, 'wb') as out:
+        for size, (_, n) in zip(sizes, runs):
+            codes = np.fromfile(f, dtype='int32', count=size)
+            # Código -1 (valor nulo) continua -1
+            ranks = np.append(np.fromfile(g, dtype='int32', count=n), np.int32(-1))
+            ranks[codes].tofile(out)
+    os.remove(part)
+    os.remove(ranks_filename)
+
+def category_ranks(lookup):
+    """ Esta função converte os códigos de um dicionário (ordem de aparição) na posição do valor em ordem
+        alfabética, que é o código da categoria no tipo categórico do pandas
+
+        Input: lookup (dict) - Dicionário valor -> código (ver encode_text)
+        Output: Array com a posição em ordem alfabética de cada código
+    """
+    ranks = np.empty(len(lookup), dtype='int64')
+    ranks[[lookup[value] for value in sorted(lookup)]] = np.arange(len(lookup))
+    return ranks
+
+def column_dtype(col, low, high, is_float, integral):
+    """ Esta função escolhe o tipo final de uma coluna numérica gravada em blocos, o mesmo da leitura completa
+
+         A conversão da leitura completa (int64 quando a coluna nunca foi lida como float, e o menor tipo de
+         compact_dtypes) depende apenas do menor e do maior valor e de haver valores não inteiros, então é
+         aplicada a uma amostra com esses valores.
+
+        Input: col (str) - Nome da coluna
+               low, high (float) - Menor e maior valor da coluna
+               is_float (bool) - A coluna foi lida como float em algum bloco
+               integral (bool) - Todos os valores são inteiros
+        Output: Tipo numpy da coluna
+    """
+    serie = pd.Series([low, high] + ([] if integral else [0.5]), dtype='float64')
+    if not is_float:
+        serie = serie.astype('int64')
+    if col in INTEGER_COLUMNS:
+        serie = pd.to_numeric(serie, downcast='integer')
+    elif col in FLOAT_COLUMNS:
+        serie = pd.to_numeric(serie, downcast='float')
+    return serie.dtype
+
+def read_blocks(filename, dtype, chunk_rows):
+    """ Esta função lê um arquivo temporário de valores (gravado com tofile) em blocos
+
+        Input: filename (str) - Arquivo temporário
+               dtype - Tipo dos valores
+               chunk_rows (int) - Quantidade de valores por bloco
+        Output: Gerador de arrays numpy
+    """
+    with open(filename, 'rb') as f:
+        while True:
+            values = np.fromfile(f, dtype=dtype, count=chunk_rows)
+            if not len(values):
+                return
+            yield values
+
+def write_sorted(part, dtype, positions, filename, rows, chunk_rows, convert=None):
+    """ Esta função grava uma coluna na ordem final das linhas, lendo e escrevendo um bloco por vez
+
+         O arquivo .npy de destino é mapeado em memória e cada bloco de valores é escrito nas posições
+         finais das suas linhas (lidas do arquivo positions), sem carregar a coluna inteira.
+
+        Input: part (str) - Arquivo temporário com os valores da coluna na ordem do CSV
+               dtype - Tipo dos valores em part
+               positions (str) - Arquivo temporário com a posição final (int64) de cada linha
+               filename (str) - Arquivo .npy de destino
+               rows (int) - Quantidade de linhas
+               chunk_rows (int) - Quantidade de linhas por bloco
+               convert - Função aplicada a cada bloco de valores antes da gravação (padrão: nenhuma)
+        Output: None
+    """
+    convert = convert or (lambda values: values)
+    out_dtype = convert(np.empty(0, dtype=dtype)).dtype
+    if rows == 0:
+        np.save(filename, np.empty(0, dtype=out_dtype))
+    else:
+        out = np.lib.format.open_memmap(filename, mode='w+', dtype=out_dtype, shape=(rows,))
+        for values, destination in zip(read_blocks(part, dtype, chunk_rows),
+                                       read_blocks(positions, 'int64', chunk_rows)):
+            out[destination] = convert(values)
+        out.flush()
+        del out
+    os.remove(part)
+
+def sorted_positions(part, ranks, positions, chunk_rows):
+    """ Esta função calcula a posição final de cada linha na ordenação por país e a grava em positions
+
+         A ordenação é por contagem: uma leitura conta as linhas de cada país e a seguinte distribui as
+         linhas, bloco a bloco, a partir do início do bloco do país, mantendo a ordem original em cada país.
+
+        Input: part (str) - Arquivo temporário com os códigos (int32, ordem de aparição) do país de cada linha
+               ranks - Código da categoria (ordem alfabética) de cada código de part (ver category_ranks)
+               positions (str) - Arquivo de destino das posições (int64)
+               chunk_rows (int) - Quantidade de linhas por bloco
+        Output: Quantidade de linhas
+    """
+    counts = np.zeros(len(ranks), dtype='int64')
+    for codes in read_blocks(part, 'int32', chunk_rows):
+        counts += np.bincount(ranks[codes], minlength=len(ranks))
+
+    # Próxima posição livre do bloco de cada país
+    following = np.cumsum(counts) - counts
+    with open(positions, 'wb') as out:
+        for codes in read_blocks(part, 'int32', chunk_rows):
+            country = ranks[codes]
+            order = np.argsort(country, kind='stable')
+            changes = np.diff(country[order], prepend=-1) != 0
+            starts = np.flatnonzero(changes)
+            within = np.arange(len(order)) - starts[np.cumsum(changes) - 1]
+
+            destination = np.empty(len(order), dtype='int64')
+            destination[order] = following[country[order]] + within
+            destination.tofile(out)
+            following += np.bincount(country, minlength=len(ranks))
+    return int(counts.sum())
+
+def ingest_csv(path=DATASET_PATH, version=None, chunk_rows=CHUNK_ROWS):
+    """ Esta função lê o CSV em blocos e grava o dataset limpo como snapshot (ver utils/snapshot.py)
+
+         Cada bloco de chunk_rows linhas passa pela mesma limpeza da leitura completa e é gravado coluna
+         a coluna em arquivos temporários: colunas categóricas como códigos (com o dicionário de valores em
+         memória), colunas de texto livre como códigos do bloco e os valores distintos do bloco (ver
+         spill_text) e colunas numéricas diretamente. Ao final os valores de texto dos blocos são unidos em
+         disco (ver merge_text e remap_text), as linhas são ordenadas por país (ver sorted_positions) e cada
+         coluna é gravada, bloco a bloco, no formato do snapshot (ver write_sorted), que é carregado
+         normalmente por loader.load_dataset.
+
+         A memória usada fica limitada ao bloco, aos valores distintos das colunas categóricas
+         (CATEGORY_COLUMNS) e a 8 bytes por linha mantida (hash usado na remoção de duplicados entre blocos, ver
+         loader.mark_repeated); os valores das colunas de texto livre (TEXT_COLUMNS) não ficam em memória.
+         O cubo de agregados (ver utils/cube.py) é calculado por bloco e somado, sem precisar do dataset
+         inteiro. Os arquivos temporários são removidos mesmo quando a leitura falha.
+
+        Input: path (str) - Caminho do arquivo CSV
+               version (tuple) - Versão do CSV (padrão: loader.dataset_version(path))
+               chunk_rows (int) - Quantidade de linhas por bloco
+        Output: Dicionário com o diretório do snapshot ('snapshot'), linhas lidas ('rows'), linhas mantidas
+                ('kept'), linhas repetidas ('duplicates'), o relatório de limpeza por regra ('report', ver
+                loader.dedup_report), o cubo de agregados ('cube') e a marca d'água da leitura ('watermark',
+                ver loader.source_watermark)
+    """
+    version = dataset_version(path) if version is None else version
+    target, tmp = create_snapshot_dir(path)
+
+    seen = []
+    columns, lookups, files, float_columns = None, {}, {}, set()
+    limits, runs, sizes = {}, {}, []
+    reports, cubes = [], []
+
+    try:
+        for df in pd.read_csv(path, chunksize=chunk_rows):
+            df1, seen, chunk_report = clean_chunk(df, seen)
+            reports.append(chunk_report)
+
+            # Colunas lidas como float em algum bloco continuam float64, como na leitura completa do CSV
+            float_columns.update(col for col in df1.columns if df1[col].dtype.kind == 'f')
+
+            if columns is None:
+                columns = list(df1.columns)
+                for col in columns:
+                    files[col] = open(os.path.join(tmp, f'{col}.part'), 'wb')
+                for col in TEXT_COLUMNS:
+                    files[f'{col}.values'] = open(os.path.join(tmp, f'{col}.values.part'), 'wb')
+                files['index'] = open(os.path.join(tmp, 'index.part'), 'wb')
+
+            for col in columns:
+                if df1[col].dtype.kind in 'biuf':
+                    values = df1[col].to_numpy(dtype='float64')
+                    values.tofile(files[col])
+                    if len(values):
+                        # Menor e maior valor e se todos são inteiros (ver column_dtype)
+                        low, high, integral = limits.get(col, (np.inf, -np.inf, True))
+                        limits[col] = (min(low, values.min()), max(high, values.max()),
+                                       integral and bool((values == np.floor(values)).all()))
+                elif col in TEXT_COLUMNS:
+                    spill_text(df1[col], runs.setdefault(col, []), files[f'{col}.values']).tofile(files[col])
+                else:
+                    encode_text(df1[col], lookups.setdefault(col, {})).tofile(files[col])
+            df1.index.to_numpy(dtype='int64').tofile(files['index'])
+            sizes.append(len(df1))
+
+            # Cubo parcial do bloco, somado aos anteriores
+            cubes = [merge_cubes(cubes + [build_cube(df1)])]
+
+        for f in files.values():
+            f.close()
+        if columns is None:
+            raise ValueError(f'O CSV não possui linhas: {path}')
+
+        # Posição final de cada linha: ordem por país (categorias em ordem alfabética), mantendo a ordem
+        # original em cada país
+        positions = os.path.join(tmp, 'positions.part')
+        rows = sorted_positions(os.path.join(tmp, 'country.part'), category_ranks(lookups['country']),
+                                positions, chunk_rows)
+
+        manifest = []
+        for i, col in enumerate(columns):
+            part = os.path.join(tmp, f'{col}.part')
+            filename = f'{i}.npy'
+            if col in runs:
+                # Valores de texto dos blocos unidos em disco: os códigos já são as posições na lista final
+                values_file = f'{i}.values.json'
+                ranks = os.path.join(tmp, f'{col}.ranks.part')
+                n_values = merge_text(os.path.join(tmp, f'{col}.values.part'), runs[col], ranks,
+                                      os.path.join(tmp, values_file), chunk_rows)
+                os.remove(os.path.join(tmp, f'{col}.values.part'))
+                remap_text(part, sizes, runs[col], ranks, part + '.global')
+                dtype = category_codes_dtype(n_values)
+                write_sorted(part + '.global', 'int32', positions, os.path.join(tmp, filename), rows, chunk_rows,
+                             lambda codes: codes.astype(dtype))
+                manifest.append({'name': col, 'file': filename, 'kind': 'category', 'values_file': values_file})
+            elif col in lookups:
+                values = sorted(lookups[col])
+                ranks = category_ranks(lookups[col]).astype(category_codes_dtype(len(values)))
+                write_sorted(part, 'int32', positions, os.path.join(tmp, filename), rows, chunk_rows,
+                             lambda codes: ranks[codes])
+                manifest.append({'name': col, 'file': filename, 'kind': 'category', 'values': values})
+            else:
+                low, high, integral = limits.get(col, (0, 0, True))
+                dtype = column_dtype(col, low, high, col in float_columns, integral)
+                write_sorted(part, 'float64', positions, os.path.join(tmp, filename), rows, chunk_rows,
+                             lambda values: values.astype(dtype))
+                manifest.append({'name': col, 'file': filename, 'kind': 'numeric'})
+
+        write_sorted(os.path.join(tmp, 'index.part'), 'int64', positions, os.path.join(tmp, 'index.npy'),
+                     rows, chunk_rows)
+        os.remove(positions)
+
+        # Cubo com as mesmas categorias do dataset carregado do snapshot
+        cube = cubes[0]
+        for col in CUBE_DIMENSIONS:
+            cube[col] = cube[col].astype(pd.CategoricalDtype(sorted(lookups[col])))
+
+        report = merge_reports(reports)
+        watermark = source_watermark(path, version[1], report['rows'])
+        return {'snapshot': finish_snapshot(tmp, target, version, manifest, watermark, CLEAN_OPTIONS),
+                'rows': report['rows'], 'kept': report['kept'], 'duplicates': report['duplicates'],
+                'report': report, 'cube': cube, 'watermark': watermark}
+    finally:
+        # Em caso de erro, os arquivos temporários são fechados e removidos (após o sucesso, o diretório
+        # temporário já foi publicado como snapshot por finish_snapshot)
+        for f in files.values():
+            f.close()
+        shutil.rmtree(tmp, ignore_errors=True)
+
+#===================================================#
+#     Leitura paralela
+#===================================================#
+
+def record_boundaries(path, start, targets):
+    """ Esta função encontra, para cada posição em targets, o início do primeiro registro do CSV a partir dela
+
+         Um registro termina em uma quebra de linha fora de aspas: campos entre aspas (ex: 'Address') podem
+         conter vírgulas e quebras de linha. Como aspas escapadas aparecem em pares (""), a quebra de linha
+         está fora de aspas quando a quantidade de aspas antes dela é par. As aspas são contadas em uma
+         única leitura sequencial do arquivo, a partir de start (início do primeiro registro).
+
+        Input: path (str) - Caminho do arquivo CSV
+               start (int) - Posição do início do primeiro registro (após o cabeçalho)
+               targets (list) - Posições aproximadas, em ordem crescente
+        Output: Lista com a posição do início de registro encontrada para cada posição de targets
+    """
+    size = os.path.getsize(path)
+    boundaries = []
+    with open(path, 'rb') as f:
+        f.seek(start)
+        position, quotes = start, 0
+        for target in targets:
+            # Contagem das aspas até a posição aproximada
+            while position < target:
+                block = f.read(min(SCAN_BYTES, target - position))
+                quotes += block.count(b'"')
+                position += len(block)
+
+            # Primeira quebra de linha com quantidade par de aspas antes dela
+            while position < size:
+                block = np.frombuffer(f.read(SCAN_BYTES), dtype='uint8')
+                parity = (quotes + np.cumsum(block == ord('"'))) % 2
+                ends = np.flatnonzero((block == ord('\n')) & (parity == 0))
+                if len(ends):
+                    quotes += int(np.count_nonzero(block[:ends[0] + 1] == ord('"')))
+                    position += int(ends[0]) + 1
+                    f.seek(position)
+                    break
+                quotes += int(np.count_nonzero(block == ord('"')))
+                position += len(block)
+            boundaries.append(min(position, size))
+    return boundaries
+
+def split_byte_ranges(path, workers):
+    """ Esta função divide o CSV em trechos de tamanho parecido, alinhados ao início dos registros
+
+        Input: path (str) - Caminho do arquivo CSV
+               workers (int) - Quantidade de trechos desejada
+        Output: Tupla (linha de cabeçalho em bytes, lista de trechos (início, fim) sem trechos vazios)
+    """
+    size = os.path.getsize(path)
+    with open(path, 'rb') as f:
+        header = f.readline()
+    start = len(header)
+
+    targets = [start + (size - start) * k // workers for k in range(1, workers)]
+    limits = [start] + record_boundaries(path, start, targets) + [size]
+    return header, [(a, b) for a, b in zip(limits[:-1], limits[1:]) if b > a]
+
+def parse_range(path, header, start, end, dedup=DEDUP_KEY):
+    """ Esta função lê e limpa um trecho do CSV (executada nos processos da leitura paralela)
+
+         A remoção de duplicados considera apenas as linhas do trecho; os duplicados entre trechos são
+         removidos ao juntar os resultados (ver read_dataset_parallel).
+
+        Input: path (str) - Caminho do arquivo CSV
+               header (bytes) - Linha de cabeçalho do CSV
+               start, end (int) - Posições do trecho no arquivo
+               dedup (str) - Chave de remoção de duplicados (ver loader.dedup_fingerprints)
+        Output: Tupla (trecho limpo com os tipos compactos, relatório de limpeza do trecho)
+    """
+    with open(path, 'rb') as f:
+        f.seek(start)
+        df = pd.read_csv(io.BytesIO(header + f.read(end - start)))
+    rename_columns(df)
+    country_name(df)
+    color_name(df)
+    report = {}
+    return compact_dtypes(clean_dataframe(df, dedup=dedup, report=report)), report
+
+def read_dataset_parallel(path=DATASET_PATH, workers=INGEST_WORKERS, report=None):
+    """ Esta função lê e limpa o CSV em paralelo, com um processo por trecho do arquivo
+
+         O arquivo é dividido em trechos alinhados ao início dos registros (ver split_byte_ranges), cada
+         trecho é lido e limpo em um processo e os resultados são juntados na ordem do arquivo. Linhas de
+         um trecho iguais a linhas mantidas de trechos anteriores são removidas pelo hash da chave de
+         duplicados (ver loader.dedup_fingerprints), e o índice das linhas é a posição no CSV, como na
+         leitura completa.
+
+         Os processos são iniciados com 'spawn', seguro dentro do servidor do Streamlit (que usa threads).
+
+        Input: path (str) - Caminho do arquivo CSV
+               workers (int) - Quantidade de processos
+               report (dict) - Quando informado, recebe o relatório de linhas removidas (ver loader.dedup_report)
+        Output: Tupla (dataframe limpo, quantidade de linhas lidas do CSV)
+    """
+    header, ranges = split_byte_ranges(path, max(workers, 1))
+    if workers <= 1 or len(ranges) <= 1:
+        results = [parse_range(path, header, start, end) for start, end in ranges]
+    else:
+        with ProcessPoolExecutor(max_workers=len(ranges), mp_context=multiprocessing.get_context('spawn')) as pool:
+            results = list(pool.map(parse_range, *zip(*[(path, header, start, end) for start, end in ranges])))
+
+    frames, seen, rows = [], [], 0
+    for df1, range_report in results:
+        df1.index = df1.index + rows
+        rows += range_report['rows']
+        repeated, seen = mark_repeated(dedup_fingerprints(df1), seen)
+        range_report['duplicates'] += int(repeated.sum())
+        range_report['kept'] -= int(repeated.sum())
+        frames.append(df1.loc[~repeated, :])
+
+    if report is not None:
+        report.update(merge_reports([r for _, r in results]))
+    if not frames:
+        return parse_range(path, header, len(header), len(header))[0], 0
+    return concat_cleaned(frames), rows
+
+#===================================================#
+#     Ingestão pela linha de comando
+#===================================================#
+
+if __name__ == '__main__':
+    # Uso: python -m utils.ingest [caminho do CSV] [linhas por bloco]
+    import sys
+    import time
+
+    csv_path = sys.argv[1] if len(sys.argv) > 1 else DATASET_PATH
+    rows_per_chunk = int(sys.argv[2]) if len(sys.argv) > 2 else CHUNK_ROWS
+
+    start = time.perf_counter()
+    result = ingest_csv(csv_path, chunk_rows=rows_per_chunk)
+    print(f"Snapshot gerado em: {result['snapshot']} ({time.perf_counter() - start:.2f}s) | "
+          f"linhas lidas {result['rows']:,} | mantidas {result['kept']:,} | "
+          f"duplicadas {result['duplicates']:,} (chave '{result['report']['dedup']}') | "
+          f"removidas com dados nulos {result['report']['nulls']:,} | "
+          f"por culinária {result['report']['excluded_cuisines']:,}")
@@ -0,0 +1,187 @@
+# importando as bibliotecas
+import os
+import json
+import time
+import functools
+import threading
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from datetime import datetime, timezone
+import numpy as np
+
+# Diretório dos arquivos de métricas (timings.jsonl e metrics.prom), configurável pela variável de ambiente
+# FOME_ZERO_METRICS_DIR; sem ela os tempos só ficam em memória (painel de depuração)
+METRICS_DIR = os.environ.get('FOME_ZERO_METRICS_DIR')
+
+# Exibição do painel de tempos na barra lateral (FOME_ZERO_DEBUG_PANEL=1)
+DEBUG_PANEL = os.environ.get('FOME_ZERO_DEBUG_PANEL', '0') == '1'
+
+# Quantidade de execuções recentes de cada página usadas no cálculo dos percentis
+RECENT_RERUNS = int(os.environ.get('FOME_ZERO_RECENT_RERUNS', 200))
+
+# Percentis exportados
+QUANTILES = [0.5, 0.95]
+
+# Execução em andamento em cada thread (o Streamlit executa o script de cada sessão em uma thread própria)
+_current = threading.local()
+
+# Execuções recentes de cada página (página -> registros) e trava dos arquivos de métricas
+_recent = defaultdict(lambda: deque(maxlen=RECENT_RERUNS))
+_lock = threading.Lock()
+
+#===================================================#
+#     Medição das etapas
+#===================================================#
+
+def start_rerun(page):
+    """ Esta função inicia a medição de uma execução da página na thread atual
+
+        Input: page (str) - Nome da página
+        Output: None
+    """
+    _current.rerun = {'page': page, 'start': time.perf_counter(), 'stages': {}}
+
+@contextmanager
+def stage(name):
+    """ Esta função mede o tempo de um trecho de código como uma etapa da execução em andamento
+
+         Etapas com o mesmo nome na mesma execução são somadas (com a quantidade de chamadas). Etapas
+         dentro de outras etapas são medidas também no tempo da etapa externa. Fora de uma execução
+         medida (ex: linha de comando ou processos da leitura paralela) o trecho roda sem registro.
+
+        Input: name (str) - Nome da etapa
+        Output: Gerenciador de contexto
+    """
+    rerun = getattr(_current, 'rerun', None)
+    if rerun is None:
+        yield
+        return
+
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        seconds, calls = rerun['stages'].get(name, (0.0, 0))
+        rerun['stages'][name] = (seconds + time.perf_counter() - start, calls + 1)
+
+def timed(name=None):
+    """ Esta função cria um decorador que mede cada chamada da função decorada como uma etapa (ver stage)
+
+        Input: name (str) - Nome da etapa (padrão: nome da função)
+        Output: Decorador
+    """
+    def decorator(func):
+        stage_name = name or func.__name__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with stage(stage_name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+def finish_rerun():
+    """ Esta função encerra a medição da execução da página na thread atual
+
+         O registro da execução entra nas execuções recentes da página e, com METRICS_DIR configurado, é
+         acrescentado em timings.jsonl e atualiza os percentis de metrics.prom.
+
+        Output: Registro da execução (página, horário, tempo total e tempo/chamadas de cada etapa), ou
+                None se nenhuma execução estava em andamento
+    """
+    rerun = getattr(_current, 'rerun', None)
+    if rerun is None:
+        return None
+    _current.rerun = None
+
+    record = {'page': rerun['page'],
+              'timestamp': datetime.now(timezone.utc).isoformat(timespec='milliseconds'),
+              'total_s': round(time.perf_counter() - rerun['start'], 6),
+              'stages': {name: {'s': round(seconds, 6), 'calls': calls}
+                         for name, (seconds, calls) in rerun['stages'].items()}}
+
+    with _lock:
+        _recent[record['page']].append(record)
+        if METRICS_DIR:
+            os.makedirs(METRICS_DIR, exist_ok=True)
+            with open(os.path.join(METRICS_DIR, 'timings.jsonl'), 'a', encoding='utf-8') as f:
+                f.write(json.dumps(record, ensure_ascii=False) + '\n')
+            write_prometheus(os.path.join(METRICS_DIR, 'metrics.prom'))
+    return record
+
+#===================================================#
+#     Percentis e exportação
+#===================================================#
+
+def stage_quantiles(page):
+    """ Esta função calcula os percentis (QUANTILES) do tempo total e de cada etapa nas execuções recentes da página
+
+        Input: page (str) - Nome da página
+        Output: Dicionário etapa -> {'count', 'sum', percentil: segundos}; o tempo total fica na etapa 'rerun'
+    """
+    samples = defaultdict(list)
+    for record in list(_recent.get(page, [])):
+        samples['rerun'].append(record['total_s'])
+        for name, values in record['stages'].items():
+            samples[name].append(values['s'])
+
+    return {name: {'count': len(values), 'sum': float(np.sum(values)),
+                   **dict(zip(QUANTILES, np.quantile(values, QUANTILES).tolist()))}
+            for name, values in samples.items()}
+
+def prometheus_text():
+    """ Esta função monta o texto no formato de exposição do Prometheus com os percentis de todas as páginas
+
+        Output: Texto (str) com a métrica fome_zero_stage_seconds (tipo summary) por página e etapa
+    """
+    lines = ['# HELP fome_zero_stage_seconds Tempo das etapas nas execuções recentes de cada página',
+             '# TYPE fome_zero_stage_seconds summary']
+    for page in sorted(_recent):
+        for name, summary in sorted(stage_quantiles(page).items()):
+            labels = f'page="{page}",stage="{name}"'
+            for q in QUANTILES:
+                lines.append(f'fome_zero_stage_seconds{{{labels},quantile="{q}"}} {summary[q]:.6f}')
+            lines.append(f'fome_zero_stage_seconds_sum{{{labels}}} {summary["sum"]:.6f}')
+            lines.append(f'fome_zero_stage_seconds_count{{{labels}}} {summary["count"]}')
+    return '\n'.join(lines) + '\n'
+
+def write_prometheus(path):
+    """ Esta função grava o texto do Prometheus em path (por um arquivo temporário renomeado ao final)
+
+        Input: path (str) - Caminho do arquivo
+        Output: None
+    """
+    tmp = f'{path}.tmp{os.getpid()}'
+    with open(tmp, 'w', encoding='utf-8') as f:
+        f.write(prometheus_text())
+    os.replace(tmp, path)
+
+#===================================================#
+#     Painel de depuração
+#===================================================#
+
+def render_debug_panel(record):
+    """ Esta função exibe na barra lateral os tempos da última execução e os percentis da página
+
+         O painel só é exibido com FOME_ZERO_DEBUG_PANEL=1.
+
+        Input: record (dict) - Registro da execução (retornado por finish_rerun)
+        Output: None
+    """
+    if not DEBUG_PANEL or record is None:
+        return
+    import pandas as pd
+    import streamlit as st
+
+    quantiles = stage_quantiles(record['page'])
+    last = {'rerun': {'s': record['total_s'], 'calls': 1}, **record['stages']}
+    df_aux = pd.DataFrame([{'etapa': name,
+                            'última (ms)': round(values['s'] * 1000, 2),
+                            'chamadas': values['calls'],
+                            'p50 (ms)': round(quantiles[name][0.5] * 1000, 2),
+                            'p95 (ms)': round(quantiles[name][0.95] * 1000, 2)}
+                           for name, values in last.items()])
+
+    with st.sidebar.expander('Tempos de execução', expanded=False):
+        st.caption(f"{quantiles['rerun']['count']} execuções recentes da página")
+        st.dataframe(df_aux.sort_values('última (ms)', ascending=False).reset_index(drop=True))
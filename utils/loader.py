@@ -0,0 +1,712 @@
+# importando as bibliotecas
+import os
+import threading
+import numpy as np
+import pandas as pd
+import hashlib
+import inflection
+from utils.snapshot import read_snapshot, snapshot_manifest, write_snapshot
+from utils.instrumentation import stage, timed
+
+# Caminho padrão do dataset (arquivo zomato.csv na raiz do projeto), configurável pela variável de ambiente
+# FOME_ZERO_DATASET (ex: um CSV sintético maior, nos benchmarks)
+DATASET_PATH = os.environ.get('FOME_ZERO_DATASET',
+                              os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'zomato.csv'))
+
+# Colunas de baixa cardinalidade convertidas para o tipo categórico
+CATEGORY_COLUMNS = ['country', 'city', 'cuisines', 'currency', 'rating_color', 'rating_text']
+
+# Colunas de texto livre, também guardadas como categóricas (códigos e valores distintos): é o formato em que
+# o snapshot as mapeia em memória sem copiar os dados (ver utils/snapshot.py)
+TEXT_COLUMNS = ['restaurant_name', 'address', 'locality', 'locality_verbose']
+
+# Colunas numéricas convertidas para o menor tipo que comporta os valores
+INTEGER_COLUMNS = ['votes', 'price_range', 'has_table_booking', 'has_online_delivery',
+                   'is_delivering_now', 'switch_to_order_menu']
+FLOAT_COLUMNS = ['aggregate_rating']
+
+# Culinárias removidas na limpeza
+EXCLUDED_CUISINES = ['Drinks Only', 'Mineira']
+
+# Chaves de remoção de duplicados: 'row' (linha inteira igual) ou 'restaurant_id' (mesmo restaurante),
+# configurável pela variável de ambiente FOME_ZERO_DEDUP
+DEDUP_KEYS = ['row', 'restaurant_id']
+DEDUP_KEY = os.environ.get('FOME_ZERO_DEDUP', 'row')
+
+# Opções da limpeza gravadas no snapshot: um snapshot gerado com outras opções é descartado
+CLEAN_OPTIONS = {'dedup': DEDUP_KEY}
+
+# Quantidade de bytes do início e do fim do CSV usados para conferir se o arquivo só recebeu linhas novas
+WATERMARK_BYTES = 64 * 1024
+
+# Quantidade de processos da leitura completa do CSV (ver utils/ingest.py), configurável pela variável de
+# ambiente FOME_ZERO_INGEST_WORKERS
+INGEST_WORKERS = int(os.environ.get('FOME_ZERO_INGEST_WORKERS', 1))
+
+# CSVs a partir deste tamanho (em bytes) são lidos em blocos pela ingestão em streaming (ver utils/ingest.py),
+# configurável pela variável de ambiente FOME_ZERO_STREAM_BYTES
+STREAM_THRESHOLD_BYTES = int(os.environ.get('FOME_ZERO_STREAM_BYTES', 512 * 1024 * 1024))
+
+#===================================================#
+#     Funções de limpeza
+#===================================================#
+
+@timed()
+def rename_columns(df):
+    """ Esta função realiza modificações nos nomes das colunas do dataframe sendo elas:
+
+         Tipos de renomeação:
+
+         1. Título: Converte a primeira letra de cada palavra em maiúscula
+         2. Snakecase: Converte os espaços em ( _ ) e letras minúsculas
+         3. Espaços: Remove os espaços em branco das colunas
+
+         Input: Dataframe
+         output: Dataframe com as colunas renomeadas
+    """
+
+    title = lambda x: inflection.titleize(x)
+    snakecase = lambda x: inflection.underscore(x)
+    spaces = lambda x: x.replace(" ", "")
+    cols_old = list(df.columns)
+    cols_old = list(map(title, cols_old))
+    cols_old = list(map(spaces, cols_old))
+    cols_new = list(map(snakecase, cols_old))
+    df.columns = cols_new
+    return df
+
+@timed()
+def country_name(df):
+    """ Esta função tem a responsabilidade de substituir os códigos pelos nomes dos países correspondentes
+
+        Input: Dataframe
+        Output: Dataframe com os nomes dos países substituindo os códigos de país
+    """
+    df['country_code'] = df['country_code'].replace({
+    1: "India",
+    14: "Australia",
+    30: "Brazil",
+    37: "Canada",
+    94: "Indonesia",
+    148: "New Zeland",
+    162: "Philippines",
+    166: "Qatar",
+    184: "Singapure",
+    189: "South Africa",
+    191: "Sri Lanka",
+    208: "Turkey",
+    214: "United Arab Emirates",
+    215: "England",
+    216: "United States of America",
+    })
+    return df
+
+
+
+@timed()
+def color_name(df):
+    """ Esta função tem a responsabilidade de substituir os códigos por nomes de cores
+
+        Input: Dataframe
+        Output: Dataframe com os códigos de cores substituídos pelos nomes de cores
+    """
+    df['rating_color'] = df['rating_color'].replace({
+    "3F7E00": "darkgreen",
+    "5BA829": "green",
+    "9ACD32": "lightgreen",
+    "CDD614": "orange",
+    "FFBA00": "red",
+    "CBCBC8": "darkred",
+    "FF7800": "darkred",
+    })
+    return df
+
+
+@timed()
+def clean_dataframe(df, duplicated=None, dedup=DEDUP_KEY, report=None):
+    """ Esta função tem a responsabilidade de limpar o dataframe
+
+         Limpezas realizadas:
+
+         1. Retorno apenas do primeiro nome dos elementos da coluna 'cuisines'
+         2. Remoção de dados nulos
+         3. Remoção de dados duplicados
+         4. Remoção de linhas com o valor 'Drinks Only' na coluna 'cuisines'
+         5. Remoção de linhas com o valor 'Mineira' na coluna 'cuisines'
+         6. Renomeação da coluna 'country_code' para 'country'
+
+         As remoções (2 a 5) são combinadas em uma única máscara booleana, aplicada uma só vez, de modo
+         que apenas uma cópia do dataframe (já filtrada) é criada durante a limpeza.
+
+         Os duplicados são encontrados pelo hash de 64 bits da chave de cada linha (ver dedup_fingerprints),
+         calculado uma única vez, entre as linhas sem dados nulos e fora das culinárias removidas: com a
+         chave 'row' o resultado é o mesmo de df.duplicated() (uma cópia de linha válida também é válida);
+         com a chave 'restaurant_id' fica o primeiro registro válido de cada restaurante.
+
+         Na leitura em blocos (ver utils/ingest.py) a máscara de duplicados é informada pelo chamador, pois
+         uma linha pode repetir outra de um bloco anterior.
+
+         Input: df - Dataframe
+                duplicated - Máscara das linhas duplicadas (padrão: calculada pela chave dedup)
+                dedup (str) - Chave de remoção de duplicados (DEDUP_KEYS)
+                report (dict) - Quando informado, recebe a quantidade de linhas removidas por regra
+                                (ver dedup_report)
+         Output: Dataframe limpo
+    """
+
+    # Retorno apenas do primeiro nome dos elementos da coluna 'cuisines'
+    df["cuisines"] = df["cuisines"].str.replace(r',.*', '', regex=True)
+
+    # Máscara das linhas mantidas: sem dados nulos, fora das culinárias removidas e não duplicadas
+    sem_nulos = df.notna().all(axis=1).to_numpy()
+    culinarias = ~df["cuisines"].isin(EXCLUDED_CUISINES).to_numpy()
+    validas = sem_nulos & culinarias
+    if duplicated is None:
+        duplicated = np.zeros(len(df), dtype=bool)
+        duplicated[validas] = pd.Series(dedup_fingerprints(df, dedup)[validas]).duplicated().to_numpy()
+    linhas_mantidas = validas & ~np.asarray(duplicated)
+
+    if report is not None:
+        report.update(dedup_report(len(df), int((~sem_nulos).sum()), int((sem_nulos & ~culinarias).sum()),
+                                   int((validas & np.asarray(duplicated)).sum()), dedup))
+
+    # Aplicação da máscara (única cópia dos dados)
+    df1 = df.take(np.flatnonzero(linhas_mantidas))
+
+    # Renomeação da coluna 'country_code' para 'country'
+    df1.rename(columns={'country_code': 'country'}, inplace=True)
+    return df1
+
+@timed()
+def compact_dtypes(df1):
+    """ Esta função converte as colunas do dataframe limpo para tipos de dados mais compactos
+
+         Conversões realizadas:
+
+         1. Colunas de texto (CATEGORY_COLUMNS e TEXT_COLUMNS) para o tipo categórico
+         2. Colunas inteiras (INTEGER_COLUMNS) para o menor tipo inteiro que comporta os valores
+         3. Coluna 'aggregate_rating' para float32 (lida pelas demais funções com rating_values)
+
+         Com as colunas categóricas os agrupamentos por país/cidade/culinária são feitos sobre códigos
+         inteiros. Os agrupamentos devem usar observed=True para não gerar combinações inexistentes.
+
+         Input: Dataframe limpo
+         Output: Dataframe com os tipos compactos
+    """
+    for col in CATEGORY_COLUMNS + TEXT_COLUMNS:
+        df1[col] = df1[col].astype('category')
+
+    for col in INTEGER_COLUMNS:
+        df1[col] = pd.to_numeric(df1[col], downcast='integer')
+
+    for col in FLOAT_COLUMNS:
+        df1[col] = pd.to_numeric(df1[col], downcast='float')
+    return df1
+
+def rating_values(serie):
+    """ Esta função retorna as avaliações ('aggregate_rating') como float64 com uma casa decimal
+
+         A coluna é guardada como float32 (ver compact_dtypes), que não representa exatamente valores como
+         4.9 (4.900000095...). A conversão para float64 arredondada para uma casa decimal, a resolução das
+         avaliações, recupera o valor do CSV. Todo uso da avaliação para exibição ou cálculo deve passar
+         por esta função.
+
+        Input: serie - Coluna 'aggregate_rating'
+        Output: Series float64 com uma casa decimal
+    """
+    return serie.astype('float64').round(1)
+
+def sort_by_country(df1):
+    """ Esta função ordena o dataframe pelo país, mantendo a ordem original das linhas dentro de cada país
+
+         Com os países em blocos contíguos, o filtro de países das páginas se torna um recorte de
+         posições (ver build_country_index e filter_countries).
+
+         Input: Dataframe com a coluna 'country' categórica
+         Output: Dataframe ordenado por país
+    """
+    return df1.sort_values('country', kind='stable')
+
+def concat_cleaned(frames):
+    """ Esta função junta dataframes limpos (ex: partes diferentes do CSV) em um único dataframe limpo
+
+         As colunas categóricas passam a ter a união das categorias, em ordem alfabética, e o resultado é
+         ordenado por país mantendo a ordem dos dataframes (e das linhas) dentro de cada país, como na
+         leitura completa do CSV.
+
+        Input: frames (list) - Dataframes limpos (ver clean_dataframe e compact_dtypes), na ordem do CSV
+        Output: Dataframe limpo
+    """
+    categories = {col: pd.Index(sorted(set().union(*[df[col].cat.categories for df in frames])))
+                  for col in CATEGORY_COLUMNS + TEXT_COLUMNS}
+    frames = [df.assign(**{col: df[col].cat.set_categories(categories[col]) for col in categories})
+              for df in frames]
+    return sort_by_country(compact_dtypes(pd.concat(frames)))
+
+def memory_usage_report(df_before, df_after):
+    """ Esta função compara o uso de memória do dataframe antes e depois da compactação dos tipos
+
+        Input: df_before - Dataframe original
+               df_after - Dataframe com os tipos compactos
+        Output: Dicionário com o uso de memória (em bytes) antes, depois e a razão entre eles
+    """
+    before = int(df_before.memory_usage(deep=True).sum())
+    after = int(df_after.memory_usage(deep=True).sum())
+    return {'before': before, 'after': after, 'ratio': round(before / after, 2)}
+
+def row_fingerprints(df):
+    """ Esta função calcula um hash de 64 bits de cada linha, usado para encontrar linhas repetidas
+
+         As colunas numéricas são convertidas para float64 antes do hash, para que uma linha tenha o
+         mesmo hash em blocos onde o pandas inferiu tipos diferentes (ex: int64 e float64 por causa de
+         valores nulos em outras linhas).
+
+         Também é usado na atualização incremental (ver utils/refresh.py), sobre o dataframe já limpo: colunas
+         categóricas têm o mesmo hash das colunas de texto com os mesmos valores.
+
+         Nas colunas de texto e categóricas apenas os valores distintos passam pelo hash (o texto se repete
+         muito entre as linhas), e o hash de cada linha combina os hashes das colunas.
+
+        Input: Dataframe
+        Output: Array uint64 com o hash de cada linha
+    """
+    fingerprints = np.zeros(len(df), dtype='uint64')
+    for col in df.columns:
+        if pd.api.types.is_numeric_dtype(df[col]) and not hasattr(df[col], 'cat'):
+            hashes = pd.util.hash_array(df[col].to_numpy(dtype='float64'))
+        else:
+            # Hash dos valores distintos, repetido para as linhas pelo código do valor (nulo: código -1)
+            codes, uniques = pd.factorize(df[col])
+            hashes = np.append(pd.util.hash_array(np.asarray(uniques, dtype=object)), np.uint64(0))[codes]
+        fingerprints = (fingerprints * np.uint64(1000003)) ^ hashes
+    return fingerprints
+
+def dedup_fingerprints(df, dedup=DEDUP_KEY):
+    """ Esta função calcula o hash de 64 bits da chave de remoção de duplicados de cada linha
+
+         Com a chave 'row' o hash é o da linha inteira; com a chave 'restaurant_id', apenas o do ID do
+         restaurante. Linhas com o mesmo hash são consideradas iguais (a chance de dois valores diferentes
+         terem o mesmo hash é desprezível: cerca de 1 em 10^6 para 10 milhões de linhas distintas).
+
+        Input: df - Dataframe (lido do CSV ou limpo)
+               dedup (str) - Chave de remoção de duplicados (DEDUP_KEYS)
+        Output: Array uint64 com o hash de cada linha
+    """
+    if dedup not in DEDUP_KEYS:
+        raise ValueError(f'Chave de remoção de duplicados inválida: {dedup!r} (use uma de {DEDUP_KEYS})')
+    return row_fingerprints(df if dedup == 'row' else df[['restaurant_id']])
+
+def valid_rows(df):
+    """ Esta função marca as linhas sem dados nulos e fora das culinárias removidas
+
+        Input: Dataframe com a coluna 'cuisines' já reduzida ao primeiro nome
+        Output: Array booleano com as linhas válidas
+    """
+    return (df.notna().all(axis=1) & ~df['cuisines'].isin(EXCLUDED_CUISINES)).to_numpy()
+
+def dedup_report(rows, nulls, excluded_cuisines, duplicates, dedup=DEDUP_KEY):
+    """ Esta função monta o relatório de linhas removidas na limpeza, por regra
+
+         Cada linha removida é contada em uma única regra, na ordem: dados nulos, culinária removida e
+         duplicado pela chave dedup.
+
+        Input: rows (int) - Linhas lidas
+               nulls (int) - Linhas removidas por dados nulos
+               excluded_cuisines (int) - Linhas removidas por culinária ('Drinks Only' e 'Mineira')
+               duplicates (int) - Linhas removidas por duplicidade
+               dedup (str) - Chave de remoção de duplicados
+        Output: Dicionário com as contagens e as linhas mantidas ('kept')
+    """
+    return {'rows': rows, 'nulls': nulls, 'excluded_cuisines': excluded_cuisines,
+            'duplicates': duplicates, 'dedup': dedup,
+            'kept': rows - nulls - excluded_cuisines - duplicates}
+
+def merge_reports(reports):
+    """ Esta função soma os relatórios de limpeza de partes diferentes do CSV (ver dedup_report)
+
+        Input: reports (list) - Relatórios de limpeza
+        Output: Relatório somado
+    """
+    counts = ['rows', 'nulls', 'excluded_cuisines', 'duplicates']
+    return dedup_report(*[sum(r[col] for r in reports) for col in counts],
+                        reports[0]['dedup'] if reports else DEDUP_KEY)
+
+def mark_repeated(fingerprints, seen):
+    """ Esta função marca as linhas repetidas de um bloco, dentro do bloco ou em relação aos blocos anteriores
+
+         Os hashes vistos ficam em uma lista de arrays ordenados (um por bloco, no início). O array do bloco
+         é acrescentado ao final e os últimos arrays são juntados enquanto o anterior não tiver mais que o
+         dobro do tamanho do último: a lista fica com O(log n) arrays e cada hash é copiado O(log n) vezes,
+         em vez de todos os hashes vistos serem copiados a cada bloco.
+
+        Input: fingerprints - Hash de cada linha do bloco (ver dedup_fingerprints)
+               seen (list) - Arrays ordenados com os hashes dos blocos anteriores (lista vazia no primeiro bloco)
+        Output: Tupla (máscara das linhas repetidas, lista de arrays ordenados com os hashes vistos até este bloco)
+    """
+    repeated = pd.Series(fingerprints).duplicated().to_numpy(copy=True)
+
+    for run in seen:
+        positions = np.minimum(np.searchsorted(run, fingerprints), len(run) - 1)
+        repeated |= run[positions] == fingerprints
+
+    seen = list(seen)
+    novos = np.unique(fingerprints[~repeated])
+    if len(novos):
+        seen.append(novos)
+    while len(seen) > 1 and len(seen[-2]) <= 2 * len(seen[-1]):
+        last = seen.pop()
+        seen[-1] = np.sort(np.concatenate([seen[-1], last]))
+    return repeated, seen
+
+#===================================================#
+#     Carregamento do dataset
+#===================================================#
+
+# Cache do processo: versão do arquivo -> dataframe limpo, estruturas pré-calculadas sobre ele e marca d'água
+_datasets = {}
+_artifacts = {}
+_watermarks = {}
+_lock = threading.RLock()
+
+# Travas das estruturas pré-calculadas em construção: (versão, nome) -> trava (ver load_artifact)
+_building = {}
+_missing = object()
+
+# Funções que atualizam uma estrutura pré-calculada com as linhas novas do CSV (ver register_merger)
+_mergers = {}
+
+def dataset_version(path=DATASET_PATH):
+    """ Esta função identifica a versão atual do arquivo do dataset
+
+         A versão é formada pelo caminho absoluto, tamanho em bytes e data de modificação (em nanossegundos)
+         do arquivo. Qualquer alteração no CSV gera uma nova versão.
+
+        Input: path (str) - Caminho do arquivo CSV
+        Output: Tupla (caminho, tamanho, mtime) que identifica a versão do arquivo
+    """
+    stat = os.stat(path)
+    return (os.path.abspath(path), stat.st_size, stat.st_mtime_ns)
+
+def source_watermark(path, size, rows):
+    """ Esta função registra até onde o CSV foi lido (marca d'água), para detectar linhas acrescentadas
+
+         A marca guarda o tamanho lido, a quantidade de linhas do CSV até esse ponto e o hash dos primeiros
+         e dos últimos WATERMARK_BYTES bytes lidos.
+
+        Input: path (str) - Caminho do arquivo CSV
+               size (int) - Quantidade de bytes lidos
+               rows (int) - Quantidade de linhas (registros) lidas, antes da limpeza
+        Output: Dicionário com 'size', 'rows', 'head' e 'tail'
+    """
+    with open(path, 'rb') as f:
+        head = f.read(min(size, WATERMARK_BYTES))
+        f.seek(max(size - WATERMARK_BYTES, 0))
+        tail = f.read(min(size, WATERMARK_BYTES))
+    return {'size': size, 'rows': rows,
+            'head': hashlib.sha1(head).hexdigest(), 'tail': hashlib.sha1(tail).hexdigest()}
+
+def is_append(path, watermark, size):
+    """ Esta função confere se o CSV apenas recebeu linhas novas depois da marca d'água
+
+         O arquivo precisa ter crescido, a última linha lida precisa terminar em quebra de linha e o início
+         e o fim do trecho já lido precisam continuar iguais.
+
+        Input: path (str) - Caminho do arquivo CSV
+               watermark (dict) - Marca d'água da leitura anterior (ver source_watermark)
+               size (int) - Tamanho atual do arquivo
+        Output: True se o arquivo só recebeu linhas novas
+    """
+    if not watermark or size <= watermark['size'] or watermark['size'] == 0:
+        return False
+    with open(path, 'rb') as f:
+        f.seek(watermark['size'] - 1)
+        if f.read(1) != b'\n':
+            return False
+    current = source_watermark(path, watermark['size'], watermark['rows'])
+    return current['head'] == watermark['head'] and current['tail'] == watermark['tail']
+
+def clean_raw(df, report=None):
+    """ Esta função aplica toda a limpeza dos dados ao dataframe lido do CSV
+
+        Input: df - Dataframe lido do CSV
+               report (dict) - Quando informado, recebe o relatório de linhas removidas (ver dedup_report)
+        Output: Dataframe limpo
+    """
+    rename_columns(df)
+    country_name(df)
+    color_name(df)
+    return sort_by_country(compact_dtypes(clean_dataframe(df, report=report)))
+
+def read_clean(path=DATASET_PATH, workers=1, report=None):
+    """ Esta função lê o CSV completo e aplica toda a limpeza, em paralelo quando workers > 1
+
+        Input: path (str) - Caminho do arquivo CSV
+               workers (int) - Quantidade de processos (ver ingest.read_dataset_parallel)
+               report (dict) - Quando informado, recebe o relatório de linhas removidas (ver dedup_report)
+        Output: Tupla (dataframe limpo, quantidade de linhas lidas do CSV)
+    """
+    if workers > 1:
+        from utils.ingest import read_dataset_parallel
+        return read_dataset_parallel(path, workers, report)
+    with stage('read_csv'):
+        df = pd.read_csv(path)
+    return clean_raw(df, report), len(df)
+
+def save_snapshot(df1, path, version, watermark):
+    """ Esta função grava o snapshot do dataframe, ignorando a falta de permissão de escrita
+
+        Input: df1 - Dataframe limpo
+               path (str) - Caminho do arquivo CSV
+               version (tuple) - Versão do CSV
+               watermark (dict) - Marca d'água da leitura (ver source_watermark)
+        Output: None
+    """
+    try:
+        write_snapshot(df1, path, version, watermark, CLEAN_OPTIONS)
+    except OSError:
+        # Sem permissão de escrita: segue apenas com o cache em memória
+        pass
+
+def read_source(path, version):
+    """ Esta função carrega o dataset limpo do snapshot ou do CSV
+
+         Ordem de tentativa:
+
+         1. Snapshot atualizado do CSV
+         2. Snapshot de uma versão anterior, atualizado com as linhas acrescentadas ao CSV (ver utils/refresh.py)
+         3. Leitura em blocos para CSVs com STREAM_THRESHOLD_BYTES ou mais (ver utils/ingest.py)
+         4. Leitura completa do CSV, em INGEST_WORKERS processos quando configurado (ver utils/ingest.py)
+
+        Input: path (str) - Caminho do arquivo CSV
+               version (tuple) - Versão atual do CSV
+        Output: Tupla (dataframe limpo, estruturas pré-calculadas, marca d'água)
+    """
+    manifest = snapshot_manifest(path) or {}
+    with stage('read_snapshot'):
+        df1 = read_snapshot(path, version, CLEAN_OPTIONS)
+    if df1 is not None:
+        return df1, {}, manifest.get('watermark')
+
+    if manifest.get('watermark'):
+        from utils.refresh import refresh_dataset
+        old_version = (version[0], manifest['source_size'], manifest['source_mtime_ns'])
+        df_old = read_snapshot(path, old_version, CLEAN_OPTIONS)
+        if df_old is not None:
+            loaded = refresh_dataset(path, version, df_old, {}, manifest['watermark'])
+            if loaded is not None:
+                save_snapshot(loaded[0], path, version, loaded[2])
+                return loaded
+
+    if version[1] >= STREAM_THRESHOLD_BYTES:
+        from utils.ingest import ingest_csv
+        try:
+            result = ingest_csv(path, version)
+            df1 = read_snapshot(path, version, CLEAN_OPTIONS)
+            if df1 is not None:
+                return df1, {'cube': result['cube']}, result['watermark']
+        except OSError:
+            # Sem permissão de escrita: segue com a leitura completa do CSV
+            pass
+
+    df1, rows = read_clean(path, INGEST_WORKERS)
+    watermark = source_watermark(path, version[1], rows)
+    save_snapshot(df1, path, version, watermark)
+    return df1, {}, watermark
+
+def build_snapshot(path=DATASET_PATH, workers=INGEST_WORKERS):
+    """ Esta função lê e limpa o CSV e grava o snapshot binário ao lado dele
+
+        Input: path (str) - Caminho do arquivo CSV
+               workers (int) - Quantidade de processos da leitura do CSV
+        Output: Caminho do diretório do snapshot gerado
+    """
+    version = dataset_version(path)
+    df1, rows = read_clean(path, workers)
+    return write_snapshot(df1, path, version, source_watermark(path, version[1], rows), CLEAN_OPTIONS)
+
+def load_dataset(path=DATASET_PATH):
+    """ Esta função retorna o dataframe limpo, lendo o CSV apenas uma vez por processo
+
+         O resultado é memorizado pela versão do arquivo (caminho, tamanho e mtime), de modo que todas as
+         páginas e sessões recebem o mesmo objeto. Quando o CSV muda, a versão antiga é descartada.
+
+         Se o CSV apenas recebeu linhas novas no final, somente essas linhas são lidas e limpas, e o
+         dataframe e as estruturas pré-calculadas da versão anterior são atualizados (ver utils/refresh.py).
+         Qualquer outra alteração faz o dataset ser carregado novamente (ver read_source): do snapshot
+         binário quando ele está atualizado, em blocos para CSVs grandes ou pela leitura completa do CSV.
+
+         O dataframe retornado é compartilhado e não deve ser modificado: as páginas devem apenas
+         filtrar/agrupar (operações que geram cópias).
+
+        Input: path (str) - Caminho do arquivo CSV
+        Output: Dataframe limpo (somente leitura)
+    """
+    return resolve_dataset(path)[1]
+
+@timed('load_dataset')
+def resolve_dataset(path=DATASET_PATH):
+    """ Esta função carrega o dataset como load_dataset e retorna também a versão do CSV que foi carregada
+
+         Quem combina o dataframe com estruturas pré-calculadas deve usar esta versão (ver load_artifact),
+         e não consultar o arquivo novamente: linhas acrescentadas ao CSV entre as duas consultas gerariam
+         uma versão diferente da do dataframe.
+
+        Input: path (str) - Caminho do arquivo CSV
+        Output: Tupla (versão do CSV, dataframe limpo)
+    """
+    version = dataset_version(path)
+    with _lock:
+        df1 = _datasets.get(version)
+        if df1 is None:
+            previous = [key for key in _datasets if key[0] == version[0]]
+
+            loaded = None
+            if previous:
+                from utils.refresh import refresh_dataset
+                old = previous[-1]
+                loaded = refresh_dataset(path, version, _datasets[old], _artifacts[old], _watermarks[old])
+                if loaded is not None:
+                    save_snapshot(loaded[0], path, version, loaded[2])
+            if loaded is None:
+                loaded = read_source(path, version)
+            df1, artifacts, watermark = loaded
+
+            # Remoção das versões antigas do mesmo arquivo
+            for old in previous:
+                del _datasets[old]
+                _artifacts.pop(old, None)
+                _watermarks.pop(old, None)
+            _datasets[version] = df1
+            _artifacts[version] = artifacts
+            _watermarks[version] = watermark
+    return version, df1
+
+def register_merger(name, merger):
+    """ Esta função registra como uma estrutura pré-calculada é atualizada quando o CSV recebe linhas novas
+
+         Na atualização incremental (ver utils/refresh.py), a estrutura da versão anterior é passada para
+         merger(estrutura, linhas novas limpas, dataframe atualizado), que retorna a estrutura atualizada.
+         Estruturas sem merger registrado são descartadas e reconstruídas na próxima chamada de load_artifact.
+
+        Input: name (str) - Nome da estrutura (o mesmo usado em load_artifact)
+               merger - Função de atualização
+        Output: None
+    """
+    _mergers[name] = merger
+
+def load_artifact(name, builder, path=DATASET_PATH, dataset=None):
+    """ Esta função retorna uma estrutura pré-calculada sobre o dataset, construindo-a uma vez por versão
+
+         A estrutura é gerada por builder(df1) na primeira chamada e memorizada junto com o dataset; quando
+         o CSV muda ela é descartada e reconstruída a partir da nova versão.
+
+         A construção roda fora da trava global do cache, com uma trava própria de cada (versão, nome):
+         chamadas que pedem a mesma estrutura aguardam uma única construção, e as demais estruturas e o
+         load_dataset de outras sessões seguem sem esperar. A estrutura pronta é publicada sob a trava global.
+
+         A estrutura é sempre a da versão do dataframe informado em dataset (ou carregado por resolve_dataset),
+         mesmo que o CSV tenha recebido linhas novas depois: quem usa o dataframe e a estrutura juntos deve
+         passar o mesmo dataset às duas consultas.
+
+        Input: name (str) - Nome da estrutura
+               builder - Função que recebe o dataframe limpo e retorna a estrutura
+               path (str) - Caminho do arquivo CSV
+               dataset (tuple) - Versão e dataframe retornados por resolve_dataset (padrão: carregados agora)
+        Output: Estrutura pré-calculada (compartilhada, somente leitura)
+    """
+    version, df1 = resolve_dataset(path) if dataset is None else dataset
+    key = (version, name)
+    with _lock:
+        artifact = _artifacts.get(version, {}).get(name, _missing)
+        if artifact is not _missing:
+            return artifact
+        key_lock = _building.setdefault(key, threading.Lock())
+
+    try:
+        with key_lock:
+            with _lock:
+                artifact = _artifacts.get(version, {}).get(name, _missing)
+            if artifact is _missing:
+                artifact = builder(df1)
+                with _lock:
+                    # Uma versão descartada enquanto a estrutura era construída não é publicada
+                    if version in _artifacts:
+                        _artifacts[version][name] = artifact
+    finally:
+        with _lock:
+            _building.pop(key, None)
+    return artifact
+
+#===================================================#
+#     Filtro de países
+#===================================================#
+
+def build_country_index(df1):
+    """ Esta função calcula a tabela de posições de cada país no dataframe ordenado por país
+
+        Input: Dataframe ordenado por país (ver sort_by_country)
+        Output: Dicionário país -> (posição inicial, posição final) do bloco de linhas do país
+    """
+    codes = df1['country'].cat.codes.to_numpy()
+    if (np.diff(codes) < 0).any():
+        raise ValueError('O dataframe precisa estar ordenado por país (ver sort_by_country)')
+
+    counts = np.bincount(codes, minlength=len(df1['country'].cat.categories))
+    ends = np.cumsum(counts)
+    starts = ends - counts
+    return {country: (int(start), int(end))
+            for country, start, end in zip(df1['country'].cat.categories, starts, ends)
+            if end > start}
+
+@timed()
+def filter_countries(country_options, path=DATASET_PATH, dataset=None):
+    """ Esta função aplica o filtro de países ao dataset
+
+         Cada país ocupa um bloco contíguo de linhas, então o filtro apenas junta os blocos dos países
+         selecionados: blocos vizinhos são unidos e, quando resta um único bloco (ex: todos os países
+         selecionados), o resultado é um recorte do dataset sem cópia dos dados.
+
+        Input: country_options (list) - Países selecionados
+               path (str) - Caminho do arquivo CSV
+               dataset (tuple) - Versão e dataframe retornados por resolve_dataset (padrão: carregados agora)
+        Output: Dataframe com as linhas dos países selecionados
+    """
+    dataset = resolve_dataset(path) if dataset is None else dataset
+    df1 = dataset[1]
+    country_index = load_artifact('country_index', build_country_index, path, dataset)
+
+    blocos = []
+    for start, end in sorted(country_index[c] for c in set(country_options) if c in country_index):
+        if blocos and blocos[-1][1] == start:
+            blocos[-1][1] = end
+        else:
+            blocos.append([start, end])
+
+    if not blocos:
+        return df1.iloc[0:0]
+    if len(blocos) == 1:
+        return df1.iloc[blocos[0][0]:blocos[0][1]]
+    return pd.concat([df1.iloc[start:end] for start, end in blocos])
+
+#===================================================#
+#     Relatório de memória e de limpeza pela linha de comando
+#===================================================#
+
+if __name__ == '__main__':
+    # Uso: python -m utils.loader [caminho do CSV] [chave de duplicados: row | restaurant_id]
+    import sys
+
+    csv_path = sys.argv[1] if len(sys.argv) > 1 else DATASET_PATH
+    dedup_key = sys.argv[2] if len(sys.argv) > 2 else DEDUP_KEY
+    df = pd.read_csv(csv_path)
+    rename_columns(df)
+    country_name(df)
+    color_name(df)
+    clean_report = {}
+    df1 = clean_dataframe(df, dedup=dedup_key, report=clean_report)
+    report = memory_usage_report(df1, compact_dtypes(df1.copy()))
+    print(f"memory_usage(deep=True): antes {report['before']:,} bytes | "
+          f"depois {report['after']:,} bytes | redução de {report['ratio']}x")
+    print(f"limpeza: {clean_report['rows']:,} linhas lidas | removidas: {clean_report['nulls']:,} com dados nulos, "
+          f"{clean_report['excluded_cuisines']:,} por culinária, {clean_report['duplicates']:,} duplicadas "
+          f"(chave '{clean_report['dedup']}') | {clean_report['kept']:,} mantidas")
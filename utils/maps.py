@@ -0,0 +1,635 @@
+# importando as bibliotecas
+import os
+import json
+import shutil
+import hashlib
+import tempfile
+import numpy as np
+import pandas as pd
+import folium
+from branca.element import MacroElement, Template
+from folium.plugins import MarkerCluster, FastMarkerCluster
+from utils.loader import DATASET_PATH, filter_countries, load_artifact, rating_values, resolve_dataset
+from utils.cache import LRUCache
+from utils.instrumentation import timed
+
+# Colunas utilizadas no mapa de restaurantes
+MAP_COLUMNS = ['restaurant_name', 'longitude', 'latitude', 'cuisines',
+               'average_cost_for_two', 'currency', 'aggregate_rating', 'rating_color']
+
+# Modos de desenho do mapa
+MAP_MODES = ['auto', 'fast', 'pyramid', 'markers']
+
+# Quantidade de restaurantes a partir da qual o modo 'auto' usa a pirâmide de clusters
+PYRAMID_THRESHOLD = 50000
+
+# Níveis de zoom da pirâmide de clusters e células da grade por tile (256px) do mapa
+PYRAMID_MIN_ZOOM = 1
+PYRAMID_MAX_ZOOM = 12
+CELLS_PER_TILE = 4
+
+# Último nível de zoom da pirâmide enviado dentro da página; os níveis seguintes são buscados pelo navegador
+# nos JSON gravados por write_map_cells, apenas para a área visível do mapa
+PYRAMID_EMBED_ZOOM = 6
+
+# Latitude máxima da projeção de Mercator utilizada pelos mapas
+MERCATOR_MAX_LATITUDE = 85.05112878
+
+# Diretório dos níveis finos da pirâmide e dos marcadores de cada célula do último nível (JSON), configurável pela
+# variável de ambiente FOME_ZERO_MAP_CELLS_DIR. O padrão fica em static/, servido pelo Streamlit em app/static
+# (server.enableStaticServing, ver .streamlit/config.toml)
+STATIC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'static')
+MAP_CELLS_DIR = os.environ.get('FOME_ZERO_MAP_CELLS_DIR', os.path.join(STATIC_DIR, 'map_cells'))
+
+# Endereço (relativo à página) de onde o mapa busca os JSON das células, configurável pela variável de
+# ambiente FOME_ZERO_MAP_CELLS_URL
+MAP_CELLS_URL = os.environ.get('FOME_ZERO_MAP_CELLS_URL', 'app/static/map_cells')
+
+# Limite (em bytes) do cache de HTML dos mapas, configurável pela variável de ambiente FOME_ZERO_MAP_CACHE_BYTES
+MAP_CACHE_BYTES = int(os.environ.get('FOME_ZERO_MAP_CACHE_BYTES', 64 * 1024 * 1024))
+
+# Cache do processo com o HTML dos mapas já desenhados, compartilhado entre as sessões (tamanho em bytes do
+# HTML em UTF-8: nomes e popups têm acentos, então a quantidade de caracteres subestima o tamanho)
+map_html_cache = LRUCache(MAP_CACHE_BYTES, sizeof=lambda html: len(html.encode('utf-8')))
+
+#===================================================#
+#     Funções
+#===================================================#
+
+def build_marker_map(df1):
+    """ Esta função desenha o mapa criando um marcador do folium para cada restaurante
+
+         Cada restaurante gera um objeto Marker/Icon/Popup no Python e um bloco de JavaScript na página,
+         o que torna o mapa lento quando muitos países estão selecionados (ver build_fast_marker_map).
+
+        Input: Dataframe
+        Output: Mapa do folium com os marcadores agrupados em clusters
+    """
+    df1mapa = df1[MAP_COLUMNS].reset_index(drop = True)
+    df1mapa['aggregate_rating'] = rating_values(df1mapa['aggregate_rating'])
+
+    # Criando o mapa
+    mapa = folium.Map(zoom_start = 15)
+
+    #Criando os clusters
+    mc = MarkerCluster().add_to(mapa)
+
+    # Ícone para os marcadores
+    icon = 'fa-cutlery'
+
+    # Adicionar os marcadores ao mapa
+    for index, location_info in df1mapa.iterrows():
+        folium.Marker([location_info['latitude'],
+                       location_info['longitude']],
+                       icon = folium.Icon(color=location_info['rating_color'], icon=icon, prefix='fa'),
+                       popup = folium.Popup(f"""<h6> <b> {location_info['restaurant_name']} </b> </h6> <br>
+                                            Cozinha: {location_info['cuisines']} <br>
+                                            Preço médio para dois: {location_info['average_cost_for_two']}({location_info['currency']}) <br>
+                                            Avaliação: {location_info['aggregate_rating']} / 5.0 <br> """,
+                                            max_width= len(f"{location_info['restaurant_name']}")*20)).add_to(mc)
+    return mapa
+
+def marker_data(df1):
+    """ Esta função extrai os dados dos marcadores no formato compacto enviado ao navegador
+
+         Cada restaurante vira uma lista [lat, lon, nome, culinária, preço, moeda, avaliação, cor], em que
+         culinária, moeda e cor são códigos inteiros das listas de valores retornadas junto.
+
+        Input: Dataframe
+        Output: Tupla (linhas, listas de valores de 'cuisines', 'currencies' e 'colors')
+    """
+    cuisines = df1['cuisines'].astype('category')
+    currency = df1['currency'].astype('category')
+    rating_color = df1['rating_color'].astype('category')
+
+    data = [list(row) for row in zip(df1['latitude'].round(6).tolist(),
+                                     df1['longitude'].round(6).tolist(),
+                                     df1['restaurant_name'].tolist(),
+                                     cuisines.cat.codes.tolist(),
+                                     df1['average_cost_for_two'].tolist(),
+                                     currency.cat.codes.tolist(),
+                                     rating_values(df1['aggregate_rating']).tolist(),
+                                     rating_color.cat.codes.tolist())]
+    lookups = {'cuisines': list(cuisines.cat.categories),
+               'currencies': list(currency.cat.categories),
+               'colors': list(rating_color.cat.categories)}
+    return data, lookups
+
+def marker_callback(lookups):
+    """ Esta função gera a função JavaScript que cria o marcador e o popup de uma linha de marker_data
+
+        Input: lookups (dict) - Listas de valores retornadas por marker_data
+        Output: Expressão JavaScript (str) de uma função que recebe a linha e retorna o marcador
+    """
+    return """(function () {
+        var cuisines = %s;
+        var currencies = %s;
+        var colors = %s;
+        return function (row) {
+            var icon = L.AwesomeMarkers.icon({
+                "extraClasses": "fa-rotate-0", "icon": "fa-cutlery", "iconColor": "white",
+                "markerColor": colors[row[7]], "prefix": "fa"});
+            var marker = L.marker(new L.LatLng(row[0], row[1]), {icon: icon});
+            marker.bindPopup(
+                "<h6> <b> " + row[2] + " </b> </h6> <br>" +
+                " Cozinha: " + cuisines[row[3]] + " <br>" +
+                " Preço médio para dois: " + row[4] + "(" + currencies[row[5]] + ") <br>" +
+                " Avaliação: " + row[6].toFixed(1) + " / 5.0 <br> ",
+                {maxWidth: row[2].length * 20});
+            return marker;
+        };
+    })()""" % (json.dumps(lookups['cuisines']),
+               json.dumps(lookups['currencies']),
+               json.dumps(lookups['colors']))
+
+def build_fast_marker_map(df1):
+    """ Esta função desenha o mapa enviando os dados dos restaurantes como listas compactas para o navegador
+
+         Em vez de um marcador do folium por restaurante, os dados são extraídos coluna a coluna e enviados
+         em uma única lista; uma função JavaScript compartilhada (FastMarkerCluster) cria os marcadores e
+         popups no navegador. Culinária, moeda e cor da avaliação são enviadas como códigos inteiros que
+         apontam para listas de valores declaradas uma única vez.
+
+        Input: Dataframe
+        Output: Mapa do folium com os marcadores agrupados em clusters
+    """
+    data, lookups = marker_data(df1)
+
+    # Criando o mapa
+    mapa = folium.Map(zoom_start = 15)
+    FastMarkerCluster(data, callback=marker_callback(lookups)).add_to(mapa)
+    return mapa
+
+#===================================================#
+#     Pirâmide de clusters por nível de zoom
+#===================================================#
+
+def mercator_position(df1):
+    """ Esta função calcula a posição de cada restaurante no mapa, entre 0 e 1 (projeção de Mercator)
+
+        Input: Dataframe
+        Output: Tupla (x, y) de arrays numpy
+    """
+    lat = df1['latitude'].to_numpy(dtype='float64')
+    lon = df1['longitude'].to_numpy(dtype='float64')
+
+    lat_rad = np.radians(np.clip(lat, -MERCATOR_MAX_LATITUDE, MERCATOR_MAX_LATITUDE))
+    x_unit = np.clip((lon + 180) / 360, 0, 1)
+    y_unit = np.clip((1 - np.arcsinh(np.tan(lat_rad)) / np.pi) / 2, 0, 1)
+    return x_unit, y_unit
+
+def grid_cells(x_unit, y_unit, zoom):
+    """ Esta função calcula a célula da grade do nível de zoom em que cada posição do mapa cai
+
+         A grade tem CELLS_PER_TILE x CELLS_PER_TILE células por tile; a célula é numerada por coluna
+         (x * células + y), a mesma numeração usada pelo JavaScript de ClusterPyramid.
+
+        Input: x_unit, y_unit - Posições retornadas por mercator_position
+               zoom (int) - Nível de zoom
+        Output: Array numpy com a célula de cada posição
+    """
+    cells = 2 ** zoom * CELLS_PER_TILE
+    cell_x = np.minimum((x_unit * cells).astype('int64'), cells - 1)
+    cell_y = np.minimum((y_unit * cells).astype('int64'), cells - 1)
+    return cell_x * cells + cell_y
+
+def build_cluster_pyramid(df1):
+    """ Esta função calcula a pirâmide de clusters dos restaurantes para cada nível de zoom do mapa
+
+         Para cada nível de zoom entre PYRAMID_MIN_ZOOM e PYRAMID_MAX_ZOOM, o mapa (projeção de Mercator) é
+         dividido em uma grade de CELLS_PER_TILE x CELLS_PER_TILE células por tile e os restaurantes de cada
+         (país, zoom, célula) são consolidados em agregados que podem ser somados entre países:
+         quantidade, soma das coordenadas, soma das avaliações e quantidade por cor de avaliação.
+
+        Input: Dataframe
+        Output: Dicionário com as células ('cells') e a lista de cores de avaliação ('colors')
+    """
+    x_unit, y_unit = mercator_position(df1)
+
+    rating_color = df1['rating_color'].astype('category')
+    colors = list(rating_color.cat.categories)
+    color_counts = np.eye(len(colors), dtype='int64')[rating_color.cat.codes.to_numpy()]
+
+    base = pd.DataFrame({'country': df1['country'].to_numpy(),
+                         'lat': df1['latitude'].to_numpy(dtype='float64'),
+                         'lon': df1['longitude'].to_numpy(dtype='float64'),
+                         'rating': rating_values(df1['aggregate_rating']).to_numpy()})
+    color_columns = [f'color_{i}' for i in range(len(colors))]
+    for i, col in enumerate(color_columns):
+        base[col] = color_counts[:, i]
+
+    aggregations = {'count': ('lat', 'size'),
+                    'lat_sum': ('lat', 'sum'),
+                    'lon_sum': ('lon', 'sum'),
+                    'rating_sum': ('rating', 'sum')}
+    aggregations.update({col: (col, 'sum') for col in color_columns})
+
+    levels = []
+    for zoom in range(PYRAMID_MIN_ZOOM, PYRAMID_MAX_ZOOM + 1):
+        level = (base.assign(zoom=zoom, cell=grid_cells(x_unit, y_unit, zoom))
+                 .groupby(['country', 'zoom', 'cell'], observed=True)
+                 .agg(**aggregations)
+                 .reset_index())
+        levels.append(level)
+
+    return {'cells': pd.concat(levels, ignore_index=True), 'colors': colors}
+
+def load_cluster_pyramid(path=DATASET_PATH, dataset=None):
+    """ Esta função retorna a pirâmide de clusters do dataset, calculada uma única vez por versão do CSV
+
+        Input: path (str) - Caminho do arquivo CSV
+               dataset (tuple) - Versão e dataframe retornados por loader.resolve_dataset (padrão: carregados agora)
+        Output: Pirâmide de clusters (ver build_cluster_pyramid)
+    """
+    return load_artifact('cluster_pyramid', build_cluster_pyramid, path, dataset)
+
+def filter_cluster_pyramid(country_options, path=DATASET_PATH, dataset=None):
+    """ Esta função consolida os níveis da pirâmide de clusters enviados na página, nos países selecionados
+
+         Apenas os níveis até PYRAMID_EMBED_ZOOM são consolidados (os seguintes são buscados pelo navegador,
+         ver write_level_cells). As células de países diferentes que caem no mesmo ponto da grade são
+         somadas; cada cluster resultante tem a posição média, a quantidade de restaurantes, a avaliação
+         média e a cor de avaliação predominante.
+
+        Input: country_options (list) - Países selecionados
+               path (str) - Caminho do arquivo CSV
+               dataset (tuple) - Versão e dataframe retornados por loader.resolve_dataset (padrão: carregados agora)
+        Output: Dicionário com os clusters por zoom ('levels', listas [lat, lon, quantidade, avaliação,
+                código da cor, célula]) e a lista de cores de avaliação ('colors')
+    """
+    pyramid = load_cluster_pyramid(path, dataset)
+    cells = pyramid['cells']
+    cells = cells.loc[cells['country'].isin(country_options) & (cells['zoom'] <= PYRAMID_EMBED_ZOOM), :]
+    color_columns = [f'color_{i}' for i in range(len(pyramid['colors']))]
+
+    df_aux = (cells.drop(columns='country')
+              .groupby(['zoom', 'cell'])
+              .sum()
+              .reset_index())
+    df_aux['lat'] = (df_aux['lat_sum'] / df_aux['count']).round(6)
+    df_aux['lon'] = (df_aux['lon_sum'] / df_aux['count']).round(6)
+    df_aux['rating'] = (df_aux['rating_sum'] / df_aux['count']).round(2)
+    df_aux['color'] = df_aux[color_columns].to_numpy().argmax(axis=1)
+
+    levels = {}
+    for zoom, level in df_aux.groupby('zoom'):
+        levels[int(zoom)] = [list(row) for row in zip(level['lat'].tolist(),
+                                                      level['lon'].tolist(),
+                                                      level['count'].tolist(),
+                                                      level['rating'].tolist(),
+                                                      level['color'].tolist(),
+                                                      level['cell'].tolist())]
+    return {'levels': levels, 'colors': pyramid['colors']}
+
+def parent_cells(cells, zoom, parent_zoom):
+    """ Esta função calcula a célula de um nível de zoom menor que contém cada célula (ver grid_cells)
+
+        Input: cells - Array numpy com as células do nível zoom
+               zoom (int) - Nível de zoom das células
+               parent_zoom (int) - Nível de zoom das células que as contêm (menor ou igual a zoom)
+        Output: Array numpy com a célula do nível parent_zoom de cada célula
+    """
+    size = 2 ** zoom * CELLS_PER_TILE
+    shift = zoom - parent_zoom
+    return ((cells // size) >> shift) * (size >> shift) + ((cells % size) >> shift)
+
+def write_level_cells(pyramid, countries, directory):
+    """ Esta função grava os níveis da pirâmide acima de PYRAMID_EMBED_ZOOM, um JSON por nível e célula de origem
+
+         Cada arquivo z<zoom>-<célula>.json tem as células do nível zoom contidas na célula do nível
+         PYRAMID_EMBED_ZOOM (enviado na página), uma linha por país: [soma das latitudes, soma das longitudes,
+         quantidade, soma das avaliações, célula, código do país, quantidade por cor de avaliação...]. O
+         navegador soma as linhas dos países selecionados, como filter_cluster_pyramid.
+
+        Input: pyramid (dict) - Pirâmide de clusters (ver build_cluster_pyramid)
+               countries (list) - Países na ordem dos códigos (categorias da coluna 'country')
+               directory (str) - Diretório de destino
+        Output: None
+    """
+    color_columns = [f'color_{i}' for i in range(len(pyramid['colors']))]
+    cells = pyramid['cells']
+    for zoom, level in cells.loc[cells['zoom'] > PYRAMID_EMBED_ZOOM, :].groupby('zoom'):
+        cell = level['cell'].to_numpy()
+        rows = [list(row) for row in zip(level['lat_sum'].round(6).tolist(),
+                                         level['lon_sum'].round(6).tolist(),
+                                         level['count'].tolist(),
+                                         level['rating_sum'].round(2).tolist(),
+                                         cell.tolist(),
+                                         pd.Categorical(level['country'], categories=countries).codes.tolist(),
+                                         *[level[col].tolist() for col in color_columns])]
+        parents = parent_cells(cell, int(zoom), PYRAMID_EMBED_ZOOM)
+        order = np.argsort(parents, kind='stable')
+        ids, starts = np.unique(parents[order], return_index=True)
+        for parent, positions in zip(ids.tolist(), np.split(order, starts[1:])):
+            with open(os.path.join(directory, f'z{int(zoom)}-{parent}.json'), 'w', encoding='utf-8') as f:
+                json.dump([rows[i] for i in positions.tolist()], f, separators=(',', ':'))
+
+def write_map_cells(df1, pyramid, directory):
+    """ Esta função grava os níveis finos da pirâmide e os marcadores dos restaurantes em arquivos JSON por célula
+
+         Os níveis acima de PYRAMID_EMBED_ZOOM são gravados por write_level_cells. Cada arquivo <célula>.json
+         tem as linhas de marker_data dos restaurantes da célula (nível PYRAMID_MAX_ZOOM, ver grid_cells)
+         com o código do país no final. Os arquivos são gravados em um diretório temporário e movidos de
+         uma vez para directory; se outro processo gravou o mesmo diretório antes, o temporário é descartado.
+
+        Input: df1 - Dataframe limpo
+               pyramid (dict) - Pirâmide de clusters de df1 (ver build_cluster_pyramid)
+               directory (str) - Diretório de destino
+        Output: None
+    """
+    data, _ = marker_data(df1)
+    countries = df1['country'].cat.codes.tolist()
+    cell = grid_cells(*mercator_position(df1), PYRAMID_MAX_ZOOM)
+
+    order = np.argsort(cell, kind='stable')
+    cells, starts = np.unique(cell[order], return_index=True)
+
+    os.makedirs(os.path.dirname(directory), exist_ok=True)
+    tmp = tempfile.mkdtemp(prefix='.tmp-', dir=os.path.dirname(directory))
+    try:
+        write_level_cells(pyramid, list(df1['country'].cat.categories), tmp)
+        for cell_id, positions in zip(cells.tolist(), np.split(order, starts[1:])):
+            with open(os.path.join(tmp, f'{cell_id}.json'), 'w', encoding='utf-8') as f:
+                json.dump([data[i] + [countries[i]] for i in positions.tolist()], f, separators=(',', ':'))
+        os.rename(tmp, directory)
+    except OSError:
+        if not os.path.isdir(directory):
+            raise
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+def load_map_cells(path=DATASET_PATH, dataset=None):
+    """ Esta função retorna onde o mapa busca os níveis finos e os marcadores, gravando os arquivos uma vez por versão
+
+         Os arquivos de cada versão do CSV ficam em MAP_CELLS_DIR/<caminho>-<versão> (ver write_map_cells);
+         os diretórios de versões anteriores do mesmo CSV são removidos.
+
+        Input: path (str) - Caminho do arquivo CSV
+               dataset (tuple) - Versão e dataframe retornados por loader.resolve_dataset (padrão: carregados agora)
+        Output: Dicionário com o endereço das células ('url'), as listas de valores dos marcadores
+                ('lookups', ver marker_data) e a lista de países na ordem dos códigos ('countries')
+    """
+    dataset = resolve_dataset(path) if dataset is None else dataset
+    version = dataset[0]
+    prefix = hashlib.sha1(version[0].encode()).hexdigest()[:12]
+    name = f'{prefix}-{hashlib.sha1(repr(version).encode()).hexdigest()[:12]}'
+
+    def build(df1):
+        directory = os.path.join(MAP_CELLS_DIR, name)
+        if not os.path.isdir(directory):
+            write_map_cells(df1, load_cluster_pyramid(path, dataset), directory)
+        for old in os.listdir(MAP_CELLS_DIR):
+            if old.startswith(prefix + '-') and old != name:
+                shutil.rmtree(os.path.join(MAP_CELLS_DIR, old), ignore_errors=True)
+        return {'url': f'{MAP_CELLS_URL}/{name}',
+                'lookups': marker_data(df1.iloc[:0])[1],
+                'countries': list(df1['country'].cat.categories)}
+
+    return load_artifact('map_cells', build, path, dataset)
+
+class ClusterPyramid(MacroElement):
+    """ Camada do folium que desenha apenas os clusters da pirâmide do nível de zoom atual
+
+         Até PYRAMID_MAX_ZOOM cada cluster é desenhado como um círculo com a quantidade de restaurantes,
+         na cor de avaliação predominante (um clique aproxima o mapa). A página só traz os clusters até
+         PYRAMID_EMBED_ZOOM; os níveis seguintes e, acima de PYRAMID_MAX_ZOOM, os marcadores individuais
+         são buscados (uma vez) nos JSON gravados por write_map_cells, apenas para as células visíveis.
+         Uma falha na busca é exibida em um aviso no canto do mapa e no console do navegador.
+
+        Input: pyramid (dict) - Clusters retornados por filter_cluster_pyramid
+               cells (dict) - Endereço e listas de valores retornados por load_map_cells
+               country_options (list) - Países selecionados (filtram os arquivos buscados)
+    """
+    _template = Template("""
+        {% macro script(this, kwargs) %}
+            (function () {
+                var map = {{ this._parent.get_name() }};
+                var levels = {{ this.levels|tojson }};
+                var colors = {{ this.colors|tojson }};
+                var cellsUrl = {{ this.url|tojson }};
+                var selected = {{ this.countries|tojson }};
+                var callback = {{ this.callback }};
+                var minZoom = {{ this.min_zoom }};
+                var embedZoom = {{ this.embed_zoom }};
+                var maxZoom = {{ this.max_zoom }};
+                var cellsPerTile = {{ this.cells_per_tile }};
+                var layer = L.layerGroup().addTo(map);
+                var requests = {};
+                var notice = null;
+                var generation = 0;
+
+                function cellLatitude(y, cells) {
+                    return Math.atan(Math.sinh(Math.PI * (1 - 2 * y / cells))) * 180 / Math.PI;
+                }
+
+                function cellBounds(cell, zoom) {
+                    var cells = Math.pow(2, zoom) * cellsPerTile;
+                    var x = Math.floor(cell / cells), y = cell % cells;
+                    return L.latLngBounds([cellLatitude(y + 1, cells), x / cells * 360 - 180],
+                                          [cellLatitude(y, cells), (x + 1) / cells * 360 - 180]);
+                }
+
+                function showError(name, error) {
+                    console.error("Falha ao buscar " + cellsUrl + "/" + name + ".json", error);
+                    if (notice === null) {
+                        notice = L.control({position: "topright"});
+                        notice.onAdd = function () {
+                            var div = L.DomUtil.create("div");
+                            div.style.cssText = "background:white;color:darkred;padding:4px 8px;border-radius:4px;";
+                            return div;
+                        };
+                        notice.addTo(map);
+                    }
+                    notice.getContainer().textContent =
+                        "Não foi possível carregar parte do mapa (" + error.message + ")";
+                }
+
+                function fetchCells(name, transform) {
+                    if (!(name in requests)) {
+                        requests[name] = fetch(cellsUrl + "/" + name + ".json")
+                            .then(function (response) {
+                                if (!response.ok) {
+                                    throw new Error("HTTP " + response.status + " em " + name + ".json");
+                                }
+                                return response.json();
+                            })
+                            .then(transform)
+                            .catch(function (error) {
+                                delete requests[name];
+                                showError(name, error);
+                                throw error;
+                            });
+                    }
+                    return requests[name];
+                }
+
+                function loadLevel(zoom, parent) {
+                    return fetchCells("z" + zoom + "-" + parent, function (rows) {
+                        var merged = {};
+                        rows.forEach(function (row) {
+                            if (selected.indexOf(row[5]) < 0) {
+                                return;
+                            }
+                            var cell = merged[row[4]];
+                            if (!cell) {
+                                cell = merged[row[4]] = {lat: 0, lon: 0, count: 0, rating: 0, colors: []};
+                            }
+                            cell.lat += row[0];
+                            cell.lon += row[1];
+                            cell.count += row[2];
+                            cell.rating += row[3];
+                            row.slice(6).forEach(function (n, i) { cell.colors[i] = (cell.colors[i] || 0) + n; });
+                        });
+                        return Object.keys(merged).map(function (id) {
+                            var cell = merged[id];
+                            var color = cell.colors.indexOf(Math.max.apply(null, cell.colors));
+                            return [cell.lat / cell.count, cell.lon / cell.count, cell.count,
+                                    cell.rating / cell.count, color, Number(id)];
+                        });
+                    });
+                }
+
+                function loadCell(cell) {
+                    return fetchCells(String(cell), function (rows) {
+                        return rows.filter(function (row) { return selected.indexOf(row[8]) >= 0; });
+                    });
+                }
+
+                function drawCluster(cell, zoom) {
+                    var size = 24 + 6 * Math.round(Math.log10(cell[2]));
+                    var icon = L.divIcon({
+                        className: "",
+                        iconSize: [size, size],
+                        html: "<div style='width:" + size + "px;height:" + size + "px;line-height:" + size +
+                              "px;border-radius:50%;text-align:center;color:white;font-weight:bold;opacity:0.85;" +
+                              "background:" + colors[cell[4]] + "'>" + cell[2] + "</div>"});
+                    L.marker([cell[0], cell[1]], {icon: icon})
+                        .bindTooltip(cell[2] + " restaurantes<br>Avaliação média: " + cell[3].toFixed(2) + " / 5.0")
+                        .on("click", function () { map.setView([cell[0], cell[1]], zoom + 2); })
+                        .addTo(layer);
+                }
+
+                function visibleCells(cells, zoom, bounds) {
+                    return cells.filter(function (cell) { return bounds.intersects(cellBounds(cell[5], zoom)); });
+                }
+
+                function render() {
+                    layer.clearLayers();
+                    var current = ++generation;
+                    var zoom = Math.max(map.getZoom(), minZoom);
+                    var bounds = map.getBounds();
+                    if (zoom <= embedZoom) {
+                        (levels[zoom] || []).forEach(function (cell) { drawCluster(cell, zoom); });
+                        return;
+                    }
+                    var level = Math.min(zoom, maxZoom);
+                    visibleCells(levels[embedZoom] || [], embedZoom, bounds).forEach(function (parent) {
+                        loadLevel(level, parent[5]).then(function (cells) {
+                            if (current !== generation) {
+                                return;
+                            }
+                            cells = visibleCells(cells, level, bounds);
+                            if (zoom <= maxZoom) {
+                                cells.forEach(function (cell) { drawCluster(cell, zoom); });
+                                return;
+                            }
+                            cells.forEach(function (cell) {
+                                loadCell(cell[5]).then(function (rows) {
+                                    if (current === generation) {
+                                        rows.forEach(function (row) { callback(row).addTo(layer); });
+                                    }
+                                }, function () {});
+                            });
+                        }, function () {});
+                    });
+                }
+
+                map.on("zoomend moveend", render);
+                render();
+            })();
+        {% endmacro %}
+        """)
+
+    def __init__(self, pyramid, cells, country_options):
+        super().__init__()
+        self._name = 'ClusterPyramid'
+        self.levels = pyramid['levels']
+        self.colors = pyramid['colors']
+        self.url = cells['url']
+        self.countries = sorted(cells['countries'].index(country) for country in set(country_options)
+                                if country in cells['countries'])
+        self.callback = marker_callback(cells['lookups'])
+        self.min_zoom = PYRAMID_MIN_ZOOM
+        self.embed_zoom = PYRAMID_EMBED_ZOOM
+        self.max_zoom = PYRAMID_MAX_ZOOM
+        self.cells_per_tile = CELLS_PER_TILE
+
+def build_pyramid_map(country_options, path=DATASET_PATH, dataset=None):
+    """ Esta função desenha o mapa a partir da pirâmide de clusters pré-calculada
+
+         A página leva apenas os clusters dos níveis até PYRAMID_EMBED_ZOOM; os níveis seguintes e os
+         marcadores individuais ficam nos JSON por célula (ver load_map_cells) e são buscados pelo navegador
+         conforme a área visível.
+
+        Input: country_options (list) - Países selecionados
+               path (str) - Caminho do arquivo CSV
+               dataset (tuple) - Versão e dataframe retornados por loader.resolve_dataset (padrão: carregados agora)
+        Output: Mapa do folium com a camada ClusterPyramid
+    """
+    # Criando o mapa
+    mapa = folium.Map(zoom_start = 15)
+    dataset = resolve_dataset(path) if dataset is None else dataset
+    ClusterPyramid(filter_cluster_pyramid(country_options, path, dataset), load_map_cells(path, dataset),
+                   country_options).add_to(mapa)
+    return mapa
+
+@timed()
+def build_restaurant_map(df1, mode='fast', country_options=None, path=DATASET_PATH, dataset=None):
+    """ Esta função desenha o mapa de restaurantes no modo escolhido
+
+         Modos disponíveis:
+
+         - 'fast': dados compactos e marcadores criados no navegador (build_fast_marker_map)
+         - 'pyramid': clusters pré-calculados por nível de zoom (build_pyramid_map)
+         - 'markers': um marcador do folium por restaurante (build_marker_map)
+         - 'auto': 'pyramid' acima de PYRAMID_THRESHOLD restaurantes, senão 'fast'
+
+        Input: df1 - Dataframe filtrado pelos países selecionados
+               mode (str) - Modo de desenho do mapa
+               country_options (list) - Países selecionados (obrigatório nos modos 'pyramid' e 'auto')
+               path (str) - Caminho do arquivo CSV
+               dataset (tuple) - Versão e dataframe retornados por loader.resolve_dataset (padrão: carregados agora)
+        Output: Mapa do folium
+    """
+    if mode == 'auto':
+        mode = 'pyramid' if len(df1) > PYRAMID_THRESHOLD else 'fast'
+
+    if mode == 'fast':
+        return build_fast_marker_map(df1)
+    elif mode == 'pyramid':
+        return build_pyramid_map(country_options, path, dataset)
+    elif mode == 'markers':
+        return build_marker_map(df1)
+    raise ValueError(f'Modo de mapa inválido: {mode} (opções: {MAP_MODES})')
+
+@timed()
+def render_restaurant_map(country_options, mode='auto', path=DATASET_PATH):
+    """ Esta função retorna o HTML do mapa de restaurantes dos países selecionados, usando o cache de mapas
+
+         O HTML é memorizado em map_html_cache pela seleção de países (sem ordem), versão do dataset e modo
+         de desenho; o mapa só é desenhado novamente quando essa combinação ainda não está no cache.
+
+        Input: country_options (list) - Países selecionados
+               mode (str) - Modo de desenho do mapa (ver build_restaurant_map)
+               path (str) - Caminho do arquivo CSV
+        Output: HTML (str) do mapa
+    """
+    dataset = resolve_dataset(path)
+    key = (frozenset(country_options), dataset[0], mode)
+
+    def build():
+        mapa = build_restaurant_map(filter_countries(country_options, path, dataset), mode, country_options, path,
+                                    dataset)
+        return folium.Figure().add_child(mapa).render()
+
+    return map_html_cache.get_or_create(key, build)
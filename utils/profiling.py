@@ -0,0 +1,150 @@
+# importando as bibliotecas
+import os
+import io
+import glob
+import pstats
+import cProfile
+import tempfile
+from datetime import datetime
+from contextlib import contextmanager
+
+# Páginas perfiladas em todas as execuções (ex: FOME_ZERO_PROFILE=overall,cities ou FOME_ZERO_PROFILE=all)
+PROFILE_PAGES = [page for page in os.environ.get('FOME_ZERO_PROFILE', '').split(',') if page]
+
+# Parâmetro da URL que perfila uma única execução da página (ex: http://localhost:8501/overall?profile=1)
+PROFILE_PARAM = 'profile'
+
+# Diretório dos perfis, configurável pela variável de ambiente FOME_ZERO_PROFILE_DIR
+PROFILE_DIR = os.environ.get('FOME_ZERO_PROFILE_DIR', os.path.join(tempfile.gettempdir(), 'fome_zero_profiles'))
+
+# Quantidade de funções nos resumos
+TOP_FUNCTIONS = 30
+
+# Quantidade de perfis guardados por página (os mais antigos são apagados), configurável pela variável de
+# ambiente FOME_ZERO_PROFILE_KEEP; o resumo da página soma apenas os perfis guardados. O mínimo é 1: o perfil
+# da execução atual é sempre guardado
+PROFILE_KEEP = max(int(os.environ.get('FOME_ZERO_PROFILE_KEEP', 20)), 1)
+
+#===================================================#
+#     Funções
+#===================================================#
+
+def query_params():
+    """ Esta função retorna os parâmetros da URL da sessão atual (um valor por parâmetro)
+
+        Output: Dicionário parâmetro -> valor
+    """
+    import streamlit as st
+    if hasattr(st, 'query_params'):
+        return {key: st.query_params[key] for key in st.query_params}
+    return {key: values[-1] for key, values in st.experimental_get_query_params().items()}
+
+def clear_profile_param():
+    """ Esta função remove o parâmetro de perfil da URL, para que apenas uma execução seja perfilada """
+    import streamlit as st
+    if hasattr(st, 'query_params'):
+        st.query_params.pop(PROFILE_PARAM, None)
+    else:
+        params = st.experimental_get_query_params()
+        params.pop(PROFILE_PARAM, None)
+        st.experimental_set_query_params(**params)
+
+def start_profile(page):
+    """ Esta função inicia o cProfile da execução da página, quando pedido
+
+         A execução é perfilada quando a página está em FOME_ZERO_PROFILE (todas as execuções) ou quando a
+         URL tem ?profile=1 (apenas esta execução; o parâmetro é removido da URL). Somente a thread da
+         sessão que pediu o perfil é medida.
+
+        Input: page (str) - Nome da página
+        Output: Dicionário com o perfil em andamento, ou None se a execução não deve ser perfilada
+    """
+    requested = page in PROFILE_PAGES or 'all' in PROFILE_PAGES
+    try:
+        if query_params().get(PROFILE_PARAM) == '1':
+            requested = True
+            clear_profile_param()
+    except Exception:
+        # Fora do servidor do Streamlit não há parâmetros de URL
+        pass
+    if not requested:
+        return None
+
+    profiler = cProfile.Profile()
+    try:
+        profiler.enable()
+    except ValueError:
+        # Outro perfil já está ativo no processo (ex: outra sessão, em versões do Python com perfil global)
+        return None
+    return {'page': page, 'profiler': profiler, 'started': datetime.now()}
+
+def top_functions(stats, n=TOP_FUNCTIONS):
+    """ Esta função formata as n funções com maior tempo acumulado de um perfil
+
+        Input: stats - pstats.Stats
+               n (int) - Quantidade de funções
+        Output: Texto (str) do resumo
+    """
+    buffer = io.StringIO()
+    stats.stream = buffer
+    stats.sort_stats('cumulative').print_stats(n)
+    return buffer.getvalue()
+
+def finish_profile(profile):
+    """ Esta função encerra o perfil da execução e grava os arquivos em PROFILE_DIR
+
+         São gravados:
+         - <página>-<data e hora>.prof: perfil completo (abrir com pstats ou snakeviz)
+         - <página>-<data e hora>.txt: funções com maior tempo acumulado nesta execução
+         - <página>-summary.txt: funções com maior tempo acumulado somando os últimos PROFILE_KEEP perfis da
+           página (os perfis mais antigos são apagados)
+
+        Input: profile (dict) - Perfil em andamento (retornado por start_profile), ou None
+        Output: Caminho do arquivo .prof gravado, ou None
+    """
+    if profile is None:
+        return None
+    profile['profiler'].disable()
+
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    base = os.path.join(PROFILE_DIR, f"{profile['page']}-{profile['started']:%Y%m%d-%H%M%S-%f}")
+    profile['profiler'].dump_stats(base + '.prof')
+    with open(base + '.txt', 'w', encoding='utf-8') as f:
+        f.write(top_functions(pstats.Stats(profile['profiler'])))
+
+    # Apenas os últimos PROFILE_KEEP perfis da página são guardados e somados no resumo
+    files = sorted(glob.glob(os.path.join(PROFILE_DIR, f"{profile['page']}-*.prof")))
+    for old in files[:-PROFILE_KEEP]:
+        for name in [old, old[:-len('.prof')] + '.txt']:
+            try:
+                os.remove(name)
+            except FileNotFoundError:
+                pass
+    files = files[-PROFILE_KEEP:]
+    with open(os.path.join(PROFILE_DIR, f"{profile['page']}-summary.txt"), 'w', encoding='utf-8') as f:
+        f.write(f'{len(files)} execuções perfiladas\n')
+        f.write(top_functions(pstats.Stats(*files)))
+
+    try:
+        import streamlit as st
+        st.sidebar.caption(f'Perfil desta execução gravado em {base}.prof')
+    except Exception:
+        pass
+    return base + '.prof'
+
+@contextmanager
+def profiled(page):
+    """ Esta função perfila o trecho de código dentro do bloco with (o corpo da página), quando pedido
+
+         O perfil é iniciado por start_profile e sempre encerrado e gravado por finish_profile, inclusive
+         quando o trecho termina com uma exceção, como as usadas pelo Streamlit para interromper a
+         execução (st.stop, st.rerun ou uma nova interação do usuário durante a execução).
+
+        Input: page (str) - Nome da página
+        Output: Gerenciador de contexto (com o perfil em andamento, ou None)
+    """
+    profile = start_profile(page)
+    try:
+        yield profile
+    finally:
+        finish_profile(profile)
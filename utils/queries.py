@@ -0,0 +1,257 @@
+# importando as bibliotecas
+import os
+import numpy as np
+from utils.loader import DATASET_PATH, filter_countries, load_artifact, rating_values, resolve_dataset
+from utils.cache import LRUCache
+from utils.cube import RATING_BINS, filter_cube, load_rating_histogram, rollup
+from utils.distinct import distinct_counts
+from utils.instrumentation import timed
+
+# Limite (em bytes) do cache de consultas, configurável pela variável de ambiente FOME_ZERO_QUERY_CACHE_BYTES
+QUERY_CACHE_BYTES = int(os.environ.get('FOME_ZERO_QUERY_CACHE_BYTES', 32 * 1024 * 1024))
+
+# Colunas da tabela de melhores restaurantes
+TOP_RESTAURANTS_COLUMNS = ['restaurant_id', 'restaurant_name', 'country', 'city', 'cuisines',
+                           'average_cost_for_two', 'aggregate_rating', 'votes']
+
+# Cache do processo com os resultados das consultas por seleção de países, compartilhado entre as sessões
+query_cache = LRUCache(QUERY_CACHE_BYTES, sizeof=lambda value: result_nbytes(value))
+
+#===================================================#
+#     Funções
+#===================================================#
+
+def result_nbytes(value):
+    """ Esta função estima o tamanho em bytes do resultado de uma consulta
+
+        Input: value - Dataframe ou tupla de Dataframes
+        Output: Tamanho em bytes (int)
+    """
+    if isinstance(value, tuple):
+        return sum(result_nbytes(item) for item in value)
+    return int(value.memory_usage(deep=True).sum())
+
+def best_restaurant_by_cuisine(df1):
+    """ Esta função encontra o melhor restaurante de cada tipo culinário em uma única passada
+
+         O melhor restaurante é o de maior avaliação ('aggregate_rating') e, em caso de empate, o de menor
+         'restaurant_id'. O cálculo é feito para todas as culinárias de uma vez: a maior avaliação de cada
+         culinária é comparada com a de cada restaurante e, entre os empatados, fica o menor ID.
+
+        Input: Dataframe
+        Output: Dataframe indexado por culinária com país, cidade, ID, nome, preço para dois, moeda e
+                avaliação do melhor restaurante
+    """
+    df_aux = df1.loc[:, ['cuisines', 'country', 'city', 'restaurant_id', 'restaurant_name',
+                         'average_cost_for_two', 'currency', 'aggregate_rating']]
+
+    # Restaurantes com a maior avaliação da sua culinária
+    max_rating = df_aux.groupby('cuisines', observed=True)['aggregate_rating'].transform('max')
+    df_aux = df_aux.loc[df_aux['aggregate_rating'] == max_rating, :]
+
+    # Entre os empatados, o restaurante de menor ID
+    linhas = df_aux.groupby('cuisines', observed=True)['restaurant_id'].idxmin()
+    df_aux = df_aux.loc[linhas.to_numpy(), :]
+
+    df_aux['aggregate_rating'] = rating_values(df_aux['aggregate_rating'])
+    df_aux['cuisines'] = df_aux['cuisines'].astype(str)
+    return df_aux.set_index('cuisines')
+
+def cached_query(name, builder, country_options, path=DATASET_PATH):
+    """ Esta função executa uma consulta sobre os países selecionados, memorizando o resultado
+
+         O resultado fica em query_cache, indexado pelo nome da consulta, seleção de países (sem ordem) e
+         versão do dataset.
+
+        Input: name (str) - Nome da consulta
+               builder - Função que recebe o dataframe filtrado e retorna o resultado (Dataframe)
+               country_options (list) - Países selecionados
+               path (str) - Caminho do arquivo CSV
+        Output: Resultado da consulta (compartilhado, somente leitura)
+    """
+    dataset = resolve_dataset(path)
+    key = (name, frozenset(country_options), dataset[0])
+    return query_cache.get_or_create(key, lambda: builder(filter_countries(country_options, path, dataset)))
+
+def unique_restaurant_ids(df1):
+    """ Esta função verifica se cada restaurant_id aparece em uma única linha do dataframe limpo
+
+         Com a remoção de duplicados pela chave 'restaurant_id' (ver loader.DEDUP_KEYS) isso é sempre
+         verdade; com a chave 'row', duas linhas diferentes do mesmo restaurante são mantidas.
+
+        Input: Dataframe limpo
+        Output: True se os IDs são únicos
+    """
+    return bool(df1['restaurant_id'].is_unique)
+
+def restaurant_counts(df_aux, country_options, by, path=DATASET_PATH, dataset=None):
+    """ Esta função conta os restaurantes distintos (restaurant_id) de cada grupo de um agregado do cubo
+
+         Com IDs únicos no dataset, a quantidade de restaurantes é a de linhas ('rows' do cubo). Caso
+         contrário, a contagem vem dos bitsets de restaurant_id por grupo (ver utils/distinct.py).
+
+        Input: df_aux - Agregado do cubo (ver cube.rollup)
+               country_options (list) - Países selecionados
+               by (list) - Dimensões do agrupamento
+               path (str) - Caminho do arquivo CSV
+               dataset (tuple) - Versão e dataframe retornados por loader.resolve_dataset (padrão: carregados agora)
+        Output: Array com a quantidade de restaurantes de cada linha de df_aux
+    """
+    if load_artifact('unique_restaurant_ids', unique_restaurant_ids, path, dataset):
+        return df_aux['rows'].to_numpy()
+    counts = distinct_counts(country_options, by, 'restaurant_id', path=path, dataset=dataset)
+    return df_aux.loc[:, by].merge(counts, on=by, how='left')['restaurants'].to_numpy()
+
+@timed()
+def aggregate(country_options, by, path=DATASET_PATH, dataset=None):
+    """ Esta função retorna as métricas do cubo de agregados consolidadas nas dimensões informadas
+
+         A quantidade de restaurantes ('restaurants') conta os restaurant_id distintos de cada grupo (ver
+         restaurant_counts); as médias são calculadas sobre as linhas ('rows').
+
+         Consultas iguais (mesmas dimensões, países e versão do dataset) feitas por funções diferentes,
+         na mesma execução da página ou em execuções e sessões seguintes, são calculadas uma única vez. O
+         dataset é resolvido uma vez e o cubo e as contagens saem dessa mesma versão.
+
+        Input: country_options (list) - Países selecionados
+               by (str ou list) - Dimensões do agrupamento
+               path (str) - Caminho do arquivo CSV
+               dataset (tuple) - Versão e dataframe retornados por loader.resolve_dataset (padrão: carregados agora)
+        Output: Dataframe com uma linha por grupo (ver cube.rollup)
+    """
+    by = (by,) if isinstance(by, str) else tuple(by)
+    dataset = resolve_dataset(path) if dataset is None else dataset
+    key = ('aggregate', by, frozenset(country_options), dataset[0])
+
+    def build():
+        df_aux = rollup(filter_cube(country_options, path, dataset), list(by))
+        df_aux.insert(len(by), 'restaurants', restaurant_counts(df_aux, country_options, list(by), path, dataset))
+        return df_aux
+
+    return query_cache.get_or_create(key, build)
+
+@timed()
+def ranking(country_options, by, column, n, path=DATASET_PATH, dataset=None):
+    """ Esta função retorna as duas pontas de uma classificação a partir de um único agregado
+
+        Input: country_options (list) - Países selecionados
+               by (str ou list) - Dimensões do agrupamento
+               column (str) - Métrica da classificação (ver cube.rollup)
+               n (int) - Quantidade de grupos em cada ponta
+               path (str) - Caminho do arquivo CSV
+               dataset (tuple) - Versão e dataframe retornados por loader.resolve_dataset (padrão: carregados agora)
+        Output: Tupla (n maiores em ordem decrescente, n menores em ordem crescente)
+    """
+    by = (by,) if isinstance(by, str) else tuple(by)
+    dataset = resolve_dataset(path) if dataset is None else dataset
+    key = ('ranking', by, column, n, frozenset(country_options), dataset[0])
+
+    def build():
+        df_aux = aggregate(country_options, by, path, dataset)
+        return (df_aux.sort_values(column, ascending=False).reset_index(drop=True).head(n),
+                df_aux.sort_values(column, ascending=True).reset_index(drop=True).head(n))
+
+    return query_cache.get_or_create(key, build)
+
+@timed()
+def rating_threshold_counts(country_options, above, below, path=DATASET_PATH, dataset=None):
+    """ Esta função conta, por cidade, os restaurantes com avaliação acima e abaixo dos limites informados
+
+         As contagens saem do histograma acumulado de avaliações por cidade (ver cube.build_rating_histogram),
+         com custo proporcional ao número de cidades e não ao número de restaurantes. Os limites são
+         arredondados para uma casa decimal, a resolução das avaliações.
+
+        Input: country_options (list) - Países selecionados
+               above (float) - Limite inferior (exclusivo) da contagem 'above'
+               below (float) - Limite superior (exclusivo) da contagem 'below'
+               path (str) - Caminho do arquivo CSV
+               dataset (tuple) - Versão e dataframe retornados por loader.resolve_dataset (padrão: carregados agora)
+        Output: Dataframe com país, cidade e as contagens 'above' e 'below'
+    """
+    histogram = load_rating_histogram(path, dataset)
+    linhas = histogram['groups']['country'].isin(country_options).to_numpy()
+    cumulative = histogram['cumulative'][linhas]
+
+    # Posição do limite no histograma (0.1 -> faixa 1)
+    above = min(max(int(round(above * 10)), -1), RATING_BINS - 1)
+    below = min(max(int(round(below * 10)), 0), RATING_BINS)
+
+    df_aux = histogram['groups'].loc[linhas, :].reset_index(drop=True)
+    df_aux['above'] = cumulative[:, -1] - (cumulative[:, above] if above >= 0 else 0)
+    df_aux['below'] = cumulative[:, below - 1] if below > 0 else 0
+    return df_aux
+
+@timed()
+def best_restaurants(country_options, path=DATASET_PATH):
+    """ Esta função retorna o melhor restaurante de cada culinária nos países selecionados
+
+        Input: country_options (list) - Países selecionados
+               path (str) - Caminho do arquivo CSV
+        Output: Dataframe indexado por culinária (ver best_restaurant_by_cuisine)
+    """
+    return cached_query('best_restaurant_by_cuisine', best_restaurant_by_cuisine, country_options, path)
+
+def build_rank_order(df1):
+    """ Esta função calcula a ordem global de classificação dos restaurantes
+
+         Os restaurantes são ordenados por avaliação decrescente e, em caso de empate, por ID crescente.
+         Junto com a ordem é guardado o código do país de cada posição, usado para filtrar a seleção
+         de países sem reordenar os dados.
+
+        Input: Dataframe
+        Output: Dicionário com as posições das linhas na ordem de classificação ('order') e o código do
+                país de cada posição ('country_codes')
+    """
+    rating = rating_values(df1['aggregate_rating']).to_numpy()
+    order = np.lexsort((df1['restaurant_id'].to_numpy(), -rating))
+    return {'order': order, 'country_codes': df1['country'].cat.codes.to_numpy()[order]}
+
+@timed()
+def top_restaurants(country_options, n, path=DATASET_PATH):
+    """ Esta função retorna os n melhores restaurantes dos países selecionados
+
+         A ordem global de classificação (ver build_rank_order) é percorrida em blocos até passar de n
+         restaurantes (avaliação e ID) dos países selecionados, sem ordenar os dados a cada execução. As
+         linhas de um mesmo restaurante ficam juntas nessa ordem e são consolidadas como na tabela original:
+         agrupadas pelas colunas exibidas, com a soma dos votos.
+
+         O resultado fica em query_cache, indexado pela seleção de países (sem ordem), n e versão do dataset.
+
+        Input: country_options (list) - Países selecionados
+               n (int) - Quantidade de restaurantes
+               path (str) - Caminho do arquivo CSV
+        Output: Dataframe com os n melhores restaurantes (colunas TOP_RESTAURANTS_COLUMNS)
+    """
+    dataset = resolve_dataset(path)
+    key = ('top_restaurants', frozenset(country_options), n, dataset[0])
+
+    def build():
+        df1 = dataset[1]
+        rank = load_artifact('rank_order', build_rank_order, path, dataset)
+        ids = df1['restaurant_id'].to_numpy()
+        ratings = df1['aggregate_rating'].to_numpy()
+
+        # Tabela código do país -> país selecionado
+        selected = np.asarray(df1['country'].cat.categories.isin(country_options))
+
+        # Posições na ordem de classificação até passar de n restaurantes: os n primeiros ficam completos
+        positions = rank['order'][:0]
+        start, chunk = 0, max(4 * n, 1024)
+        while start < len(rank['order']):
+            block = slice(start, start + chunk)
+            positions = np.concatenate([positions, rank['order'][block][selected[rank['country_codes'][block]]]])
+            start, chunk = start + chunk, 2 * chunk
+            changes = (np.diff(ids[positions]) != 0) | (np.diff(ratings[positions]) != 0)
+            if len(positions) and 1 + changes.sum() > n:
+                break
+
+        df_aux = (df1.iloc[positions].loc[:, TOP_RESTAURANTS_COLUMNS]
+                  .groupby(TOP_RESTAURANTS_COLUMNS[:-1], observed=True, sort=False)
+                  .sum()
+                  .reset_index())
+        df_aux['aggregate_rating'] = rating_values(df_aux['aggregate_rating'])
+        return (df_aux.sort_values(['aggregate_rating', 'restaurant_id'], ascending=[False, True], kind='stable')
+                .reset_index(drop=True)
+                .head(n))
+
+    return query_cache.get_or_create(key, build)
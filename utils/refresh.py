@@ -0,0 +1,76 @@
+# importando as bibliotecas
+import io
+import numpy as np
+import pandas as pd
+from utils.loader import (_mergers, clean_dataframe, color_name, compact_dtypes, concat_cleaned, country_name,
+                          dedup_fingerprints, is_append, rename_columns, source_watermark)
+
+#===================================================#
+#     Funções
+#===================================================#
+
+def read_appended_rows(path, watermark, size):
+    """ Esta função lê apenas as linhas acrescentadas ao CSV depois da marca d'água
+
+         O trecho novo é lido junto com a linha de cabeçalho do arquivo, e o índice das linhas continua a
+         numeração da leitura anterior (a mesma posição que teriam na leitura completa do CSV).
+
+        Input: path (str) - Caminho do arquivo CSV
+               watermark (dict) - Marca d'água da leitura anterior (ver loader.source_watermark)
+               size (int) - Tamanho atual do arquivo
+        Output: Dataframe com as linhas novas, antes da limpeza
+    """
+    with open(path, 'rb') as f:
+        header = f.readline()
+        f.seek(watermark['size'])
+        data = f.read(size - watermark['size'])
+
+    df = pd.read_csv(io.BytesIO(header + data))
+    df.index = pd.RangeIndex(watermark['rows'], watermark['rows'] + len(df))
+    return df
+
+def refresh_dataset(path, version, df1, artifacts, watermark):
+    """ Esta função atualiza o dataset limpo com as linhas acrescentadas ao final do CSV
+
+         Apenas as linhas novas são lidas e limpas. Linhas novas iguais a linhas já carregadas são
+         descartadas pelo hash de 64 bits da chave de duplicados (ver loader.dedup_fingerprints), e as estruturas
+         pré-calculadas com função de atualização registrada (ver loader.register_merger) são atualizadas
+         com as linhas novas em vez de recalculadas.
+
+         Se o CSV teve qualquer alteração além de linhas acrescentadas no final, a função retorna None e o
+         dataset deve ser carregado novamente.
+
+        Input: path (str) - Caminho do arquivo CSV
+               version (tuple) - Versão atual do CSV
+               df1 - Dataframe limpo da versão anterior
+               artifacts (dict) - Estruturas pré-calculadas da versão anterior
+               watermark (dict) - Marca d'água da versão anterior (ver loader.source_watermark)
+        Output: Tupla (dataframe limpo, estruturas pré-calculadas, marca d'água), ou None
+    """
+    if not is_append(path, watermark, version[1]):
+        return None
+
+    df = read_appended_rows(path, watermark, version[1])
+    rename_columns(df)
+    country_name(df)
+    color_name(df)
+    if list(df.columns) != [col if col != 'country' else 'country_code' for col in df1.columns]:
+        return None
+    df_new = compact_dtypes(clean_dataframe(df))
+
+    # Remoção das linhas novas que repetem linhas já carregadas
+    seen = artifacts.get('dedup_fingerprints')
+    if seen is None:
+        seen = np.unique(dedup_fingerprints(df1))
+    fingerprints = dedup_fingerprints(df_new)
+    positions = np.minimum(np.searchsorted(seen, fingerprints), max(len(seen) - 1, 0))
+    repeated = seen[positions] == fingerprints if len(seen) else np.zeros(len(df_new), dtype=bool)
+    df_new = df_new.loc[~repeated, :]
+
+    # Linhas novas depois das antigas em cada país, como na leitura completa do CSV
+    df_updated = concat_cleaned([df1, df_new])
+
+    updated = {name: _mergers[name](artifact, df_new, df_updated)
+               for name, artifact in artifacts.items() if name in _mergers}
+    updated['dedup_fingerprints'] = np.union1d(seen, fingerprints[~repeated])
+    return df_updated, updated, source_watermark(path, version[1], watermark['rows'] + len(df))
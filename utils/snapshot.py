@@ -0,0 +1,193 @@
+# importando as bibliotecas
+import os
+import json
+import mmap
+import shutil
+import numpy as np
+import pandas as pd
+
+# Versão do formato do snapshot: deve ser incrementada sempre que a limpeza dos dados mudar,
+# invalidando os snapshots gerados pela versão anterior
+SNAPSHOT_FORMAT = 5
+
+#===================================================#
+#     Funções
+#===================================================#
+
+def snapshot_path(path):
+    """ Esta função retorna o diretório do snapshot de um arquivo CSV
+
+         O snapshot fica ao lado do CSV, com o mesmo nome acrescido do sufixo '.snapshot'
+         (ex: zomato.csv -> zomato.csv.snapshot/).
+
+        Input: path (str) - Caminho do arquivo CSV
+        Output: Caminho do diretório do snapshot
+    """
+    return os.path.abspath(path) + '.snapshot'
+
+def category_codes_dtype(n_values):
+    """ Esta função retorna o menor tipo inteiro para os códigos de uma coluna categórica
+
+         É o mesmo tipo que o pandas usa nos códigos de um Categorical com n_values categorias, de modo que
+         os códigos gravados são usados pelo pandas sem conversão (e sem cópia) na leitura.
+
+        Input: n_values (int) - Quantidade de categorias
+        Output: Tipo numpy dos códigos
+    """
+    for dtype in ['int8', 'int16']:
+        if n_values < np.iinfo(dtype).max:
+            return np.dtype(dtype)
+    return np.dtype('int32')
+
+def write_snapshot(df1, path, version, watermark=None, options=None):
+    """ Esta função grava o dataframe limpo em formato colunar binário (um arquivo .npy por coluna)
+
+         Colunas numéricas são gravadas diretamente. Colunas categóricas têm seus códigos gravados em .npy e
+         colunas de texto são fatoradas em códigos inteiros (nulos: código -1); em ambos os casos a lista de
+         valores fica no arquivo 'manifest.json', junto com a versão do CSV de origem, e a coluna é lida como
+         categórica. A gravação é feita em um diretório temporário e renomeada ao final, para que um leitor
+         nunca encontre um snapshot pela metade.
+
+        Input: df1 - Dataframe limpo
+               path (str) - Caminho do arquivo CSV de origem
+               version (tuple) - Versão do CSV (retornada por loader.dataset_version)
+               watermark (dict) - Marca d'água da leitura do CSV (ver loader.source_watermark)
+               options (dict) - Opções da limpeza usadas na geração (ver loader.CLEAN_OPTIONS)
+        Output: Caminho do diretório do snapshot
+    """
+    target, tmp = create_snapshot_dir(path)
+
+    columns = []
+    for i, col in enumerate(df1.columns):
+        serie = df1[col]
+        filename = f'{i}.npy'
+        if isinstance(serie.dtype, pd.CategoricalDtype):
+            np.save(os.path.join(tmp, filename), serie.cat.codes.to_numpy())
+            columns.append({'name': col, 'file': filename, 'kind': 'category',
+                            'values': list(serie.cat.categories)})
+        elif serie.dtype == object or pd.api.types.is_string_dtype(serie.dtype):
+            serie = serie.astype('category')
+            np.save(os.path.join(tmp, filename), serie.cat.codes.to_numpy())
+            columns.append({'name': col, 'file': filename, 'kind': 'category',
+                            'values': list(serie.cat.categories)})
+        else:
+            np.save(os.path.join(tmp, filename), serie.to_numpy())
+            columns.append({'name': col, 'file': filename, 'kind': 'numeric'})
+
+    np.save(os.path.join(tmp, 'index.npy'), df1.index.to_numpy())
+    return finish_snapshot(tmp, target, version, columns, watermark, options)
+
+def create_snapshot_dir(path):
+    """ Esta função cria o diretório temporário onde um novo snapshot é gravado
+
+        Input: path (str) - Caminho do arquivo CSV de origem
+        Output: Tupla (diretório final do snapshot, diretório temporário)
+    """
+    target = snapshot_path(path)
+    tmp = f'{target}.tmp{os.getpid()}'
+    shutil.rmtree(tmp, ignore_errors=True)
+    os.makedirs(tmp)
+    return target, tmp
+
+def finish_snapshot(tmp, target, version, columns, watermark=None, options=None):
+    """ Esta função grava o manifest do snapshot e o publica no lugar do snapshot anterior
+
+        Input: tmp (str) - Diretório temporário com os arquivos .npy das colunas e do índice
+               target (str) - Diretório final do snapshot
+               version (tuple) - Versão do CSV (retornada por loader.dataset_version)
+               columns (list) - Descrição das colunas (nome, arquivo, tipo e valores)
+               watermark (dict) - Marca d'água da leitura do CSV, usada na atualização incremental
+               options (dict) - Opções da limpeza usadas na geração
+        Output: Caminho do diretório do snapshot
+    """
+    manifest = {'format': SNAPSHOT_FORMAT,
+                'source_size': version[1],
+                'source_mtime_ns': version[2],
+                'watermark': watermark,
+                'options': options or {},
+                'columns': columns}
+    with open(os.path.join(tmp, 'manifest.json'), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False)
+
+    shutil.rmtree(target, ignore_errors=True)
+    os.replace(tmp, target)
+    return target
+
+def snapshot_manifest(path):
+    """ Esta função lê o manifest do snapshot de um arquivo CSV
+
+        Input: path (str) - Caminho do arquivo CSV de origem
+        Output: Dicionário do manifest, ou None se o snapshot não existir
+    """
+    try:
+        with open(os.path.join(snapshot_path(path), 'manifest.json'), encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def read_snapshot(path, version, options=None):
+    """ Esta função carrega o snapshot do dataset mapeando os arquivos .npy em memória
+
+         O dataframe é montado sem copiar os dados: cada coluna é uma Series sobre o array mapeado (as
+         colunas categóricas, sobre os códigos mapeados), e as colunas não são consolidadas em blocos 2-D.
+         Apenas as páginas do arquivo efetivamente lidas ocupam memória, compartilhada com o cache de
+         arquivos do sistema operacional. Os arrays mapeados são somente leitura.
+
+         O snapshot só é utilizado se foi gerado a partir da mesma versão do CSV (tamanho e mtime), com o
+         formato atual e com as mesmas opções de limpeza; caso contrário a função retorna None e o CSV deve
+         ser lido novamente.
+
+         Os valores de uma coluna categórica ficam no manifest ('values') ou, nas colunas de texto gravadas
+         pela ingestão em blocos, em um arquivo JSON próprio ('values_file', ver ingest.merge_text).
+
+        Input: path (str) - Caminho do arquivo CSV de origem
+               version (tuple) - Versão atual do CSV (retornada por loader.dataset_version)
+               options (dict) - Opções da limpeza esperadas (ver loader.CLEAN_OPTIONS)
+        Output: Dataframe limpo, ou None se o snapshot não existir ou estiver desatualizado
+    """
+    target = snapshot_path(path)
+    manifest = snapshot_manifest(path)
+    if (manifest is None
+            or manifest.get('format') != SNAPSHOT_FORMAT
+            or manifest.get('source_size') != version[1]
+            or manifest.get('source_mtime_ns') != version[2]
+            or manifest.get('options', {}) != (options or {})):
+        return None
+
+    index = pd.Index(np.load(os.path.join(target, 'index.npy'), mmap_mode='r'), copy=False)
+    data = {}
+    for col in manifest['columns']:
+        values = np.load(os.path.join(target, col['file']), mmap_mode='r')
+        if col['kind'] == 'category':
+            if 'values_file' in col:
+                with open(os.path.join(target, col['values_file']), encoding='utf-8') as f:
+                    col['values'] = json.load(f)
+            values = pd.Categorical.from_codes(values, categories=col['values'])
+        data[col['name']] = pd.Series(values, index=index, name=col['name'], copy=False)
+    return pd.DataFrame(data, copy=False)
+
+def memory_mapped(serie):
+    """ Esta função verifica se os dados de uma coluna ainda são o array mapeado do snapshot (sem cópia)
+
+        Input: serie - Coluna do dataframe (Series)
+        Output: True se o array da coluna (os códigos, nas categóricas) é uma visão do arquivo mapeado
+    """
+    # A cópia de um np.memmap também é um np.memmap, mas com memória própria: a cadeia de bases de uma
+    # coluna mapeada termina no objeto mmap do arquivo
+    values = serie.array.codes if isinstance(serie.dtype, pd.CategoricalDtype) else serie.to_numpy()
+    while values is not None and not isinstance(values, mmap.mmap):
+        values = getattr(values, 'base', None)
+    return values is not None
+
+#===================================================#
+#     Geração do snapshot pela linha de comando
+#===================================================#
+
+if __name__ == '__main__':
+    # Uso: python -m utils.snapshot [caminho do CSV] [quantidade de processos]
+    import sys
+    from utils.loader import DATASET_PATH, INGEST_WORKERS, build_snapshot
+
+    csv_path = sys.argv[1] if len(sys.argv) > 1 else DATASET_PATH
+    workers = int(sys.argv[2]) if len(sys.argv) > 2 else INGEST_WORKERS
+    print(f'Snapshot gerado em: {build_snapshot(csv_path, workers)}')
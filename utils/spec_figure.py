@@ -0,0 +1,31 @@
+# importando as bibliotecas
+import plotly.io as pio
+import plotly.graph_objects as go
+
+#===================================================#
+#     Gráfico com o spec pronto
+#===================================================#
+
+class SpecFigure(go.Figure):
+    """ Gráfico do plotly que guarda o spec resolvido (dicionário com o template aplicado) e o tamanho do seu JSON
+
+         O spec e o JSON são gerados uma única vez, na construção. to_dict retorna o spec guardado, sem
+         percorrer e copiar as propriedades do gráfico: st.plotly_chart chama to_dict a cada execução da
+         página e apenas converte o dicionário pronto em JSON.
+
+         O gráfico é compartilhado entre as sessões (ver figures.figure_cache) e não deve ser modificado.
+
+        Input: spec (dict) - Dicionário com 'data' e 'layout' (ver figures.bar_spec)
+    """
+    def __init__(self, spec):
+        super().__init__(spec, _validate=False)
+        self._spec = super().to_dict()
+        self._nbytes = len(pio.to_json(self._spec, validate=False).encode('utf-8'))
+
+    @property
+    def nbytes(self):
+        """ Tamanho (em bytes) do JSON do spec, calculado na construção """
+        return self._nbytes
+
+    def to_dict(self):
+        return self._spec
@@ -0,0 +1,174 @@
+# importando as bibliotecas
+import os
+import numpy as np
+import pandas as pd
+from utils.loader import DATASET_PATH
+
+# Linhas geradas por bloco; cada bloco tem a própria semente (derivada da semente e do número do bloco), de modo
+# que o arquivo gerado depende apenas da semente e da quantidade de linhas
+BLOCK_ROWS = 100000
+
+# Colunas sorteadas em conjunto a partir de um restaurante de referência do mesmo país (mantém a relação
+# entre preço, moeda, faixa de preço, serviços, avaliação, cor e texto da avaliação e votos)
+COUNTRY_COLUMNS = ['Restaurant Name', 'Average Cost for two', 'Currency', 'Has Table booking',
+                   'Has Online delivery', 'Is delivering now', 'Switch to order menu', 'Price range',
+                   'Aggregate rating', 'Rating color', 'Rating text', 'Votes']
+
+# Colunas sorteadas a partir de um restaurante de referência da mesma cidade
+CITY_COLUMNS = ['Address', 'Locality', 'Locality Verbose']
+
+# Desvio padrão mínimo das coordenadas de uma cidade (graus), para cidades com um único restaurante
+MIN_COORDINATE_STD = 0.01
+
+#===================================================#
+#     Funções
+#===================================================#
+
+def learn_model(path=DATASET_PATH):
+    """ Esta função aprende as distribuições das colunas do CSV usadas na geração de dados sintéticos
+
+         O modelo guarda:
+         - A frequência de cada cidade (e o país da cidade)
+         - A média e o desvio padrão das coordenadas de cada cidade
+         - Os restaurantes de cada país e de cada cidade, sorteados como referência para as demais colunas
+           (distribuições de avaliação, preço e culinárias por país, com os nulos de 'Cuisines')
+         - A taxa de linhas duplicadas do CSV
+
+        Input: path (str) - Caminho do arquivo CSV de referência (padrão: zomato.csv)
+        Output: Dicionário com o modelo
+    """
+    df = pd.read_csv(path)
+    duplicate_rate = float(df.duplicated().mean())
+
+    # Restaurantes ordenados por país e cidade: os de um país (e os de uma cidade) ficam em posições contíguas
+    df = df.drop_duplicates().sort_values(['Country Code', 'City'], kind='stable').reset_index(drop=True)
+    position = pd.Series(np.arange(len(df)))
+    countries = position.groupby(df['Country Code']).agg(['first', 'size'])
+    cities = (df.assign(position=position)
+                .groupby(['Country Code', 'City'])
+                .agg(start=('position', 'first'), size=('position', 'size'),
+                     longitude=('Longitude', 'mean'), longitude_std=('Longitude', 'std'),
+                     latitude=('Latitude', 'mean'), latitude_std=('Latitude', 'std'))
+                .reset_index())
+    country_code = cities['Country Code'].to_numpy()
+
+    return {'columns': list(df.columns),
+            'rows': df,
+            'duplicate_rate': duplicate_rate,
+            'first_id': int(df['Restaurant ID'].max()) + 1,
+            'city_name': cities['City'].to_numpy(dtype=object),
+            'city_country': country_code,
+            'city_probability': (cities['size'] / cities['size'].sum()).to_numpy(),
+            'city_start': cities['start'].to_numpy(),
+            'city_rows': cities['size'].to_numpy(),
+            'country_start': countries['first'].reindex(country_code).to_numpy(),
+            'country_rows': countries['size'].reindex(country_code).to_numpy(),
+            'coordinates': {col: (cities[col.lower()].to_numpy(),
+                                  np.maximum(cities[col.lower() + '_std'].fillna(0).to_numpy(), MIN_COORDINATE_STD))
+                            for col in ['Longitude', 'Latitude']}}
+
+def reference_rows(rng, start, count):
+    """ Esta função sorteia uma linha de referência em cada intervalo [start, start + count)
+
+        Input: rng - Gerador de números aleatórios
+               start, count - Arrays com o início e o tamanho do intervalo de cada linha gerada
+        Output: Array com as posições sorteadas
+    """
+    return start + (rng.random(len(start)) * count).astype('int64')
+
+def generate_block(model, rng, n, first_id):
+    """ Esta função gera um bloco de n linhas sintéticas com o cabeçalho do CSV de referência
+
+        Input: model (dict) - Modelo aprendido (ver learn_model)
+               rng - Gerador de números aleatórios do bloco
+               n (int) - Quantidade de linhas
+               first_id (int) - 'Restaurant ID' da primeira linha do bloco
+        Output: Dataframe com as linhas geradas
+    """
+    rows = model['rows']
+    city = rng.choice(len(model['city_probability']), size=n, p=model['city_probability'])
+
+    by_country = reference_rows(rng, model['country_start'][city], model['country_rows'][city])
+    by_cuisine = reference_rows(rng, model['country_start'][city], model['country_rows'][city])
+    by_city = reference_rows(rng, model['city_start'][city], model['city_rows'][city])
+
+    df = pd.DataFrame({'Restaurant ID': np.arange(first_id, first_id + n, dtype='int64'),
+                       'Country Code': model['city_country'][city],
+                       'City': model['city_name'][city]})
+    for col in CITY_COLUMNS:
+        df[col] = rows[col].to_numpy()[by_city]
+
+    # Coordenadas: distribuição normal com a média e o desvio padrão das coordenadas da cidade
+    for col, (mean, std) in model['coordinates'].items():
+        df[col] = (mean[city] + std[city] * rng.standard_normal(n)).round(10)
+    df['Cuisines'] = rows['Cuisines'].to_numpy()[by_cuisine]
+    for col in COUNTRY_COLUMNS:
+        df[col] = rows[col].to_numpy()[by_country]
+
+    # Linhas duplicadas: cópias de linhas anteriores (não duplicadas) do mesmo bloco
+    duplicated = rng.random(n) < model['duplicate_rate']
+    duplicated[0] = False
+    originals = np.flatnonzero(~duplicated)
+    before = np.searchsorted(originals, np.flatnonzero(duplicated))
+    sources = originals[(rng.random(len(before)) * before).astype('int64')]
+
+    df = df.loc[:, model['columns']]
+    for col in df.columns:
+        values = df[col].to_numpy(copy=True)
+        values[duplicated] = values[sources]
+        df[col] = values
+    return df
+
+def generate_blocks(rows, seed=0, model=None):
+    """ Esta função gera as linhas sintéticas em blocos de BLOCK_ROWS linhas
+
+        Input: rows (int) - Quantidade total de linhas
+               seed (int) - Semente da geração
+               model (dict) - Modelo aprendido (padrão: learn_model() sobre o zomato.csv)
+        Output: Gerador de Dataframes (um por bloco)
+    """
+    model = learn_model() if model is None else model
+    for block, start in enumerate(range(0, rows, BLOCK_ROWS)):
+        rng = np.random.default_rng([seed, block])
+        yield generate_block(model, rng, min(BLOCK_ROWS, rows - start), model['first_id'] + start)
+
+def write_synthetic_csv(path, rows, seed=0, model=None):
+    """ Esta função grava um CSV sintético com o mesmo cabeçalho do zomato.csv, bloco a bloco
+
+         Apenas um bloco fica em memória por vez, e o arquivo é gravado em um nome temporário e renomeado
+         ao final (um CSV incompleto nunca fica no caminho final). A mesma semente e quantidade de linhas
+         geram sempre o mesmo arquivo.
+
+        Input: path (str) - Caminho do CSV gerado
+               rows (int) - Quantidade de linhas
+               seed (int) - Semente da geração
+               model (dict) - Modelo aprendido (padrão: learn_model() sobre o zomato.csv)
+        Output: Caminho do CSV gerado
+    """
+    model = learn_model() if model is None else model
+    tmp = f'{path}.tmp{os.getpid()}'
+    with open(tmp, 'w', encoding='utf-8', newline='') as f:
+        f.write(','.join(model['columns']) + '\n')
+        for df in generate_blocks(rows, seed, model):
+            df.to_csv(f, index=False, header=False)
+    os.replace(tmp, path)
+    return path
+
+#===================================================#
+#     Geração pela linha de comando
+#===================================================#
+
+if __name__ == '__main__':
+    # Uso: python -m utils.synthetic [caminho do CSV gerado] [linhas] [semente] [CSV de referência]
+    import sys
+    import time
+
+    csv_path = sys.argv[1] if len(sys.argv) > 1 else 'zomato_synthetic.csv'
+    n_rows = int(sys.argv[2]) if len(sys.argv) > 2 else 1000000
+    seed = int(sys.argv[3]) if len(sys.argv) > 3 else 0
+    reference = sys.argv[4] if len(sys.argv) > 4 else DATASET_PATH
+
+    start = time.perf_counter()
+    write_synthetic_csv(csv_path, n_rows, seed, learn_model(reference))
+    print(f"CSV gerado em: {csv_path} ({n_rows:,} linhas, semente {seed}, "
+          f"{os.path.getsize(csv_path):,} bytes, {time.perf_counter() - start:.2f}s)")